@@ -0,0 +1,125 @@
+"""
+Landing rate and RPC cost of confirmation tracking under congestion.
+
+Sends trades through a mock client that drops a share of all sends, then
+compares per-trade status polling of a single send with the batched
+ConfirmationTracker, which rebroadcasts until blockhash expiry. Slots are
+compressed so a blockhash expires within a couple of seconds.
+
+    python -m benchmarks.bench_confirmations --trades 200 --drop-rate 0.7
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict
+
+from benchmarks.common import write_results
+from trading.confirmation_tracker import CONFIRMED, ConfirmationTracker
+from utils.blockhash_cache import BlockhashCache
+from utils.mock_client import MockAsyncClient
+
+
+async def advance_slots(client: MockAsyncClient, slot_time: float):
+    while True:
+        await asyncio.sleep(slot_time)
+        client.slot += 1
+
+
+async def per_trade_polling(client: MockAsyncClient, raw: bytes, valid_blocks: int,
+                            interval: float) -> bool:
+    """Send once, then poll this signature alone until it lands or expires"""
+    last_valid_block_height = client.slot + valid_blocks
+    response = await client.send_raw_transaction(raw)
+    signature = response['result']
+    while True:
+        await asyncio.sleep(interval)
+        status = (await client.get_signature_statuses([signature]))['result']['value'][0]
+        if status is not None:
+            return True
+        if (await client.get_block_height())['result'] > last_valid_block_height:
+            return False
+
+
+async def run_per_trade(args) -> Dict:
+    client = MockAsyncClient(latency=args.latency, drop_rate=args.drop_rate, seed=args.seed)
+    slots = asyncio.create_task(advance_slots(client, args.slot_time))
+    start = time.perf_counter()
+    try:
+        landed = await asyncio.gather(*(
+            per_trade_polling(client, os.urandom(256), args.valid_blocks, args.poll_interval)
+            for _ in range(args.trades)
+        ))
+    finally:
+        slots.cancel()
+    return {
+        "landed": sum(landed),
+        "landing_rate": sum(landed) / args.trades,
+        "rpc_calls": sum(client.calls.values()),
+        "calls": dict(client.calls),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+async def run_tracker(args) -> Dict:
+    client = MockAsyncClient(latency=args.latency, drop_rate=args.drop_rate, seed=args.seed)
+    # Not started: expiry falls back to one getBlockHeight per poll
+    tracker = ConfirmationTracker(
+        client, BlockhashCache(client),
+        poll_interval=args.poll_interval,
+        rebroadcast_interval=args.rebroadcast_interval
+    )
+    slots = asyncio.create_task(advance_slots(client, args.slot_time))
+    tracker.start()
+    start = time.perf_counter()
+    try:
+        pending = []
+        for _ in range(args.trades):
+            raw = os.urandom(256)
+            response = await client.send_raw_transaction(raw)
+            pending.append(tracker.track(response['result'], raw, client.slot + args.valid_blocks))
+        statuses = await asyncio.gather(*(p.future for p in pending))
+    finally:
+        slots.cancel()
+        await tracker.stop()
+
+    landed = sum(status == CONFIRMED for status in statuses)
+    return {
+        "landed": landed,
+        "landing_rate": landed / args.trades,
+        "rpc_calls": sum(client.calls.values()),
+        "calls": dict(client.calls),
+        "seconds": time.perf_counter() - start,
+        **tracker.metrics(),
+    }
+
+
+async def run(args) -> Dict:
+    return {
+        "trades": args.trades,
+        "drop_rate": args.drop_rate,
+        "per_trade_polling": await run_per_trade(args),
+        "batched_tracker": await run_tracker(args),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trades', type=int, default=200)
+    parser.add_argument('--drop-rate', type=float, default=0.7,
+                        help="Probability that any single send is dropped")
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--slot-time', type=float, default=0.02,
+                        help="Compressed seconds per slot")
+    parser.add_argument('--valid-blocks', type=int, default=75)
+    parser.add_argument('--poll-interval', type=float, default=0.1)
+    parser.add_argument('--rebroadcast-interval', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    write_results("confirmations", asyncio.run(run(args)), args.output)
+
+
+if __name__ == '__main__':
+    main()
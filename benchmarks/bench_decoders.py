@@ -0,0 +1,228 @@
+"""
+Per-notification decode benchmark: base64 binary decoders vs jsonParsed.
+
+Builds the same Pump.fun buy, Raydium swap and Jupiter route as both a
+base64 and a jsonParsed accountNotification, then times, for each
+encoding, the envelope json.loads and the signal extraction separately.
+
+    python -m benchmarks.bench_decoders --iterations 20000
+"""
+import argparse
+import base64
+import json
+import os
+import struct
+import time
+from typing import Dict, List, Tuple
+
+from base58 import b58decode, b58encode
+
+from benchmarks.common import percentile, write_results
+from trading.decoders import (
+    JUPITER_SHARED_ROUTE, PUMP_BUY, WSOL_MINT, decode_signal, signature_key
+)
+
+PUMP_PROGRAM = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+RAYDIUM_PROGRAM = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+JUPITER_PROGRAM = "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4"
+COMPUTE_BUDGET_PROGRAM = "ComputeBudget111111111111111111111111111111"
+
+
+def random_key() -> str:
+    return b58encode(os.urandom(32)).decode()
+
+
+def compact_u16(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def serialize(keys: List[str], instructions: List[Tuple[int, List[int], bytes]]) -> bytes:
+    """A signed legacy transaction in wire format"""
+    message = bytes([1, 0, len(keys) - 2]) + compact_u16(len(keys))
+    message += b"".join(b58decode(key) for key in keys) + os.urandom(32)
+    message += compact_u16(len(instructions))
+    for program_index, accounts, data in instructions:
+        message += bytes([program_index]) + compact_u16(len(accounts)) + bytes(accounts)
+        message += compact_u16(len(data)) + data
+    return compact_u16(1) + os.urandom(64) + message
+
+
+def token_balance(index: int, mint: str, owner: str, amount: int) -> Dict:
+    return {
+        "accountIndex": index, "mint": mint, "owner": owner,
+        "programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+        "uiTokenAmount": {
+            "amount": str(amount), "decimals": 6,
+            "uiAmount": amount / 1e6, "uiAmountString": str(amount / 1e6)
+        }
+    }
+
+
+def build_swap(kind: str) -> Tuple[List[str], List[Tuple[int, List[int], bytes]], List[Dict]]:
+    """Account keys, instructions and token balances for one swap"""
+    wallet, mint = random_key(), random_key()
+    budget = (1, [], bytes([2]) + struct.pack("<I", 200000))
+
+    if kind == "pump":
+        keys = [wallet, COMPUTE_BUDGET_PROGRAM, PUMP_PROGRAM, mint] + [random_key() for _ in range(9)]
+        accounts = [4, 5, 3, 6, 7, 8, 0, 9, 10, 11, 12, 2]
+        data = PUMP_BUY + struct.pack("<QQ", 35000000000, 100000000)
+        return keys, [budget, (2, accounts, data)], [token_balance(8, mint, wallet, 35000000000)]
+
+    if kind == "raydium":
+        keys = [wallet, COMPUTE_BUDGET_PROGRAM, RAYDIUM_PROGRAM] + [random_key() for _ in range(17)]
+        accounts = list(range(3, 18)) + [18, 19, 0]
+        data = bytes([9]) + struct.pack("<QQ", 100000000, 1)
+        balances = [
+            token_balance(18, WSOL_MINT, wallet, 500000000),
+            token_balance(19, mint, wallet, 0),
+        ]
+        return keys, [budget, (2, accounts, data)], balances
+
+    keys = [wallet, COMPUTE_BUDGET_PROGRAM, JUPITER_PROGRAM, WSOL_MINT, mint] + [random_key() for _ in range(5)]
+    accounts = [5, 6, 0, 7, 8, 9, 9, 3, 4, 5, 5, 5, 2]
+    route_plan = compact_u16(2) + os.urandom(8)
+    data = JUPITER_SHARED_ROUTE + bytes([1]) + route_plan + struct.pack("<QQHB", 100000000, 1, 50, 0)
+    balances = [token_balance(7, WSOL_MINT, wallet, 500000000), token_balance(9, mint, wallet, 0)]
+    return keys, [budget, (2, accounts, data)], balances
+
+
+def notification(value: Dict) -> str:
+    return json.dumps({
+        "jsonrpc": "2.0", "method": "accountNotification",
+        "params": {"result": {"context": {"slot": 250000000}, "value": value}, "subscription": 1}
+    })
+
+
+def build_notifications(kind: str) -> Tuple[str, str]:
+    """The same swap as a base64 and as a jsonParsed notification"""
+    keys, instructions, balances = build_swap(kind)
+    raw = serialize(keys, instructions)
+    signature = b58encode(raw[1:65]).decode()
+    meta = {
+        "err": None, "fee": 5000, "computeUnitsConsumed": 60000,
+        "preBalances": [10**9] * len(keys), "postBalances": [10**9] * len(keys),
+        "preTokenBalances": balances, "postTokenBalances": balances,
+        "innerInstructions": [],
+        "logMessages": [f"Program {keys[2]} invoke [1]", f"Program {keys[2]} success"],
+    }
+
+    binary = {
+        "slot": 250000000,
+        "transaction": [base64.b64encode(raw).decode(), "base64"],
+        "meta": meta,
+    }
+    parsed = {
+        "slot": 250000000,
+        "transaction": {
+            "signatures": [signature],
+            "message": {
+                "accountKeys": [
+                    {"pubkey": key, "signer": i == 0, "writable": i not in (1, 2), "source": "transaction"}
+                    for i, key in enumerate(keys)
+                ],
+                "recentBlockhash": random_key(),
+                "instructions": [
+                    {
+                        "programId": keys[program_index],
+                        "accounts": [keys[index] for index in accounts],
+                        "data": b58encode(data).decode(),
+                        "stackHeight": None
+                    }
+                    for program_index, accounts, data in instructions
+                ],
+            },
+        },
+        "meta": meta,
+    }
+    return notification(binary), notification(parsed)
+
+
+def parsed_signal(value: Dict):
+    """jsonParsed walk: signature, then mint, side and amount from balance deltas"""
+    signature = value["transaction"]["signatures"][0]
+    owner = value["transaction"]["message"]["accountKeys"][0]["pubkey"]
+    pre = {b["accountIndex"]: b for b in value["meta"]["preTokenBalances"] if b["owner"] == owner}
+    for entry in value["meta"]["postTokenBalances"]:
+        if entry["owner"] != owner or entry["mint"] == WSOL_MINT:
+            continue
+        before = int(pre.get(entry["accountIndex"], {}).get("uiTokenAmount", {}).get("amount", 0))
+        change = int(entry["uiTokenAmount"]["amount"]) - before
+        return signature, entry["mint"], change >= 0, abs(change)
+    return signature, None, None, None
+
+
+def binary_signal(value: Dict):
+    return signature_key(value), decode_signal(value)
+
+
+def summarize(samples: List[int]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "mean_us": sum(samples) / len(samples) / 1e3,
+        "p50_us": percentile(samples, 50) / 1e3,
+        "p99_us": percentile(samples, 99) / 1e3,
+    }
+
+
+def time_decoder(messages: List[str], extract, iterations: int) -> Dict:
+    """Time the envelope json.loads and the extraction of each notification"""
+    envelope, decode, total = [], [], []
+    for i in range(iterations):
+        message = messages[i % len(messages)]
+        start = time.perf_counter_ns()
+        value = json.loads(message)["params"]["result"]["value"]
+        loaded = time.perf_counter_ns()
+        extract(value)
+        end = time.perf_counter_ns()
+        envelope.append(loaded - start)
+        decode.append(end - loaded)
+        total.append(end - start)
+    return {
+        "envelope": summarize(envelope),
+        "decode": summarize(decode),
+        "total": summarize(total),
+        "bytes_per_notification": sum(len(m) for m in messages) / len(messages),
+    }
+
+
+def run(iterations: int) -> Dict:
+    results = {}
+    for kind in ("pump", "raydium", "jupiter"):
+        binary, parsed = zip(*(build_notifications(kind) for _ in range(64)))
+        assert decode_signal(json.loads(binary[0])["params"]["result"]["value"]) is not None
+        results[kind] = {
+            "base64": time_decoder(list(binary), binary_signal, iterations),
+            "json_parsed": time_decoder(list(parsed), parsed_signal, iterations),
+        }
+        for stage in ("decode", "total"):
+            results[kind][f"{stage}_speedup"] = (
+                results[kind]["json_parsed"][stage]["mean_us"]
+                / results[kind]["base64"][stage]["mean_us"]
+            )
+        results[kind]["size_ratio"] = (
+            results[kind]["base64"]["bytes_per_notification"]
+            / results[kind]["json_parsed"]["bytes_per_notification"]
+        )
+    return {"iterations": iterations, "programs": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    write_results("decoders", run(args.iterations), args.output)
+
+
+if __name__ == '__main__':
+    main()
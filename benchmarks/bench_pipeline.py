@@ -0,0 +1,292 @@
+"""
+End-to-end pipeline benchmark against a local mock RPC/websocket server.
+
+Drives TransactionMonitor -> SignalQueue -> DexTrader at increasing signal
+rates and reports signal-to-send latency percentiles, the highest rate the
+pipeline sustains, event-loop lag and memory per tracked token.
+
+Each signal is a signed Pump.fun buy by one of the target wallets on one
+of ``--mints`` bonding curves. The server announces it with a
+logsNotification and serves it, base64-encoded with its meta, from
+getTransaction. The bot then decodes the buy, prices the curve, builds
+and signs its own swap, and sends it. Every signal should therefore end
+in a send. The signed payloads are built before the clock starts. The
+server runs on the bot's event loop, and each RPC costs client and server
+CPU there, so rates saturate lower than against a remote node.
+
+    python -m benchmarks.bench_pipeline --wallets 50 --rates 10,50,100,200 \
+        --latency 0.02 --jitter 0.01 --output pipeline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.transaction import Transaction
+
+from benchmarks.common import LagProbe, write_results
+from benchmarks.mock_rpc_server import MockRpcServer
+from config import BotConfig
+from slippage_calculator import SlippageCalculator
+from trading.dex_trader import DexTrader
+from trading.quote_engine import PumpCurvePool
+from trading.signal_queue import SignalQueue
+from trading.swap_builders import build_pump_swap
+from trading.transaction_monitor import TransactionMonitor
+from utils.position_manager import PositionManager
+from utils.rpc_pool import RpcPool
+from utils.price_tracker import PriceTracker
+from utils.token_cache import TOKEN_PROGRAM_ID, TokenContext, get_associated_token_address
+from utils.trade_logger import TradeLogger
+
+SUSTAINED_RATIO = 0.95
+CURVE_TOKEN_RESERVE = 1_073_000_000 * 10**6
+CURVE_SOL_RESERVE = 30 * 10**9
+
+
+def signal_transaction(index: int, wallet: Keypair, mint: Pubkey,
+                       curve: Pubkey) -> bytes:
+    """A wallet's signed Pump.fun buy; the index makes every signature unique"""
+    context = TokenContext(
+        mint=mint,
+        decimals=6,
+        token_program=TOKEN_PROGRAM_ID,
+        ata=get_associated_token_address(wallet.pubkey(), mint),
+        ata_exists=True
+    )
+    pool = PumpCurvePool(str(mint), str(curve))
+    max_sol_cost = 10**7 + index
+    instruction = build_pump_swap(
+        wallet.pubkey(), context, pool, True, max_sol_cost, 10**9 + index
+    )
+    blockhash = Hash.default()
+    message = Message.new_with_blockhash([instruction], wallet.pubkey(), blockhash)
+    return bytes(Transaction([wallet], message, blockhash))
+
+
+async def wait_for_subscriptions(server: MockRpcServer, wallets: List[str], timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(server.log_subscriptions.get(wallet) for wallet in wallets):
+            return
+        await asyncio.sleep(0.05)
+    raise TimeoutError("Monitor did not subscribe to every wallet")
+
+
+async def run_rate(rate: float, args, workdir: str) -> Dict:
+    server = MockRpcServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed
+    )
+    await server.start()
+
+    wallets = [Keypair() for _ in range(args.wallets)]
+    markets: List[Tuple[Pubkey, Pubkey]] = []
+    for _ in range(args.mints):
+        mint, curve = Keypair().pubkey(), Keypair().pubkey()
+        server.add_mint(str(mint))
+        server.add_pump_curve(str(curve), CURVE_TOKEN_RESERVE, CURVE_SOL_RESERVE)
+        markets.append((mint, curve))
+    config = BotConfig(
+        rpc_url=server.http_url,
+        ws_url=server.ws_url,
+        private_key=json.dumps(list(bytes(Keypair()))),
+        target_wallets=",".join(str(wallet.pubkey()) for wallet in wallets),
+        trade_size_sol=args.trade_size,
+        trade_workers=args.workers,
+        metrics_port=None,
+        state_file=None
+    )
+    client = RpcPool.from_config(config)
+    logger = TradeLogger(
+        os.path.join(workdir, f"bench_{rate}.log"),
+        os.path.join(workdir, f"bench_{rate}.jsonl")
+    )
+    trader = DexTrader(client, config, logger)
+    signal_queue = SignalQueue.from_config(trader, config)
+    monitor = TransactionMonitor(
+        client, config.target_wallets, signal_queue,
+        tracer=trader.tracer, ws_url=config.ws_url
+    )
+    trader.token_cache.attach(monitor.accounts)
+    trader.quote_engine.attach(monitor.accounts)
+    trader.balances.attach(monitor.accounts)
+
+    signals = int(rate * args.duration)
+    payloads = [
+        (str(wallets[i % len(wallets)].pubkey()),
+         signal_transaction(i, wallets[i % len(wallets)], *markets[i % len(markets)]))
+        for i in range(signals)
+    ]
+
+    await trader.balances.seed()
+    trader.start()
+    signal_queue.start()
+    monitor_task = asyncio.create_task(monitor.start_monitoring())
+    probe = LagProbe()
+    try:
+        await wait_for_subscriptions(
+            server, [str(wallet.pubkey()) for wallet in wallets], timeout=10
+        )
+
+        probe.start()
+        start = time.perf_counter()
+        for i, (wallet, raw) in enumerate(payloads):
+            due = start + i / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await server.publish_transaction(wallet, raw)
+        emit_seconds = time.perf_counter() - start
+
+        # Signals reach the queue only after their getTransaction returns
+        deadline = time.perf_counter() + args.drain_timeout
+        while (len(server.sent_signatures) < signals
+               and time.perf_counter() < deadline):
+            await asyncio.sleep(0.01)
+        try:
+            await asyncio.wait_for(
+                signal_queue.join(), timeout=max(0.0, deadline - time.perf_counter())
+            )
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - start
+        await probe.stop()
+    finally:
+        monitor_task.cancel()
+        await asyncio.gather(monitor_task, return_exceptions=True)
+        await signal_queue.stop()
+        await trader.stop()
+        await client.close()
+        logger.close()
+        await server.stop()
+
+    total = trader.tracer.total_histogram
+    sent = len(server.sent_signatures)
+    return {
+        "fetched": monitor.fetched,
+        "fetch_failures": monitor.fetch_failures,
+        "offered_rate": rate,
+        "signals": signals,
+        "emit_seconds": emit_seconds,
+        "sent": sent,
+        "sends_per_sec": sent / elapsed if elapsed else 0.0,
+        "signal_to_send_ms": {
+            "p50": total.percentile(50) / 1e6,
+            "p90": total.percentile(90) / 1e6,
+            "p99": total.percentile(99) / 1e6,
+            "max": total.max / 1e6,
+        },
+        "stages_p99_ms": {
+            stage: histogram.percentile(99) / 1e6
+            for stage, histogram in trader.tracer.stage_histograms.items()
+        },
+        "queue": dict(signal_queue.stats),
+        "rpc_calls": dict(server.calls),
+        "rpc_errors": server.errors,
+        **probe.summary(),
+    }
+
+
+def measure_token_memory(tokens: int) -> Dict[str, float]:
+    """Bytes of tracked state per token for the per-token structures"""
+    results = {}
+    names = [f"token{i}" for i in range(tokens)]
+
+    def measure(name, build):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        keep = build()
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results[name] = (after - before) / tokens
+        return keep
+
+    def slippage():
+        calculator = SlippageCalculator()
+        for _ in range(calculator.volatility_window):
+            calculator.update_prices(names, [1.0] * tokens)
+        return calculator
+
+    def positions():
+        manager = PositionManager(5.0, 10.0)
+        for name in names:
+            manager.open_position(name, Decimal("1.0"), 0.1)
+        return manager
+
+    def prices():
+        tracker = PriceTracker()
+        for name in names:
+            tracker.update_price(name, Decimal("1.0"))
+            tracker.set_entry_price(name, Decimal("1.0"))
+        return tracker
+
+    measure("slippage_calculator", slippage)
+    measure("position_manager", positions)
+    measure("price_tracker", prices)
+    results["total"] = sum(results.values())
+    return results
+
+
+async def run(args) -> Dict:
+    runs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rate in args.rates:
+            runs.append(await run_rate(rate, args, workdir))
+
+    sustained = [
+        r["offered_rate"] for r in runs
+        if r["queue"]["dropped"] == 0 and r["sent"] >= SUSTAINED_RATIO * r["signals"]
+    ]
+    return {
+        "config": {
+            "wallets": args.wallets,
+            "mints": args.mints,
+            "workers": args.workers,
+            "trade_size": args.trade_size,
+            "duration": args.duration,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+        },
+        "runs": runs,
+        "max_sustained_signals_per_sec": max(sustained) if sustained else 0,
+        "memory_bytes_per_token": measure_token_memory(args.memory_tokens),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--wallets', type=int, default=20)
+    parser.add_argument('--mints', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--trade-size', type=float, default=0.01,
+                        help="SOL per mirrored buy")
+    parser.add_argument('--rates', default="10,50,100,200",
+                        help="Comma-separated signal rates per second")
+    parser.add_argument('--duration', type=float, default=5.0,
+                        help="Seconds of signals per rate")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Mock RPC response latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--drain-timeout', type=float, default=10.0)
+    parser.add_argument('--memory-tokens', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+    args.rates = [float(rate) for rate in args.rates.split(',')]
+
+    write_results("pipeline", asyncio.run(run(args)), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+RPC pool benchmark against several local mock endpoints.
+
+Starts mock endpoints with different latency and error profiles and
+compares send and read latency through each endpoint alone with the
+health-scored RpcPool. Midway through the pool run the fastest endpoint
+starts failing every request, to exercise failover and circuit breaking.
+
+    python -m benchmarks.bench_rpc_pool --requests 400 \
+        --profiles 0.005:0.002:0,0.02:0.02:0,0.01:0.005:0.3
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.common import percentile, write_results
+from benchmarks.mock_rpc_server import MockRpcServer
+from utils.rpc_pool import RpcPool
+
+Profile = Tuple[float, float, float]  # latency, jitter, error rate
+
+
+def summarize(latencies: List[float], failures: int) -> Dict[str, float]:
+    latencies.sort()
+    return {
+        "ok": len(latencies),
+        "failed": failures,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def drive(pool: RpcPool, requests: int, interval: float, on_halfway=None) -> Dict:
+    """Alternate sends and reads through the pool at a fixed interval"""
+    send_latencies: List[float] = []
+    read_latencies: List[float] = []
+    send_failures = read_failures = 0
+
+    async def one(i: int):
+        nonlocal send_failures, read_failures
+        start = time.perf_counter()
+        try:
+            if i % 2 == 0:
+                response = await pool.send_raw_transaction(os.urandom(256))
+            else:
+                response = await pool.get_latest_blockhash()
+            ok = 'error' not in response
+        except Exception:
+            ok = False
+
+        elapsed = time.perf_counter() - start
+        if i % 2 == 0:
+            if ok:
+                send_latencies.append(elapsed)
+            else:
+                send_failures += 1
+        elif ok:
+            read_latencies.append(elapsed)
+        else:
+            read_failures += 1
+
+    tasks = []
+    for i in range(requests):
+        if on_halfway is not None and i == requests // 2:
+            on_halfway()
+        tasks.append(asyncio.create_task(one(i)))
+        await asyncio.sleep(interval)
+    await asyncio.gather(*tasks)
+
+    return {
+        "sends": summarize(send_latencies, send_failures),
+        "reads": summarize(read_latencies, read_failures),
+    }
+
+
+async def run(args) -> Dict:
+    servers = [
+        MockRpcServer(latency=latency, jitter=jitter, error_rate=error_rate, seed=args.seed + i)
+        for i, (latency, jitter, error_rate) in enumerate(args.profiles)
+    ]
+    for server in servers:
+        await server.start()
+
+    results: Dict = {"profiles": [
+        {"url": server.http_url, "latency": latency, "jitter": jitter, "error_rate": error_rate}
+        for server, (latency, jitter, error_rate) in zip(servers, args.profiles)
+    ]}
+    try:
+        results["single_endpoint"] = []
+        for server in servers:
+            pool = RpcPool([server.http_url], failure_threshold=args.failure_threshold,
+                           cooldown=args.cooldown)
+            run_result = await drive(pool, args.requests, args.interval)
+            run_result["url"] = server.http_url
+            results["single_endpoint"].append(run_result)
+            await pool.close()
+
+        pool = RpcPool(
+            [server.http_url for server in servers], send_fanout=args.fanout,
+            failure_threshold=args.failure_threshold, cooldown=args.cooldown
+        )
+        fastest = min(servers, key=lambda s: s.latency + s.jitter / 2)
+
+        def outage():
+            fastest.error_rate = 1.0
+
+        results["pool"] = await drive(pool, args.requests, args.interval, on_halfway=outage)
+        results["pool"]["outage_endpoint"] = fastest.http_url
+        results["pool"]["endpoints"] = pool.stats()
+        await pool.close()
+    finally:
+        for server in servers:
+            await server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--interval', type=float, default=0.005,
+                        help="Seconds between requests")
+    parser.add_argument('--profiles', default="0.005:0.002:0,0.02:0.02:0,0.01:0.005:0.3",
+                        help="Comma-separated latency:jitter:error_rate per endpoint")
+    parser.add_argument('--fanout', type=int, default=3)
+    parser.add_argument('--failure-threshold', type=int, default=5)
+    parser.add_argument('--cooldown', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+    args.profiles = [
+        tuple(float(part) for part in profile.split(':'))
+        for profile in args.profiles.split(',')
+    ]
+
+    write_results("rpc_pool", asyncio.run(run(args)), args.output)
+
+
+if __name__ == '__main__':
+    main()
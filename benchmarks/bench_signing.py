@@ -0,0 +1,218 @@
+"""
+Per-trade build-and-sign cost of the live trader: fresh builds vs templates.
+
+Both paths call ``DexTrader._swap_message`` for a buy on a Pump.fun bonding
+curve known to the quote engine. Each message carries the
+SetComputeUnitLimit and SetComputeUnitPrice instructions the bot sends,
+followed by the swap. The trader's ``TransactionSigner`` signs it.
+
+The fresh path drops the cached template before every trade, so each
+trade compiles a new Transaction and is signed on the event loop. The
+template path patches amount, min_out, blockhash and compute budget bytes
+into the cached message and signs on the signing threads.
+
+Both paths run ``--concurrency`` trades at a time. A 1 ms ticker measures
+how long the event loop is held up. End-to-end template times include
+waiting for a free signing thread.
+
+    python -m benchmarks.bench_signing --trades 5000
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from base58 import b58encode
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from benchmarks.common import LagProbe, percentile, write_results
+from config import BotConfig
+from trading.dex_trader import DexTrader
+from utils.mock_client import MockAsyncClient
+from utils.token_cache import TOKEN_PROGRAM_ID, TokenContext, get_associated_token_address
+from utils.trade_logger import TradeLogger
+
+
+class Trade:
+    __slots__ = ("blockhash", "amount_in", "min_out", "cu_limit", "cu_price")
+
+    def __init__(self, blockhash: str, amount_in: int, min_out: int,
+                 cu_limit: int, cu_price: int):
+        self.blockhash = blockhash
+        self.amount_in = amount_in
+        self.min_out = min_out
+        self.cu_limit = cu_limit
+        self.cu_price = cu_price
+
+
+def make_trades(count: int, seed: int) -> List[Trade]:
+    """Random trade inputs, with a new blockhash every 100 trades"""
+    rng = random.Random(seed)
+    blockhashes = [
+        b58encode(bytes(rng.getrandbits(8) for _ in range(32))).decode()
+        for _ in range(count // 100 + 1)
+    ]
+    return [
+        Trade(
+            blockhashes[i // 100],
+            rng.randrange(10**7, 10**9),
+            rng.randrange(10**9, 10**12),
+            rng.randrange(100_000, 400_000),
+            rng.randrange(1_000, 1_000_000),
+        )
+        for i in range(count)
+    ]
+
+
+def make_trader(args, logdir: str) -> Tuple[DexTrader, TokenContext]:
+    """A live trader holding one Pump.fun curve and its mint's token context"""
+    keypair = Keypair()
+    config = BotConfig(
+        private_key=json.dumps(list(bytes(keypair))),
+        signing_threads=args.signing_threads,
+        metrics_port=None,
+        state_file=None
+    )
+    trader = DexTrader(
+        MockAsyncClient(), config,
+        TradeLogger(f"{logdir}/bench_signing.log", f"{logdir}/bench_signing.jsonl")
+    )
+    mint = Pubkey.from_bytes(bytes(range(32)))
+    trader.quote_engine.discover(str(mint), ("pump", str(Keypair().pubkey())))
+    context = TokenContext(
+        mint=mint,
+        decimals=6,
+        token_program=TOKEN_PROGRAM_ID,
+        ata=get_associated_token_address(keypair.pubkey(), mint),
+        ata_exists=True
+    )
+    trader.blockhash_cache.last_valid_block_height = 2**62
+    return trader, context
+
+
+async def swap_message(trader: DexTrader, context: TokenContext, trade: Trade) -> bytes:
+    """The trader's message for a trade, with the trade's blockhash"""
+    trader.blockhash_cache.blockhash = trade.blockhash
+    trader.blockhash_cache.fetched_at = time.monotonic()
+    message, _ = await trader._swap_message(
+        context.mint, True, trade.amount_in, trade.min_out,
+        context, trade.cu_limit, trade.cu_price
+    )
+    return message
+
+
+async def build_and_sign(trader: DexTrader, context: TokenContext, trade: Trade) -> bytes:
+    """The fresh path: compile the transaction and sign it on the loop"""
+    trader.templates.templates.clear()
+    _, raw = trader.signer.sign_message(await swap_message(trader, context, trade))
+    return raw
+
+
+def summarize(timings: Dict[str, List[float]], seconds: float, probe: LagProbe) -> Dict:
+    """p50/p99 of each timing in microseconds, plus throughput and loop lag"""
+    results = {"trades": len(timings["on_loop"])}
+    for name, durations in timings.items():
+        ordered = sorted(durations)
+        results[f"{name}_p50_us"] = percentile(ordered, 50) * 1e6
+        results[f"{name}_p99_us"] = percentile(ordered, 99) * 1e6
+    results["trades_per_second"] = results["trades"] / seconds
+    results.update(probe.summary())
+    return results
+
+
+async def run_fresh(args, trader: DexTrader, context: TokenContext,
+                    trades: List[Trade]) -> Dict:
+    timings = {"on_loop": []}
+
+    async def trade_task(trade: Trade):
+        start = time.perf_counter()
+        await build_and_sign(trader, context, trade)
+        timings["on_loop"].append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+
+    probe = LagProbe()
+    probe.start()
+    start = time.perf_counter()
+    for i in range(0, len(trades), args.concurrency):
+        await asyncio.gather(*(trade_task(t) for t in trades[i:i + args.concurrency]))
+    seconds = time.perf_counter() - start
+    await probe.stop()
+    return summarize(timings, seconds, probe)
+
+
+async def run_templates(args, trader: DexTrader, context: TokenContext,
+                        trades: List[Trade]) -> Dict:
+    # Learn the template from one normally built message
+    await build_and_sign(trader, context, trades[0])
+
+    timings = {"on_loop": [], "signing": [], "end_to_end": []}
+
+    def sign(message: bytes) -> bytes:
+        start = time.perf_counter()
+        _, raw = trader.signer.sign_message(message)
+        timings["signing"].append(time.perf_counter() - start)
+        return raw
+
+    async def trade_task(trade: Trade) -> bytes:
+        start = time.perf_counter()
+        message = await swap_message(trader, context, trade)
+        timings["on_loop"].append(time.perf_counter() - start)
+        raw = await asyncio.get_running_loop().run_in_executor(
+            trader.signer.executor, sign, message
+        )
+        timings["end_to_end"].append(time.perf_counter() - start)
+        return raw
+
+    probe = LagProbe()
+    probe.start()
+    start = time.perf_counter()
+    for i in range(0, len(trades), args.concurrency):
+        await asyncio.gather(*(trade_task(t) for t in trades[i:i + args.concurrency]))
+    seconds = time.perf_counter() - start
+    await probe.stop()
+    results = summarize(timings, seconds, probe)
+    results["template_hits"] = trader.templates.hits
+
+    # Same inputs must give byte-identical signed transactions
+    sample = trades[len(trades) // 2]
+    patched = await trade_task(sample)
+    identical = patched == await build_and_sign(trader, context, sample)
+    return {**results, "identical_to_fresh": identical}
+
+
+async def run(args) -> Dict:
+    trader, context = make_trader(args, args.logdir)
+    trades = make_trades(args.trades, args.seed)
+    try:
+        return {
+            "concurrency": args.concurrency,
+            "signing_threads": args.signing_threads,
+            "fresh_transaction": await run_fresh(args, trader, context, trades),
+            "template": await run_templates(args, trader, context, trades),
+        }
+    finally:
+        await trader.stop()
+        trader.logger.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trades', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help="Trades built and signed at the same time")
+    parser.add_argument('--signing-threads', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--logdir', default=tempfile.gettempdir(),
+                        help="Directory for the trader's log files")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    write_results("signing", asyncio.run(run(args)), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Trade logging throughput and event-loop lag benchmark.
+
+Compares the synchronous FileHandler logging the bot used to do inside the
+event loop with the queue-backed TradeLogger and its trade journal.
+
+    python -m benchmarks.bench_trade_logger --trades 20000
+    python -m benchmarks.bench_trade_logger --trades 5000 --yield-every 1 --pace 0.001
+
+Without --pace the loop logs as fast as it can, which keeps the writer
+threads busy with a backlog; --pace sleeps at each yield instead, closer
+to the rate trades actually arrive at.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+from benchmarks.common import LagProbe, write_results
+from utils.trade_logger import TradeLogger
+
+
+def sync_logger(log_file: str) -> logging.Logger:
+    """The pre-queue TradeLogger setup: file handler on the calling thread"""
+    logger = logging.getLogger('bench_sync')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.FileHandler(log_file)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+
+async def drive(log_one, trades: int, yield_every: int, pace: float = 0.0):
+    probe = LagProbe()
+    probe.start()
+    start = time.perf_counter()
+    for i in range(trades):
+        log_one(i)
+        if i % yield_every == 0:
+            await asyncio.sleep(pace)
+    elapsed = time.perf_counter() - start
+    await probe.stop()
+    return {"trades_per_sec": trades / elapsed, **probe.summary()}
+
+
+async def run(trades: int, yield_every: int, workdir: str, pace: float = 0.0):
+    price = Decimal("0.000123")
+    token = "So11111111111111111111111111111111111111112"
+
+    logger = sync_logger(os.path.join(workdir, 'sync.log'))
+
+    def log_sync(i):
+        logger.info(
+            f"TRADE: BUY {0.1} {token} @ {price} SOL | "
+            f"Slippage: {1.0}% | Gas: {1.5}x"
+        )
+
+    baseline = await drive(log_sync, trades, yield_every, pace)
+
+    trade_logger = TradeLogger(
+        os.path.join(workdir, 'queued.log'),
+        os.path.join(workdir, 'trades.jsonl')
+    )
+    # Keep the console quiet; the benchmark measures file output
+    trade_logger.listener.handlers = trade_logger.listener.handlers[:1]
+
+    def log_queued(i):
+        trade_logger.log_trade(token, "buy", 0.1, price, 1.0, 1.5)
+
+    queued = await drive(log_queued, trades, yield_every, pace)
+
+    drain_start = time.perf_counter()
+    trade_logger.close()
+    queued["drain_seconds"] = time.perf_counter() - drain_start
+    queued["journal_records"] = trade_logger.journal.written
+
+    return {"trades": trades, "pace": pace, "sync_file_handler": baseline, "queued": queued}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trades', type=int, default=20000)
+    parser.add_argument('--yield-every', type=int, default=10)
+    parser.add_argument('--pace', type=float, default=0.0,
+                        help="Seconds to sleep at each yield")
+    parser.add_argument('--output', help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = asyncio.run(run(args.trades, args.yield_every, workdir, args.pace))
+
+    write_results("trade_logger", results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import asyncio
+import json
+import platform
+import sys
+import time
+from typing import Dict, List, Optional
+
+
+class LagProbe:
+    """Measures how late a 1 ms ticker wakes up while the loop is busy"""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(time.perf_counter() - start - self.interval)
+
+    def summary(self) -> Dict[str, float]:
+        lags = sorted(self.lags) or [0.0]
+        return {
+            "lag_p50_ms": percentile(lags, 50) * 1000,
+            "lag_p99_ms": percentile(lags, 99) * 1000,
+            "lag_max_ms": lags[-1] * 1000,
+        }
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+def write_results(name: str, results: Dict, output: Optional[str] = None):
+    """Print results as JSON and optionally write them to a file"""
+    document = {
+        "benchmark": name,
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(document, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text)
+    print(text)
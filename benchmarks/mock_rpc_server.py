@@ -0,0 +1,373 @@
+"""
+In-process stand-in for the Solana JSON-RPC and websocket endpoints.
+
+Serves the calls the bot makes over plain HTTP, and account and logs
+subscriptions over websockets, with configurable response latency, jitter
+and error rate. Responses have the shapes a real node returns, so they
+parse through the pinned client: accounts set with ``set_account`` are
+served by ``getMultipleAccounts``, and a transaction published for a
+wallet is announced by a ``logsNotification`` and then served by
+``getTransaction``. Transactions the bot sends land immediately and are
+reported confirmed. Pump.fun trades that land, published or sent, move
+their bonding curve and notify its subscribers.
+"""
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import random
+from typing import Dict, List, Optional, Set, Tuple
+
+import websockets
+from base58 import b58encode
+
+from trading.decoders import PUMP_BUY, PUMP_SELL, U64_PAIR, parse_transaction
+from trading.quote_engine import PUMP_CURVE
+
+SLOT_TIME = 0.4
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+PUMP_PROGRAM_ID = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+LAMPORTS_PER_SOL = 10**9
+COMPUTE_UNITS_CONSUMED = 60000
+
+
+class MockRpcServer:
+    def __init__(self, host: str = "127.0.0.1", latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0,
+                 decimals: int = 6, balance: int = 1000 * LAMPORTS_PER_SOL):
+        self.host = host
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.decimals = decimals
+        self.balance = balance
+        self.rng = random.Random(seed)
+
+        self.slot = 250000000
+        self.http_port: Optional[int] = None
+        self.ws_port: Optional[int] = None
+        self.calls: Dict[str, int] = {}
+        self.errors = 0
+        self.sent_signatures: List[str] = []
+        self.landed: Set[str] = set()
+        self.accounts: Dict[str, Dict] = {}  # address -> account
+        self.curves: Dict[str, Tuple[int, int]] = {}  # curve -> token, SOL reserves
+        self.transactions: Dict[str, Dict] = {}  # signature -> getTransaction result
+        self.subscriptions: Dict[str, List[Tuple[object, int]]] = {}  # accountSubscribe
+        self.log_subscriptions: Dict[str, List[Tuple[object, int]]] = {}  # logsSubscribe
+
+        self._sub_ids = itertools.count(1)
+        self._notifications: Set[asyncio.Task] = set()
+        self._http = None
+        self._ws = None
+        self._slot_task = None
+
+    @property
+    def http_url(self) -> str:
+        return f"http://{self.host}:{self.http_port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.ws_port}"
+
+    async def start(self):
+        self._http = await asyncio.start_server(self._handle_http, self.host, 0)
+        self.http_port = self._http.sockets[0].getsockname()[1]
+        self._ws = await websockets.serve(self._handle_ws, self.host, 0)
+        self.ws_port = next(iter(self._ws.sockets)).getsockname()[1]
+        self._slot_task = asyncio.create_task(self._advance_slots())
+
+    async def stop(self):
+        self._slot_task.cancel()
+        await asyncio.gather(self._slot_task, return_exceptions=True)
+        self._ws.close()
+        await self._ws.wait_closed()
+        self._http.close()
+        await self._http.wait_closed()
+
+    def set_account(self, address: str, data: bytes, owner: str,
+                    lamports: int = 1461600):
+        """Serve an account's data from getMultipleAccounts"""
+        self.accounts[address] = {
+            "data": [base64.b64encode(data).decode(), "base64"],
+            "owner": owner,
+            "lamports": lamports,
+            "executable": False,
+            "rentEpoch": 0
+        }
+
+    def add_mint(self, mint: str):
+        """An SPL mint with the server's decimals"""
+        self.set_account(mint, bytes(44) + bytes([self.decimals]) + bytes(37), TOKEN_PROGRAM_ID)
+
+    def add_pump_curve(self, curve: str, token_reserve: int, sol_reserve: int):
+        """A Pump.fun bonding curve with the given virtual reserves"""
+        self.curves[curve] = (token_reserve, sol_reserve)
+        self.set_account(
+            curve,
+            PUMP_CURVE.pack(token_reserve, sol_reserve, token_reserve, sol_reserve,
+                            token_reserve, False),
+            PUMP_PROGRAM_ID
+        )
+
+    async def publish_transaction(self, wallet: str, raw: bytes,
+                                  meta: Optional[Dict] = None) -> int:
+        """
+        Land a signed transaction of ``wallet`` and announce it
+
+        The transaction is stored for getTransaction, then a
+        logsNotification carrying its signature is pushed to every
+        subscription mentioning the wallet.
+        """
+        signature = self._store_transaction(raw, meta)
+        self._land(raw)
+        value = {"signature": signature, "err": None, "logs": []}
+        return await self._push(self.log_subscriptions, wallet, "logsNotification", value)
+
+    async def notify(self, account: str, value: Dict) -> int:
+        """Push an accountNotification to every subscriber of an account"""
+        return await self._push(self.subscriptions, account, "accountNotification", value)
+
+    async def _push(self, subscriptions: Dict[str, List[Tuple[object, int]]],
+                    key: str, method: str, value: Dict) -> int:
+        delivered = 0
+        for websocket, sub_id in list(subscriptions.get(key, [])):
+            message = {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": {
+                    "result": {"context": {"slot": self.slot}, "value": value},
+                    "subscription": sub_id
+                }
+            }
+            try:
+                await websocket.send(json.dumps(message))
+                delivered += 1
+            except websockets.ConnectionClosed:
+                subscriptions[key].remove((websocket, sub_id))
+        return delivered
+
+    def _land(self, raw: bytes):
+        """Apply the Pump.fun trades in a landed transaction to their curves"""
+        try:
+            tx = parse_transaction(raw)
+        except (IndexError, ValueError):
+            return  # Not a transaction, e.g. random bytes from bench_rpc_pool
+        for program_index, accounts, data in tx.instructions:
+            if tx.key_str(program_index) != PUMP_PROGRAM_ID or len(data) < 24:
+                continue
+            curve = tx.key_str(accounts[3])
+            if curve not in self.curves:
+                continue
+            # Buys: tokens out, max SOL in; sells: tokens in, min SOL out
+            tokens, sol = U64_PAIR.unpack_from(data, 8)
+            token_reserve, sol_reserve = self.curves[curve]
+            if bytes(data[:8]) == PUMP_BUY:
+                self.add_pump_curve(curve, token_reserve - tokens, sol_reserve + sol)
+            elif bytes(data[:8]) == PUMP_SELL:
+                self.add_pump_curve(curve, token_reserve + tokens, sol_reserve - sol)
+            else:
+                continue
+            task = asyncio.ensure_future(self.notify(curve, self.accounts[curve]))
+            self._notifications.add(task)
+            task.add_done_callback(self._notifications.discard)
+
+    def _store_transaction(self, raw: bytes, meta: Optional[Dict] = None) -> str:
+        """Record a landed transaction; returns its signature"""
+        signature = b58encode(raw[1:65]).decode()
+        self.transactions[signature] = {
+            "slot": self.slot,
+            "blockTime": None,
+            "transaction": [base64.b64encode(raw).decode(), "base64"],
+            "meta": {
+                "err": None,
+                "status": {"Ok": None},
+                "fee": 5000,
+                "preBalances": [],
+                "postBalances": [],
+                "innerInstructions": [],
+                "logMessages": [],
+                "preTokenBalances": [],
+                "postTokenBalances": [],
+                "rewards": [],
+                "loadedAddresses": {"writable": [], "readonly": []},
+                "computeUnitsConsumed": COMPUTE_UNITS_CONSUMED,
+                **(meta or {})
+            },
+            "version": "legacy"
+        }
+        return signature
+
+    async def _advance_slots(self):
+        while True:
+            await asyncio.sleep(SLOT_TIME)
+            self.slot += 1
+
+    async def _delay(self):
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Minimal keep-alive HTTP/1.1 JSON-RPC endpoint"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value.strip())
+
+                request = json.loads(await reader.readexactly(length)) if length else {}
+                await self._delay()
+                if isinstance(request, list):
+                    response = [self._dispatch(item) for item in request]
+                else:
+                    response = self._dispatch(request)
+
+                body = json.dumps(response).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logging.error(f"Mock RPC request error: {str(e)}")
+        finally:
+            writer.close()
+
+    def _dispatch(self, request: Dict) -> Dict:
+        method = request.get("method", "")
+        params = request.get("params", [])
+        self.calls[method] = self.calls.get(method, 0) + 1
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            response["error"] = {
+                "code": -32005,
+                "message": "Node is behind",
+                "data": {"numSlotsBehind": None}
+            }
+            return response
+
+        handler = getattr(self, f"_rpc_{method}", None)
+        if handler is None:
+            response["error"] = {"code": -32601, "message": "Method not found"}
+        else:
+            response["result"] = handler(params)
+        return response
+
+    def _context(self, value) -> Dict:
+        return {"context": {"slot": self.slot}, "value": value}
+
+    def _rpc_getLatestBlockhash(self, params):
+        blockhash = b58encode(hashlib.sha256(str(self.slot).encode()).digest()).decode()
+        return self._context({
+            "blockhash": blockhash,
+            "lastValidBlockHeight": self.slot + 150
+        })
+
+    def _rpc_getSlot(self, params):
+        return self.slot
+
+    def _rpc_getBlockHeight(self, params):
+        return self.slot
+
+    def _rpc_getBalance(self, params):
+        return self._context(self.balance)
+
+    def _rpc_getMultipleAccounts(self, params):
+        return self._context([self.accounts.get(address) for address in params[0]])
+
+    def _rpc_getTokenAccountsByOwner(self, params):
+        return self._context([])
+
+    def _rpc_sendTransaction(self, params):
+        raw = base64.b64decode(params[0])
+        signature = b58encode(raw[1:65]).decode()
+        if signature not in self.landed:
+            self._store_transaction(raw)
+            self.sent_signatures.append(signature)
+            self.landed.add(signature)
+            self._land(raw)
+        return signature
+
+    def _rpc_simulateTransaction(self, params):
+        return self._context({
+            "err": None, "logs": [], "accounts": None,
+            "unitsConsumed": COMPUTE_UNITS_CONSUMED, "returnData": None
+        })
+
+    def _rpc_getSignatureStatuses(self, params):
+        return self._context([
+            {"slot": self.transactions[signature]["slot"], "confirmations": 0,
+             "status": {"Ok": None}, "err": None, "confirmationStatus": "confirmed"}
+            if signature in self.landed else None
+            for signature in params[0]
+        ])
+
+    def _rpc_getSignaturesForAddress(self, params):
+        return []
+
+    def _rpc_getTransaction(self, params):
+        return self.transactions.get(params[0])
+
+    def _rpc_getRecentPrioritizationFees(self, params):
+        return [
+            {"slot": self.slot - i, "prioritizationFee": int(self.rng.lognormvariate(9, 1))}
+            for i in range(150)
+        ]
+
+    async def _handle_ws(self, websocket, path: Optional[str] = None):
+        """Serve *Subscribe / *Unsubscribe requests on one websocket"""
+        subscribed: List[Tuple[str, int]] = []
+        try:
+            async for raw in websocket:
+                request = json.loads(raw)
+                method = request.get("method", "")
+                params = request.get("params", [])
+
+                if method.endswith("Unsubscribe"):
+                    sub_id = params[0]
+                    for table, account, owned in list(subscribed):
+                        if owned == sub_id:
+                            table[account].remove((websocket, sub_id))
+                            subscribed.remove((table, account, owned))
+                    result = True
+                elif method == "logsSubscribe":
+                    # Only {"mentions": [address]} filters are served
+                    account = params[0]["mentions"][0]
+                    result = next(self._sub_ids)
+                    self.log_subscriptions.setdefault(account, []).append((websocket, result))
+                    subscribed.append((self.log_subscriptions, account, result))
+                elif method.endswith("Subscribe"):
+                    account = params[0] if params else method
+                    result = next(self._sub_ids)
+                    self.subscriptions.setdefault(account, []).append((websocket, result))
+                    subscribed.append((self.subscriptions, account, result))
+                else:
+                    result = None
+
+                await websocket.send(json.dumps(
+                    {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+                ))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for table, account, sub_id in subscribed:
+                entries = table.get(account, [])
+                if (websocket, sub_id) in entries:
+                    entries.remove((websocket, sub_id))
@@ -0,0 +1,92 @@
+from solana.rpc.async_api import AsyncClient
+from solana.transaction import Transaction
+from solders.signature import Signature
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+import asyncio
+import logging
+import math
+
+MAX_COMPUTE_UNITS = 1400000
+
+RouteKey = Tuple[str, int, str]
+
+class ComputeUnitProfiles:
+    def __init__(self, client: AsyncClient, percentile: float = 99.0,
+                 headroom: float = 0.1, min_samples: int = 1, window: int = 500):
+        """
+        Learned compute-unit limits per swap route
+
+        Routes are keyed by program id and instruction shape. Limits are the
+        chosen percentile of observed ``unitsConsumed`` plus headroom.
+
+        :param percentile: Percentile of observed usage to cover (0-100)
+        :param headroom: Fractional margin added on top of the percentile
+        :param min_samples: Samples required before a limit is returned
+        """
+        self.client = client
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.window = window
+        self.samples: Dict[RouteKey, Deque[int]] = {}
+        self.limits: Dict[RouteKey, int] = {}
+
+    @staticmethod
+    def route_key(instruction) -> RouteKey:
+        """Program id, account count and 8-byte discriminator of an instruction"""
+        return (
+            str(instruction.program_id),
+            len(instruction.accounts),
+            bytes(instruction.data[:8]).hex()
+        )
+
+    def record(self, key: RouteKey, units_consumed: int):
+        """Add an observed unitsConsumed sample and refresh the route limit"""
+        samples = self.samples.setdefault(key, deque(maxlen=self.window))
+        samples.append(units_consumed)
+        if len(samples) >= self.min_samples:
+            self.limits[key] = self._limit(samples)
+
+    def get_limit(self, key: RouteKey) -> Optional[int]:
+        """Return the learned limit for a route, or None if it is unseen"""
+        return self.limits.get(key)
+
+    async def simulate(self, key: RouteKey, tx: Transaction) -> Optional[int]:
+        """Simulate an unseen route once and cache its usage"""
+        try:
+            response = await self.client.simulate_transaction(tx, sig_verify=False)
+            units = response['result']['value']['unitsConsumed']
+        except Exception as e:
+            logging.error(f"Compute unit simulation error: {str(e)}")
+            return None
+
+        # One simulation is enough to serve a limit for the route
+        self.samples.setdefault(key, deque(maxlen=self.window)).append(units)
+        self.limits[key] = self._limit(self.samples[key])
+        return self.limits[key]
+
+    async def record_confirmed(self, key: RouteKey, signature: str,
+                               attempts: int = 5, delay: float = 2.0):
+        """Wait for one of our transactions to confirm and record its unitsConsumed"""
+        for _ in range(attempts):
+            await asyncio.sleep(delay)
+            try:
+                response = await self.client.get_transaction(
+                    Signature.from_string(signature),
+                    commitment="confirmed",
+                    max_supported_transaction_version=0
+                )
+                if response['result'] is None:
+                    continue
+                self.record(key, response['result']['meta']['computeUnitsConsumed'])
+                return
+            except Exception as e:
+                logging.error(f"Compute unit lookup error for {signature}: {str(e)}")
+                return
+
+    def _limit(self, samples: Deque[int]) -> int:
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, math.ceil(len(ordered) * self.percentile / 100) - 1)
+        limit = int(ordered[max(index, 0)] * (1 + self.headroom))
+        return min(limit, MAX_COMPUTE_UNITS)
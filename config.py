@@ -1,31 +1,92 @@
-```python
-from typing import Optional
+from typing import List, Optional, Union
 from dataclasses import dataclass
 
 @dataclass
 class BotConfig:
     # RPC and network settings
-    rpc_url: str = "https://api.mainnet-beta.solana.com"
+    rpc_url: Union[str, List[str]] = "https://api.mainnet-beta.solana.com"  # One or more endpoints
+    ws_url: Optional[Union[str, List[str]]] = None  # Defaults to rpc_url with a ws:// scheme
     commitment: str = "confirmed"
+    notification_encoding: str = "base64"  # getTransaction encoding: base64 for binary decoders, or jsonParsed
+    rpc_send_fanout: int = 3  # Endpoints each transaction is raced across
+    rpc_failure_threshold: int = 5  # Consecutive failures before an endpoint is skipped
+    rpc_cooldown: float = 10.0  # Seconds a failing endpoint is skipped for
+    confirmation_poll_interval: float = 0.4  # Seconds between batched status polls
+    rebroadcast_interval: float = 0.3  # Seconds between resends of unconfirmed trades
+    tx_template_cache_size: int = 1024  # Swap message templates kept per (route, mint, side)
+    signing_threads: int = 2  # Threads signing transactions off the event loop
+    balance_reconcile_interval: float = 30.0  # Seconds between full balance re-reads
     
     # Wallet settings
     private_key: str = ""  # Supports base58, hex, or JSON format
     target_wallets: str = ""  # Comma-separated wallet addresses
+    wallets_file: Optional[str] = None  # Hot-reloaded JSON wallets and settings; replaces target_wallets
+    wallets_reload_interval: float = 1.0  # Seconds between wallets file checks
     
     # Trading parameters
     trade_size_sol: float = 0.1
     slippage_tolerance: Optional[float] = None  # None for auto-calculation
+    volatility_window: int = 20  # Prices kept per token for auto slippage
+    base_slippage: float = 0.5
+    volatility_multiplier: float = 2.0
+    max_slippage: float = 5.0
+    pool_stale_slots: int = 10  # Reload unsubscribed pool state older than this many slots
+    pool_idle_ttl: float = 600.0  # Seconds before an unused pool we hold nothing of is dropped
     
     # Risk management
     stop_loss_percentage: float = 5.0
     take_profit_percentage: Optional[float] = None
+    risk_check_interval: float = 0.4  # Seconds between stop-loss / take-profit checks
+    max_total_exposure_sol: Optional[float] = None  # Cap on SOL in open positions, all shards
+    max_mint_exposure_sol: Optional[float] = None  # Cap per mint on coalesced buys
+    sol_reserve: float = 0.01  # SOL never spent on buys, kept for fees and rent
     
     # Gas settings
     base_priority_fee: int = 10000
     base_compute_units: int = 200000
     gas_multiplier: float = 1.0
+    priority_fee_percentile: float = 75.0  # Percentile of recent fees to target
+    min_priority_fee: int = 1000  # Micro-lamports per compute unit
+    max_priority_fee: int = 1000000
+    fee_refresh_interval: float = 2.0  # Seconds between fee samples
+    compute_unit_percentile: float = 99.0  # Percentile of observed CU usage to cover
+    compute_unit_headroom: float = 0.1  # Margin added to learned CU limits
+    simulate_unseen_routes: bool = False  # Simulate once to learn CU for new routes
+    
+    # Signal pipeline settings
+    signal_queue_size: int = 1000
+    trade_workers: int = 4
+    queue_overflow_policy: str = "drop_oldest"  # drop_oldest, drop_newest or block
+    coalesce_window: float = 0.0  # Seconds to merge same-mint signals; 0 disables
+    
+    # Multi-process sharding
+    shards: int = 1  # Worker processes target wallets are split across
+    worker_heartbeat_timeout: float = 10.0  # Seconds of silence before a worker is restarted
+    shared_position_capacity: int = 4096  # Slots in the shared position table
+    
+    # Latency metrics settings
+    metrics_port: Optional[int] = 9108  # None disables the /metrics endpoint
+    latency_summary_interval: float = 60.0  # Seconds between summary log lines
+    
+    # Notification capture for offline replay
+    capture_file: Optional[str] = None
+    
+    # Warm-restart state
+    state_file: Optional[str] = "bot_state.db"  # None disables persistence
+    state_snapshot_interval: float = 1.0  # Seconds between price / volatility snapshots
+    
+    # Token cache settings
+    hot_mints: str = ""  # Comma-separated mints to pre-warm at startup
+    token_cache_size: int = 1024
+    token_cache_ttl: float = 3600.0
     
     def __post_init__(self):
+        # Accept a list or comma-separated string of endpoints
+        if isinstance(self.rpc_url, str):
+            self.rpc_url = [url.strip() for url in self.rpc_url.split(',') if url.strip()]
+        if isinstance(self.ws_url, str):
+            self.ws_url = [url.strip() for url in self.ws_url.split(',') if url.strip()]
+        
         # Process comma-separated wallet addresses
         if self.target_wallets:
             self.target_wallets = [
@@ -33,14 +94,40 @@ class BotConfig:
             ]
         else:
             self.target_wallets = []
+        
+        if self.hot_mints:
+            self.hot_mints = [
+                mint.strip() for mint in self.hot_mints.split(',')
+            ]
+        else:
+            self.hot_mints = []
     
     def validate(self):
         """Validate configuration parameters"""
+        assert self.rpc_url, "At least one RPC endpoint is required"
+        assert self.rpc_send_fanout >= 1, "RPC send fanout must be at least 1"
         assert self.private_key, "Private key is required"
-        assert self.target_wallets, "At least one target wallet is required"
+        assert self.target_wallets or self.wallets_file, "At least one target wallet is required"
         assert self.trade_size_sol > 0, "Trade size must be positive"
         assert self.stop_loss_percentage > 0, "Stop loss must be positive"
         assert self.gas_multiplier >= 0.1, "Gas multiplier must be at least 0.1x"
+        assert 0 <= self.priority_fee_percentile <= 100, "Invalid priority fee percentile"
+        assert 0 <= self.min_priority_fee <= self.max_priority_fee, "Invalid priority fee caps"
+        assert self.signal_queue_size > 0, "Signal queue size must be positive"
+        assert self.trade_workers > 0, "At least one trade worker is required"
+        assert self.signing_threads > 0, "At least one signing thread is required"
+        assert self.coalesce_window >= 0, "Coalesce window cannot be negative"
+        assert self.shards >= 1, "At least one shard is required"
+        assert self.state_snapshot_interval > 0, "State snapshot interval must be positive"
+        assert self.balance_reconcile_interval > 0, "Balance reconcile interval must be positive"
+        assert self.pool_idle_ttl > 0, "Pool idle TTL must be positive"
+        assert self.sol_reserve >= 0, "SOL reserve cannot be negative"
+        assert self.worker_heartbeat_timeout > 0, "Worker heartbeat timeout must be positive"
+        if self.max_total_exposure_sol is not None:
+            assert self.max_total_exposure_sol > 0, "Exposure limit must be positive"
+        assert self.queue_overflow_policy in ("drop_oldest", "drop_newest", "block"), \
+            "Invalid queue overflow policy"
+        assert self.volatility_window >= 2, "Volatility window must hold at least 2 prices"
+        assert 0 < self.max_slippage <= 100, "Invalid max slippage"
         if self.slippage_tolerance is not None:
             assert 0 < self.slippage_tolerance <= 100, "Invalid slippage tolerance"
-```
\ No newline at end of file
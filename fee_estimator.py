@@ -0,0 +1,166 @@
+from solana.rpc.async_api import AsyncClient
+from collections import OrderedDict, deque
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional
+import asyncio
+import logging
+import random
+import time
+
+class RpcFeeSource:
+    """Samples getRecentPrioritizationFees from the RPC node"""
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+
+    async def fetch(self, accounts: List[str]) -> List[int]:
+        """Return recent per-slot priority fees (micro-lamports per CU)"""
+        provider = self.client._provider
+        response = await provider.session.post(
+            provider.endpoint_uri,
+            json={
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "getRecentPrioritizationFees",
+                "params": [accounts]
+            }
+        )
+        response.raise_for_status()
+        return [entry['prioritizationFee'] for entry in response.json()['result']]
+
+class SimulatedFeeSource:
+    """
+    Deterministic offline stand-in for RpcFeeSource
+
+    Produces the same fee samples for the same seed and call sequence.
+    """
+
+    def __init__(self, seed: int = 0, base_fee: int = 10000, spread: float = 1.0,
+                 samples_per_call: int = 150):
+        self.rng = random.Random(seed)
+        self.base_fee = base_fee
+        self.spread = spread
+        self.samples_per_call = samples_per_call
+
+    async def fetch(self, accounts: List[str]) -> List[int]:
+        return [
+            int(self.base_fee * self.rng.lognormvariate(0, self.spread))
+            for _ in range(self.samples_per_call)
+        ]
+
+class PriorityFeeEstimator:
+    def __init__(self, source, percentile: float = 75.0, min_fee: int = 0,
+                 max_fee: Optional[int] = None, window: int = 600,
+                 refresh_interval: float = 2.0, max_keys: int = 256,
+                 ttl: float = 300.0):
+        """
+        Rolling priority fee estimator keyed by the set of writable accounts
+
+        :param source: Fee source with an async fetch(accounts) method
+        :param percentile: Target percentile of recent fees (0-100)
+        :param window: Fee samples kept per account set
+        :param max_keys: Account sets tracked at once, least recently used
+                         evicted first
+        :param ttl: Seconds an account set is sampled after its last lookup
+        """
+        self.source = source
+        self.percentile = percentile
+        self.min_fee = min_fee
+        self.max_fee = max_fee
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self.max_keys = max(1, max_keys)
+        self.ttl = ttl
+
+        self.samples: "OrderedDict[FrozenSet[str], Deque[int]]" = OrderedDict()
+        self.targets: Dict[FrozenSet[str], int] = {}
+        self.last_used: Dict[FrozenSet[str], float] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start background refresh"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def get_fee(self, accounts: Iterable[str]) -> Optional[int]:
+        """
+        Return the cached fee target for an account set without awaiting
+
+        Unknown account sets are tracked from now on and return None until
+        the background task has sampled them.
+        """
+        key = frozenset(str(account) for account in accounts)
+        if key in self.samples:
+            self.samples.move_to_end(key)
+        else:
+            self.samples[key] = deque(maxlen=self.window)
+            while len(self.samples) > self.max_keys:
+                self._forget(next(iter(self.samples)))
+            self._wake.set()
+        self.last_used[key] = time.monotonic()
+        return self.targets.get(key)
+
+    def clamp(self, fee: float) -> int:
+        fee = max(self.min_fee, int(fee))
+        if self.max_fee is not None:
+            fee = min(fee, self.max_fee)
+        return fee
+
+    async def refresh(self, new_only: bool = False):
+        """
+        Sample tracked account sets and recompute their targets
+
+        With ``new_only``, only sets that have no samples yet are sampled.
+        """
+        self.expire()
+        for key, samples in list(self.samples.items()):
+            if new_only and samples:
+                continue
+            try:
+                samples.extend(await self.source.fetch(sorted(key)))
+            except Exception as e:
+                logging.error(f"Priority fee sampling error: {str(e)}")
+                continue
+            if samples and key in self.samples:
+                self.targets[key] = self.clamp(self._percentile(samples))
+
+    def expire(self):
+        """Stop sampling account sets not looked up within ``ttl`` seconds"""
+        cutoff = time.monotonic() - self.ttl
+        for key in [k for k, used in self.last_used.items() if used < cutoff]:
+            self._forget(key)
+
+    def _forget(self, key: FrozenSet[str]):
+        self.samples.pop(key, None)
+        self.targets.pop(key, None)
+        self.last_used.pop(key, None)
+
+    def _percentile(self, samples: Iterable[int]) -> float:
+        ordered = sorted(samples)
+        rank = (len(ordered) - 1) * self.percentile / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+    async def _run(self):
+        # New account sets wake the task early; only they are sampled then
+        next_refresh = 0.0
+        while True:
+            self._wake.clear()
+            if time.monotonic() >= next_refresh:
+                await self.refresh()
+                next_refresh = time.monotonic() + self.refresh_interval
+            else:
+                await self.refresh(new_only=True)
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), max(0.0, next_refresh - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                pass
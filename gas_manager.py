@@ -1,37 +1,59 @@
-from typing import Dict
+from typing import Dict, Iterable, Optional
 import logging
+from fee_estimator import PriorityFeeEstimator
 
 class GasManager:
-    def __init__(self, base_gas: Dict[str, int]):
+    def __init__(self, base_gas: Dict[str, int],
+                 fee_estimator: Optional[PriorityFeeEstimator] = None):
         """
         Initialize GasManager with base gas settings
         
         :param base_gas: Dict with 'priority_fee' and 'compute_units'
+        :param fee_estimator: Optional estimator for market priority fees
         """
         self.base_gas = base_gas
+        self.fee_estimator = fee_estimator
         
-    def calculate_gas(self, multiplier: float = 1.0) -> Dict[str, int]:
+    def calculate_gas(self, multiplier: float = 1.0,
+                      accounts: Optional[Iterable[str]] = None,
+                      compute_units: Optional[int] = None) -> Dict[str, int]:
         """
         Calculate gas parameters using multiplier
         
         :param multiplier: Gas multiplier (e.g., 1.5 = 150% of base gas)
+        :param accounts: Writable accounts of the transaction, used to look
+                         up the estimated priority fee
+        :param compute_units: Learned compute-unit limit for the route; used
+                              as-is instead of scaling the base units
         :return: Dict with adjusted priority_fee and compute_units
         """
         try:
             # Ensure multiplier is at least 0.1x
             multiplier = max(0.1, multiplier)
             
+            # Prefer the estimated market fee, fall back to the base fee
+            priority_fee = self.base_gas["priority_fee"] * multiplier
+            if self.fee_estimator is not None and accounts is not None:
+                estimate = self.fee_estimator.get_fee(accounts)
+                if estimate is not None:
+                    priority_fee = self.fee_estimator.clamp(estimate * multiplier)
+            
+            # The fee is paid per requested unit, so a learned limit is never
+            # inflated by the multiplier
+            if compute_units is None:
+                compute_units = self.base_gas["compute_units"] * multiplier
+            
             # Calculate adjusted gas values
             gas = {
-                "priority_fee": int(self.base_gas["priority_fee"] * multiplier),
-                "compute_units": int(self.base_gas["compute_units"] * multiplier)
+                "priority_fee": int(priority_fee),
+                "compute_units": int(compute_units)
             }
             
-            # Log gas settings
-            logging.info(f"Gas Settings:")
-            logging.info(f"  Multiplier: {multiplier}x")
-            logging.info(f"  Priority Fee: {gas['priority_fee']} lamports")
-            logging.info(f"  Compute Units: {gas['compute_units']}")
+            # Log gas settings; called once per trade on the live path
+            logging.debug(f"Gas Settings:")
+            logging.debug(f"  Multiplier: {multiplier}x")
+            logging.debug(f"  Priority Fee: {gas['priority_fee']} lamports")
+            logging.debug(f"  Compute Units: {gas['compute_units']}")
             
             return gas
             
@@ -1,44 +1,117 @@
-```python
 import asyncio
-from solana.rpc.async_api import AsyncClient
+import copy
+from typing import Optional
 from config import BotConfig
 from trading.dex_trader import DexTrader
+from trading.risk_engine import RiskEngine
+from trading.signal_queue import SignalQueue
+from trading.supervisor import ShardSupervisor
 from trading.transaction_monitor import TransactionMonitor
+from utils.capture import CaptureWriter
+from utils.metrics_server import (
+    MetricsServer, render_balances, render_coalescer, render_rpc_pool, render_tracer
+)
+from utils.rpc_pool import RpcPool
+from utils.shared_positions import SharedPositionTable
 from utils.trade_logger import TradeLogger
 
-async def main():
-    # Initialize configuration
-    config = BotConfig(
-        rpc_url="https://cold-hanni-fast-mainnet.helius-rpc.com/",
-        target_wallets="wallet1,wallet2,wallet3",  # Comma-separated addresses
-        private_key="YOUR_PRIVATE_KEY",
-        trade_size_sol=0.1,
-        stop_loss_percentage=20,
-        gas_multiplier=1.5
-    )
-    
-    # Validate configuration
-    config.validate()
+def shard_path(path: str, shard: int) -> str:
+    """Per-shard file name, e.g. trades.jsonl -> trades.1.jsonl"""
+    stem, dot, ext = path.rpartition('.')
+    return f"{stem}.{shard}.{ext}" if dot else f"{path}.{shard}"
+
+async def run_bot(config: BotConfig, position_table: Optional[SharedPositionTable] = None,
+                  shard: int = 0):
+    """Run the bot for ``config.target_wallets`` in this process"""
+    sharded = position_table is not None
+    log_file, journal_file = 'trading_bot.log', 'trades.jsonl'
+    capture_file = config.capture_file
+    metrics_port = config.metrics_port
+    if sharded:
+        log_file, journal_file = shard_path(log_file, shard), shard_path(journal_file, shard)
+        capture_file = capture_file and shard_path(capture_file, shard)
+        metrics_port = metrics_port and metrics_port + shard
+        config = copy.copy(config)
+        config.state_file = config.state_file and shard_path(config.state_file, shard)
     
     # Initialize components
-    client = AsyncClient(config.rpc_url)
-    logger = TradeLogger()
-    trader = DexTrader(client, config, logger)
-    monitor = TransactionMonitor(client, config.target_wallets, trader)
+    client = RpcPool.from_config(config)
+    logger = TradeLogger(log_file, journal_file)
+    trader = DexTrader(client, config, logger, position_table=position_table, shard=shard)
+    signal_queue = SignalQueue.from_config(trader, config)
+    risk_engine = RiskEngine(trader, config.risk_check_interval)
+    recorder = CaptureWriter(capture_file) if capture_file else None
+    monitor = TransactionMonitor(
+        client, trader.wallets.wallets(), signal_queue, tracer=trader.tracer,
+        recorder=recorder, ws_url=config.ws_url,
+        encoding=config.notification_encoding
+    )
+    metrics = MetricsServer(port=metrics_port)
+    metrics.add_collector(lambda: render_tracer(trader.tracer))
+    metrics.add_collector(lambda: render_rpc_pool(client))
+    metrics.add_collector(lambda: render_balances(trader.balances))
+    coalescer = signal_queue.coalescer
+    if coalescer is not None:
+        metrics.add_collector(lambda: render_coalescer(coalescer))
     
     # Start monitoring
-    logger.logger.info(f"Starting bot with {len(config.target_wallets)} target wallets")
+    if sharded:
+        logger.logger.info(f"Shard {shard} starting")
+    logger.logger.info(f"Starting bot with {len(monitor.target_wallets)} target wallets")
     logger.logger.info(f"Gas multiplier: {config.gas_multiplier}x")
+    logger.logger.info(f"RPC endpoints: {', '.join(client.endpoint_uris)}")
+    
+    trader.token_cache.attach(monitor.accounts)
+    trader.quote_engine.attach(monitor.accounts)
+    trader.balances.attach(monitor.accounts)
+    trader.wallets.attach(monitor.update_wallets)
     
     try:
+        await trader.token_cache.prewarm(config.hot_mints)
+        await trader.balances.seed()
+        trader.start()
+        signal_queue.start()
+        risk_engine.start()
+        trader.tracer.start_summary(config.latency_summary_interval)
+        if metrics_port is not None:
+            await metrics.start()
         await monitor.start_monitoring()
     except KeyboardInterrupt:
         logger.logger.info("Shutting down bot...")
     except Exception as e:
         logger.logger.error(f"Error: {str(e)}")
     finally:
+        await metrics.stop()
+        await trader.tracer.stop()
+        await risk_engine.stop()
+        await signal_queue.stop()
+        if coalescer is not None:
+            logger.logger.info(f"Signal coalescing: {coalescer.summary()}")
+        await trader.stop()
         await client.close()
+        if recorder is not None:
+            recorder.close()
+        logger.close()
+
+async def main():
+    # Initialize configuration
+    config = BotConfig(
+        rpc_url="https://cold-hanni-fast-mainnet.helius-rpc.com/",
+        target_wallets="wallet1,wallet2,wallet3",  # Comma-separated addresses
+        private_key="YOUR_PRIVATE_KEY",
+        trade_size_sol=0.1,
+        stop_loss_percentage=20,
+        gas_multiplier=1.5
+    )
+    
+    # Validate configuration
+    config.validate()
+    
+    # Split wallets across worker processes, or run in this one
+    if config.shards > 1:
+        await ShardSupervisor.from_config(config).run()
+    else:
+        await run_bot(config)
 
 if __name__ == "__main__":
     asyncio.run(main())
-```
\ No newline at end of file
@@ -1,55 +1,188 @@
-from typing import Dict
+from typing import Dict, List, Sequence
 import logging
 from decimal import Decimal
+import numpy as np
 
 class SlippageCalculator:
-    def __init__(self):
-        self.price_history: Dict[str, list] = {}  # Token price history
-        self.volatility_window = 20  # Number of prices to calculate volatility
-        
+    def __init__(self, volatility_window: int = 20, min_samples: int = 5,
+                 base_slippage: float = 0.5, volatility_multiplier: float = 2.0,
+                 max_slippage: float = 5.0, default_slippage: float = 1.0,
+                 initial_capacity: int = 256):
+        self.volatility_window = volatility_window  # Number of prices to calculate volatility
+        self.min_samples = min_samples
+        self.base_slippage = base_slippage
+        self.volatility_multiplier = volatility_multiplier
+        self.max_slippage = max_slippage
+        self.default_slippage = default_slippage
+
+        # One preallocated ring buffer row per token, with running
+        # Welford mean / M2 so updates never rescan the window
+        self.token_rows: Dict[str, int] = {}
+        self._prices = np.zeros((initial_capacity, volatility_window))
+        self._head = np.zeros(initial_capacity, dtype=np.int64)
+        self._count = np.zeros(initial_capacity, dtype=np.int64)
+        self._mean = np.zeros(initial_capacity)
+        self._m2 = np.zeros(initial_capacity)
+
+    @classmethod
+    def from_config(cls, config: 'BotConfig') -> 'SlippageCalculator':
+        return cls(
+            volatility_window=config.volatility_window,
+            base_slippage=config.base_slippage,
+            volatility_multiplier=config.volatility_multiplier,
+            max_slippage=config.max_slippage
+        )
+
     async def calculate_auto_slippage(self, token: str, current_price: Decimal) -> float:
         """
         Calculate optimal slippage based on token volatility
         Returns slippage percentage
         """
         try:
-            # Update price history
-            if token not in self.price_history:
-                self.price_history[token] = []
-            
-            self.price_history[token].append(float(current_price))
-            
-            # Keep only recent prices
-            if len(self.price_history[token]) > self.volatility_window:
-                self.price_history[token].pop(0)
-            
-            # Need minimum number of prices for calculation
-            if len(self.price_history[token]) < 5:
-                return 1.0  # Default slippage when not enough data
-            
-            # Calculate price volatility
-            prices = self.price_history[token]
-            volatility = self._calculate_volatility(prices)
-            
-            # Adjust slippage based on volatility
-            # Higher volatility = higher slippage
-            base_slippage = 0.5
-            volatility_multiplier = 2.0
-            
-            slippage = base_slippage + (volatility * volatility_multiplier)
-            
-            # Cap maximum slippage
-            return min(slippage, 5.0)  # Max 5% slippage
-            
+            self.update_price(token, float(current_price))
+            return self.get_slippage(token)
+
         except Exception as e:
             logging.error(f"Error calculating slippage: {str(e)}")
-            return 1.0  # Default fallback slippage
-            
-    def _calculate_volatility(self, prices: list) -> float:
-        """Calculate price volatility using standard deviation"""
-        if not prices:
-            return 0
-            
-        mean = sum(prices) / len(prices)
-        variance = sum((p - mean) ** 2 for p in prices) / len(prices)
-        return (variance ** 0.5) / mean  # Coefficient of variation
\ No newline at end of file
+            return self.default_slippage  # Default fallback slippage
+
+    def update_price(self, token: str, price: float):
+        """Push one price into the token's window in O(1)"""
+        # Same Welford step as update_prices, on Python floats; the array
+        # path costs more in setup than the arithmetic for one token
+        row = self._row(token)
+        window = self.volatility_window
+        head = int(self._head[row])
+        count = int(self._count[row])
+        mean = float(self._mean[row])
+        x = float(price)
+
+        if count >= window:
+            old = float(self._prices[row, head])
+            n = window
+            delta = x - old
+            new_mean = mean + delta / n
+            m2 = float(self._m2[row]) + delta * (x - new_mean + old - mean)
+        else:
+            n = count + 1
+            delta = x - mean
+            new_mean = mean + delta / n
+            m2 = float(self._m2[row]) + delta * (x - new_mean)
+
+        self._m2[row] = max(m2, 0.0)
+        self._mean[row] = new_mean
+        self._count[row] = n
+        self._prices[row, head] = x
+        self._head[row] = (head + 1) % window
+
+    def update_prices(self, tokens: Sequence[str], prices: Sequence[float]) -> np.ndarray:
+        """
+        Push a price snapshot for many tokens in one vectorized pass
+        Returns the resulting slippage for each token
+        """
+        # Last price wins if a token appears twice in the snapshot
+        snapshot = dict(zip(tokens, prices))
+        rows = np.fromiter(
+            (self._row(token) for token in snapshot), dtype=np.int64, count=len(snapshot)
+        )
+        x = np.fromiter(snapshot.values(), dtype=np.float64, count=len(snapshot))
+
+        head = self._head[rows]
+        count = self._count[rows]
+        mean = self._mean[rows]
+        full = count >= self.volatility_window
+
+        # Growing window: standard Welford step
+        # Full window: replace the oldest price in place
+        old = self._prices[rows, head]
+        n = np.where(full, self.volatility_window, count + 1)
+        delta = np.where(full, x - old, x - mean)
+        new_mean = mean + delta / n
+        m2 = self._m2[rows] + np.where(
+            full,
+            delta * (x - new_mean + old - mean),
+            delta * (x - new_mean)
+        )
+        self._m2[rows] = np.maximum(m2, 0.0)  # Guard against rounding drift
+
+        self._mean[rows] = new_mean
+        self._count[rows] = n
+        self._prices[rows, head] = x
+        self._head[rows] = (head + 1) % self.volatility_window
+
+        return self._slippage(rows)
+
+    def restore_window(self, token: str, prices: Sequence[float]):
+        """Replace a token's window with saved prices, oldest first"""
+        prices = np.asarray(prices, dtype=np.float64)[-self.volatility_window:]
+        row = self._row(token)
+        count = len(prices)
+        self._prices[row, :count] = prices
+        self._head[row] = count % self.volatility_window
+        self._count[row] = count
+        self._mean[row] = prices.mean() if count else 0.0
+        self._m2[row] = ((prices - self._mean[row]) ** 2).sum()
+
+    def get_slippage(self, token: str) -> float:
+        """Slippage percentage for a token from its current window"""
+        row = self.token_rows.get(token)
+        if row is None:
+            return self.default_slippage
+        count = int(self._count[row])
+        if count < self.min_samples:
+            return self.default_slippage
+        mean = float(self._mean[row])
+        volatility = (float(self._m2[row]) / count) ** 0.5 / mean if mean > 0 else 0.0
+        return min(self.base_slippage + volatility * self.volatility_multiplier,
+                   self.max_slippage)
+
+    def get_price_history(self, token: str) -> List[float]:
+        """Prices in the token's window, oldest first"""
+        row = self.token_rows.get(token)
+        if row is None:
+            return []
+        count = int(self._count[row])
+        start = int(self._head[row]) - count
+        indices = np.arange(start, start + count) % self.volatility_window
+        return self._prices[row, indices].tolist()
+
+    @property
+    def price_history(self) -> Dict[str, List[float]]:
+        return {token: self.get_price_history(token) for token in self.token_rows}
+
+    def _slippage(self, rows: np.ndarray) -> np.ndarray:
+        """Higher volatility = higher slippage, capped at max_slippage"""
+        count = self._count[rows]
+        slippage = np.minimum(
+            self.base_slippage + self._volatility(rows) * self.volatility_multiplier,
+            self.max_slippage
+        )
+        # Need minimum number of prices for calculation
+        return np.where(count < self.min_samples, self.default_slippage, slippage)
+
+    def _volatility(self, rows: np.ndarray) -> np.ndarray:
+        """Calculate price volatility as the coefficient of variation"""
+        count = np.maximum(self._count[rows], 1)
+        mean = self._mean[rows]
+        std = np.sqrt(self._m2[rows] / count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(mean > 0, std / mean, 0.0)
+
+    def _row(self, token: str) -> int:
+        """Return the ring buffer row for a token, allocating one if needed"""
+        row = self.token_rows.get(token)
+        if row is None:
+            row = len(self.token_rows)
+            if row >= len(self._head):
+                self._grow()
+            self.token_rows[token] = row
+        return row
+
+    def _grow(self):
+        """Double row capacity"""
+        extra = len(self._head)
+        self._prices = np.vstack([self._prices, np.zeros((extra, self.volatility_window))])
+        self._head = np.concatenate([self._head, np.zeros(extra, dtype=np.int64)])
+        self._count = np.concatenate([self._count, np.zeros(extra, dtype=np.int64)])
+        self._mean = np.concatenate([self._mean, np.zeros(extra)])
+        self._m2 = np.concatenate([self._m2, np.zeros(extra)])
@@ -0,0 +1,102 @@
+import asyncio
+import base64
+import struct
+
+import pytest
+from solders.pubkey import Pubkey
+
+from utils.balance_ledger import LAMPORTS_PER_SOL, BalanceLedger
+from utils.mock_client import MockAsyncClient
+from utils.shared_positions import SharedPositionTable
+
+OWNER = Pubkey.new_unique()
+MINT = Pubkey.new_unique()
+ACCOUNT = str(Pubkey.new_unique())
+
+
+def account_notification(slot, lamports=None, amount=None):
+    value = {'lamports': lamports or 2039280}
+    if amount is not None:
+        data = bytes(MINT) + bytes(OWNER) + struct.pack("<Q", amount) + bytes(93)
+        value['data'] = [base64.b64encode(data).decode(), 'base64']
+    return {'context': {'slot': slot}, 'value': value}
+
+
+def notify(ledger, account, notification):
+    asyncio.run(ledger.on_account_change(account, notification))
+
+
+def test_older_notifications_never_replace_newer_balances():
+    ledger = BalanceLedger(MockAsyncClient(), OWNER)
+    notify(ledger, str(OWNER), account_notification(10, lamports=5 * LAMPORTS_PER_SOL))
+    notify(ledger, str(OWNER), account_notification(9, lamports=1))
+    assert ledger.lamports == 5 * LAMPORTS_PER_SOL
+    assert ledger.lamports_slot == 10
+
+    notify(ledger, ACCOUNT, account_notification(10, amount=700))
+    notify(ledger, ACCOUNT, account_notification(8, amount=100))
+    assert ledger.token(str(MINT)) == 700
+
+    # A closed account at a newer slot zeroes the balance
+    notify(ledger, ACCOUNT, {'context': {'slot': 11}, 'value': {'lamports': 0, 'data': None}})
+    assert ledger.token_account(ACCOUNT) == 0
+
+
+def test_trade_results_apply_only_ahead_of_notifications():
+    ledger = BalanceLedger(MockAsyncClient(), OWNER)
+    notify(ledger, str(OWNER), account_notification(10, lamports=LAMPORTS_PER_SOL))
+    notify(ledger, ACCOUNT, account_notification(10, amount=0))
+
+    # The notification for slot 12 already includes this trade
+    notify(ledger, str(OWNER), account_notification(12, lamports=LAMPORTS_PER_SOL - 1005000))
+    notify(ledger, ACCOUNT, account_notification(12, amount=500))
+    ledger.apply_trade(ACCOUNT, True, 1000000, 500, 5000, slot=12)
+    assert ledger.lamports == LAMPORTS_PER_SOL - 1005000
+    assert ledger.token_account(ACCOUNT) == 500
+
+    # A trade landing after the last notification is applied once
+    ledger.apply_trade(ACCOUNT, False, 200, 300000, 5000, slot=13)
+    assert ledger.lamports == LAMPORTS_PER_SOL - 1005000 + 295000
+    assert ledger.token_account(ACCOUNT) == 300
+    assert ledger.lamports_slot == 13
+
+    # A failed trade only pays the fee
+    ledger.apply_trade(ACCOUNT, True, 10**6, 999, 5000, slot=14, landed=False)
+    assert ledger.lamports == LAMPORTS_PER_SOL - 1005000 + 290000
+    assert ledger.token_account(ACCOUNT) == 300
+
+
+def test_reservations_and_reserve_limit_free_sol():
+    ledger = BalanceLedger(MockAsyncClient(), OWNER, sol_reserve=0.5)
+    asyncio.run(ledger.seed())
+    assert ledger.seeded
+    assert ledger.available_sol() == pytest.approx(9.5)
+
+    ledger.reserve(2 * LAMPORTS_PER_SOL)
+    assert ledger.available_sol() == pytest.approx(7.5)
+    ledger.release(3 * LAMPORTS_PER_SOL)
+    assert ledger.reserved == 0
+
+
+def test_shards_share_balance_and_reservations():
+    table = SharedPositionTable.create(16, shards=2)
+    first = BalanceLedger(MockAsyncClient(), OWNER, sol_reserve=0, shared=table, shard=0)
+    second = BalanceLedger(MockAsyncClient(), OWNER, sol_reserve=0, shared=table, shard=1)
+    notify(first, str(OWNER), account_notification(10, lamports=LAMPORTS_PER_SOL))
+    notify(second, str(OWNER), account_notification(9, lamports=1))
+    assert table.lamports() == LAMPORTS_PER_SOL
+
+    first.reserve(600_000_000)
+    assert second.available_sol() == pytest.approx(0.4)
+    second.reserve(400_000_000)
+    assert first.available_sol() == 0
+
+    # A shard that exits leaves its reservations behind until cleared
+    table.clear_reservations(0)
+    assert second.available_sol() == pytest.approx(0.6)
+
+    # Settled trades move the shared balance once
+    second.release(400_000_000)
+    second.apply_trade(ACCOUNT, True, 400_000_000, 1, 5000, slot=11)
+    first.apply_trade(ACCOUNT, True, 400_000_000, 1, 5000, slot=11)
+    assert table.lamports() == LAMPORTS_PER_SOL - 400_005_000
@@ -0,0 +1,174 @@
+import asyncio
+from types import SimpleNamespace
+
+from solders.signature import Signature
+
+from trading.confirmation_tracker import (
+    CONFIRMED, FAILED, MAX_SIGNATURES_PER_REQUEST, ConfirmationTracker
+)
+
+
+class FakeClient:
+    def __init__(self, block_height=100):
+        self.statuses = {}
+        self.batches = []
+        self.sent = []
+        self.block_height = block_height
+        self.block_height_calls = 0
+
+    async def get_signature_statuses(self, signatures):
+        keys = [str(signature) for signature in signatures]
+        self.batches.append(keys)
+        return {'result': {'value': [self.statuses.get(key) for key in keys]}}
+
+    async def get_block_height(self, commitment=None):
+        self.block_height_calls += 1
+        return {'result': self.block_height}
+
+    async def send_raw_transaction(self, raw, opts=None):
+        self.sent.append(raw)
+        return {'result': "sig"}
+
+
+def stale_cache():
+    return SimpleNamespace(last_valid_block_height=None, blocks_remaining=lambda: 0,
+                           commitment="confirmed")
+
+
+def signature() -> str:
+    return str(Signature.new_unique())
+
+
+def test_statuses_are_fetched_in_batches_of_256():
+    async def run():
+        client = FakeClient()
+        tracker = ConfirmationTracker(client, stale_cache())
+        signatures = [signature() for _ in range(MAX_SIGNATURES_PER_REQUEST + 44)]
+        for sig in signatures:
+            tracker.track(sig, b"raw", 1000)
+
+        await tracker.poll()
+        assert [len(batch) for batch in client.batches] == [256, 44]
+        assert sum(client.batches, []) == signatures
+        assert tracker.status_requests == 2
+        # One block height request covers every expiry check
+        assert client.block_height_calls == 1
+
+    asyncio.run(run())
+
+
+def test_signatures_settle_at_the_tracked_commitment():
+    async def run():
+        client = FakeClient()
+        tracker = ConfirmationTracker(client, stale_cache(), commitment="confirmed")
+        done = []
+        landed, failed, processed, unknown = (signature() for _ in range(4))
+        pending = {
+            sig: tracker.track(sig, b"raw", 1000, on_done=done.append)
+            for sig in (landed, failed, processed, unknown)
+        }
+        client.statuses = {
+            landed: {'slot': 7, 'confirmationStatus': "finalized", 'err': None},
+            failed: {'slot': 8, 'confirmationStatus': "processed",
+                     'err': {'InstructionError': [2, "Custom"]}},
+            processed: {'slot': 9, 'confirmationStatus': "processed", 'err': None},
+        }
+
+        await tracker.poll()
+        assert set(tracker.pending) == {processed, unknown}
+        assert await pending[landed].future == CONFIRMED
+        assert pending[landed].slot == 7
+        assert await pending[failed].future == FAILED
+        assert pending[failed].error == {'InstructionError': [2, "Custom"]}
+        assert [p.signature for p in done] == [landed, failed]
+        assert (tracker.confirmed, tracker.failed) == (1, 1)
+
+    asyncio.run(run())
+
+
+def test_pending_transactions_expire_past_their_blockhash():
+    async def run():
+        client = FakeClient(block_height=151)
+        tracker = ConfirmationTracker(client, stale_cache())
+        old, current = signature(), signature()
+        tracker.track(old, b"raw", 150)
+        tracker.track(current, b"raw", 151)
+
+        await tracker.poll()
+        assert tracker.pending.keys() == {current}
+        assert tracker.expired == 1
+
+    asyncio.run(run())
+
+
+def test_fresh_blockhash_cache_estimates_block_height_without_a_request():
+    async def run():
+        client = FakeClient()
+        cache = SimpleNamespace(last_valid_block_height=300, blocks_remaining=lambda: 150,
+                                commitment="confirmed")
+        tracker = ConfirmationTracker(client, cache)
+        tracker.track(signature(), b"raw", 149)
+        tracker.track(signature(), b"raw", 150)
+
+        await tracker.poll()
+        assert client.block_height_calls == 0
+        assert len(tracker.pending) == 1
+
+    asyncio.run(run())
+
+
+def test_only_transactions_due_are_rebroadcast():
+    async def run():
+        client = FakeClient()
+        tracker = ConfirmationTracker(client, stale_cache(), rebroadcast_interval=10.0)
+        due = tracker.track(signature(), b"due", 1000)
+        recent = tracker.track(signature(), b"recent", 1000)
+        due.last_sent -= 10.0
+
+        await tracker.rebroadcast()
+        assert client.sent == [b"due"]
+        assert due.broadcasts == 2 and recent.broadcasts == 1
+        assert tracker.rebroadcasts == 1
+
+        # Just resent, so not due again yet
+        await tracker.rebroadcast()
+        assert client.sent == [b"due"]
+
+    asyncio.run(run())
+
+
+def test_failing_handler_still_resolves_the_future():
+    async def run():
+        client = FakeClient()
+        tracker = ConfirmationTracker(client, stale_cache())
+        sig = signature()
+
+        def on_done(pending):
+            raise RuntimeError("handler bug")
+
+        pending = tracker.track(sig, b"raw", 1000, on_done=on_done)
+        client.statuses[sig] = {'slot': 1, 'confirmationStatus': "confirmed", 'err': None}
+        await tracker.poll()
+        assert await pending.future == CONFIRMED
+
+    asyncio.run(run())
+
+
+def test_background_task_polls_until_every_transaction_settles():
+    async def run():
+        client = FakeClient()
+        tracker = ConfirmationTracker(client, stale_cache(), poll_interval=0.01,
+                                      rebroadcast_interval=0.01)
+        tracker.start()
+        sig = signature()
+        pending = tracker.track(sig, b"raw", 1000)
+        await asyncio.sleep(0.05)
+        assert not pending.future.done()
+        assert client.sent
+
+        client.statuses[sig] = {'slot': 1, 'confirmationStatus': "confirmed", 'err': None}
+        assert await asyncio.wait_for(pending.future, 1.0) == CONFIRMED
+        await tracker.stop()
+        assert tracker.metrics()["pending"] == 0
+
+    asyncio.run(run())
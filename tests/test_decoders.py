@@ -0,0 +1,82 @@
+import asyncio
+import base64
+from types import SimpleNamespace
+
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.system_program import TransferParams, transfer
+from solders.transaction import Transaction
+
+from benchmarks.bench_pipeline import signal_transaction
+from trading.decoders import decode_signal
+from trading.dex_trader import DexTrader
+from trading.signal_queue import SignalQueue
+
+
+def notification(raw: bytes) -> dict:
+    return {'transaction': [base64.b64encode(raw).decode(), 'base64'], 'meta': None}
+
+
+def transfer_transaction(wallet: Keypair) -> bytes:
+    instruction = transfer(TransferParams(
+        from_pubkey=wallet.pubkey(), to_pubkey=Keypair().pubkey(), lamports=1
+    ))
+    message = Message.new_with_blockhash([instruction], wallet.pubkey(), Hash.default())
+    return bytes(Transaction([wallet], message, Hash.default()))
+
+
+class FakeQuoteEngine:
+    def __init__(self):
+        self.discovered = []
+
+    def discover(self, mint, pool):
+        self.discovered.append((mint, pool))
+
+
+def fake_trader():
+    return SimpleNamespace(
+        quote_engine=FakeQuoteEngine(),
+        tracer=SimpleNamespace(release=lambda span: None)
+    )
+
+
+def test_pump_buy_is_decoded():
+    wallet, mint, curve = Keypair(), Keypair().pubkey(), Keypair().pubkey()
+    signal = decode_signal(notification(signal_transaction(0, wallet, mint, curve)))
+    assert signal.mint == str(mint)
+    assert signal.is_buy
+    assert signal.amount == 10**7 / 10**9
+    assert signal.pool == ("pump", str(curve))
+
+
+def test_parse_signal_discovers_the_pool():
+    trader = fake_trader()
+    wallet, mint, curve = Keypair(), Keypair().pubkey(), Keypair().pubkey()
+    token, is_buy, amount, percentage = DexTrader.parse_signal(
+        trader, notification(signal_transaction(0, wallet, mint, curve))
+    )
+    assert token == mint
+    assert is_buy
+    assert percentage == 100.0
+    assert trader.quote_engine.discovered == [(str(mint), ("pump", str(curve)))]
+
+
+def test_parse_signal_returns_none_for_unrecognized_transactions():
+    trader = fake_trader()
+    assert DexTrader.parse_signal(trader, notification(transfer_transaction(Keypair()))) is None
+    assert DexTrader.parse_signal(trader, {'transaction': {'message': {}}, 'meta': {}}) is None
+    assert not trader.quote_engine.discovered
+
+
+def test_signal_queue_ignores_unrecognized_transactions():
+    async def run():
+        trader = fake_trader()
+        trader.parse_signal = lambda tx_data: DexTrader.parse_signal(trader, tx_data)
+        queue = SignalQueue(trader, workers=1)
+        await queue.handle_transaction("wallet", notification(transfer_transaction(Keypair())))
+        assert queue.stats["ignored"] == 1
+        assert queue.depth() == 0
+        assert not queue.seen
+
+    asyncio.run(run())
@@ -0,0 +1,136 @@
+from decimal import Decimal, getcontext
+
+import pytest
+from solders.pubkey import Pubkey
+
+from trading.decoders import WSOL_MINT
+from trading.quote_engine import PUMP_CURVE, QuoteEngine
+from utils.mock_client import token_account_data, whirlpool_data
+
+getcontext().prec = 60
+
+TOKENS = 800_000_000 * 10**6
+LAMPORTS = 40 * 10**9
+
+
+def raydium_pool(token_reserve=TOKENS, sol_reserve=LAMPORTS):
+    engine = QuoteEngine()
+    mint, coin, pc = (str(Pubkey.new_unique()) for _ in range(3))
+    pool = engine.discover(mint, ("raydium", coin, pc))
+    pool.apply(coin, token_account_data(mint, token_reserve), 1)
+    pool.apply(pc, token_account_data(WSOL_MINT, sol_reserve), 1)
+    return engine, mint, pool
+
+
+def pump_pool(complete=False):
+    engine = QuoteEngine()
+    mint, curve = str(Pubkey.new_unique()), str(Pubkey.new_unique())
+    pool = engine.discover(mint, ("pump", curve))
+    pool.apply(curve, PUMP_CURVE.pack(TOKENS, LAMPORTS, TOKENS, LAMPORTS, TOKENS, complete), 1)
+    return engine, mint, pool
+
+
+def whirlpool(sol_is_a, fee_rate=3000):
+    engine = QuoteEngine()
+    mint, address = str(Pubkey.new_unique()), str(Pubkey.new_unique())
+    if sol_is_a:
+        data = whirlpool_data(WSOL_MINT, mint, LAMPORTS, TOKENS, fee_rate)
+    else:
+        data = whirlpool_data(mint, WSOL_MINT, TOKENS, LAMPORTS, fee_rate)
+    pool = engine.discover(mint, ("whirlpool", address))
+    pool.apply(address, data, 1)
+    return engine, mint, pool, data
+
+
+def test_constant_product_takes_the_fee_on_the_input():
+    _, _, pool = raydium_pool()
+    amount_in = 10**9
+    after_fee = amount_in * 9975 // 10000
+    assert pool.amount_out(amount_in, True) == TOKENS * after_fee // (LAMPORTS + after_fee)
+
+    tokens_in = 10**12
+    after_fee = tokens_in * 9975 // 10000
+    assert pool.amount_out(tokens_in, False) == LAMPORTS * after_fee // (TOKENS + after_fee)
+
+
+def test_raydium_vaults_are_matched_by_mint_whatever_their_order():
+    engine = QuoteEngine()
+    mint, coin, pc = (str(Pubkey.new_unique()) for _ in range(3))
+    pool = engine.discover(mint, ("raydium", coin, pc))
+    pool.apply(coin, token_account_data(WSOL_MINT, LAMPORTS), 1)
+    pool.apply(pc, token_account_data(mint, TOKENS), 2)
+    assert (pool.token_reserve, pool.sol_reserve) == (TOKENS, LAMPORTS)
+    assert pool.slot == 2
+
+
+def test_constant_product_round_trip_loses_only_fees_and_impact():
+    _, _, pool = raydium_pool()
+    tokens = pool.amount_out(10**8, True)
+    pool.token_reserve -= tokens
+    pool.sol_reserve += 10**8
+    sol_back = pool.amount_out(tokens, False)
+    assert 10**8 * 0.9975 ** 2 - 2 <= sol_back < 10**8
+
+
+def test_pump_charges_its_fee_in_sol_on_both_sides():
+    _, _, pool = pump_pool()
+    sol_in = 10**9
+    after_fee = sol_in * 9900 // 10000
+    assert pool.amount_out(sol_in, True) == TOKENS * after_fee // (LAMPORTS + after_fee)
+
+    tokens_in = 10**12
+    gross = LAMPORTS * tokens_in // (TOKENS + tokens_in)
+    assert pool.amount_out(tokens_in, False) == gross * 9900 // 10000
+
+
+def test_completed_pump_curve_cannot_be_quoted():
+    engine, mint, pool = pump_pool(complete=True)
+    assert not pool.ready
+    assert engine.quote(mint, 10**9, True) is None
+
+
+def whirlpool_reference(data: bytes, amount_in: int, a_to_b: bool, fee_rate: float) -> Decimal:
+    liquidity = Decimal(int.from_bytes(data[49:65], "little"))
+    sqrt_price = Decimal(int.from_bytes(data[65:81], "little")) / 2**64
+    amount = Decimal(amount_in) * (1 - Decimal(str(fee_rate)))
+    if a_to_b:
+        next_sqrt = liquidity * sqrt_price / (liquidity + amount * sqrt_price)
+        return liquidity * (sqrt_price - next_sqrt)
+    next_sqrt = sqrt_price + amount / liquidity
+    return liquidity * (1 / sqrt_price - 1 / next_sqrt)
+
+
+@pytest.mark.parametrize("sol_is_a", [True, False])
+@pytest.mark.parametrize("is_buy", [True, False])
+def test_whirlpool_matches_the_in_range_swap_formulas(sol_is_a, is_buy):
+    _, _, pool, data = whirlpool(sol_is_a)
+    amount_in = 10**9 if is_buy else 10**13
+    expected = whirlpool_reference(data, amount_in, is_buy == sol_is_a, 0.003)
+    # Rounded down to whole base units
+    assert pool.amount_out(amount_in, is_buy) == pytest.approx(float(expected), rel=1e-9, abs=1)
+
+
+@pytest.mark.parametrize("sol_is_a", [True, False])
+def test_whirlpool_spot_price_is_lamports_per_token(sol_is_a):
+    engine, mint, pool, _ = whirlpool(sol_is_a)
+    assert pool.spot_price() == pytest.approx(LAMPORTS / TOKENS, rel=1e-9)
+    assert engine.price(mint, 6) == pytest.approx(LAMPORTS / TOKENS * 10**6 / 10**9, rel=1e-9)
+
+
+@pytest.mark.parametrize("sol_is_a", [True, False])
+def test_small_fee_free_whirlpool_swaps_fill_near_spot(sol_is_a):
+    _, _, pool, _ = whirlpool(sol_is_a, fee_rate=0)
+    assert pool.amount_out(10**6, True) == pytest.approx(10**6 / pool.spot_price(), rel=2e-4)
+    tokens = 10**6 * 10**5
+    assert pool.amount_out(tokens, False) == pytest.approx(tokens * pool.spot_price(), rel=2e-4)
+
+
+def test_quote_reports_price_impact_against_spot():
+    engine, mint, pool = raydium_pool()
+    small = engine.quote(mint, 10**6, True)
+    large = engine.quote(mint, 4 * 10**9, True)
+    assert small.price_impact == pytest.approx(0.25, abs=0.01)  # Just the fee
+    # Spending 10% of the SOL reserve fills at 0.9975 / (1 + 0.1 * 0.9975) of spot
+    assert large.price_impact == pytest.approx(100 * (1 - 0.9975 / 1.09975), rel=1e-6)
+    assert large.min_out(1.0) == int(large.amount_out * 0.99)
+    assert engine.quote(mint, 0, True) is None
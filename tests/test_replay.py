@@ -0,0 +1,36 @@
+import asyncio
+import base64
+
+from solders.keypair import Keypair
+
+from benchmarks.bench_pipeline import signal_transaction
+from trading.replay import replay
+from utils.capture import CaptureWriter, encode_payload
+
+
+def write_capture(path: str, count: int):
+    writer = CaptureWriter(path, initial_size=1024 * 1024)
+    wallet = Keypair()
+    markets = [(Keypair().pubkey(), Keypair().pubkey()) for _ in range(2)]
+    for index in range(count):
+        mint, curve = markets[index % len(markets)]
+        raw = signal_transaction(index, wallet, mint, curve)
+        payload = {
+            'slot': 250000000 + index,
+            'transaction': [base64.b64encode(raw).decode(), 'base64'],
+            'meta': {'err': None, 'preTokenBalances': [], 'postTokenBalances': []},
+        }
+        writer.record(str(wallet.pubkey()), payload['slot'], encode_payload(payload))
+    writer.close()
+
+
+def test_replaying_pump_buys_sends_trades(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_capture(str(tmp_path / "capture.bin"), 6)
+
+    results = asyncio.run(replay(str(tmp_path / "capture.bin"), False, 1.0, 0.0))
+
+    assert results["notifications"] == 6
+    assert results["sent"] > 0
+    assert results["executed"] == results["sent"]
+    assert results["failed"] + results["executed"] + results["dropped"] == 6
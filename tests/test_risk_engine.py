@@ -0,0 +1,78 @@
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from solders.pubkey import Pubkey
+
+from trading.risk_engine import RiskEngine
+from utils.position_manager import PositionManager
+
+
+class FakeTrader:
+    """Records sells; each stays pending until its future is resolved"""
+
+    def __init__(self):
+        self.position_manager = PositionManager(10, 50)
+        self.orders = []
+        self.pending = []
+
+    async def execute_trade(self, token, is_buy, amount, percentage=100.0,
+                            span=None, wallet=None, size=None):
+        self.orders.append((str(token), is_buy, size, wallet))
+        pending = SimpleNamespace(future=asyncio.get_running_loop().create_future())
+        self.pending.append(pending)
+        return pending
+
+
+def test_exit_sells_the_position_at_its_current_value():
+    async def run():
+        trader = FakeTrader()
+        engine = RiskEngine(trader)
+        mint = str(Pubkey.new_unique())
+        trader.position_manager.open_position(mint, Decimal("2"), 1.0)
+
+        assert engine.on_prices({mint: 3.2}) == [(mint, 'take_profit')]
+        await asyncio.sleep(0)
+
+        assert trader.orders == [(mint, False, pytest.approx(1.6), None)]
+        await engine.stop()
+
+    asyncio.run(run())
+
+
+def test_triggered_token_is_exited_once_while_in_flight():
+    async def run():
+        trader = FakeTrader()
+        engine = RiskEngine(trader)
+        mint = str(Pubkey.new_unique())
+        trader.position_manager.open_position(mint, Decimal("1"), 1.0)
+
+        engine.on_prices({mint: 0.5})
+        engine.on_prices({mint: 0.4})
+        await asyncio.sleep(0)
+
+        assert len(trader.orders) == 1
+        assert engine.exits_triggered == 1
+        await engine.stop()
+
+    asyncio.run(run())
+
+
+def test_stop_cancels_in_flight_exits():
+    async def run():
+        trader = FakeTrader()
+        engine = RiskEngine(trader)
+        mint = str(Pubkey.new_unique())
+        trader.position_manager.open_position(mint, Decimal("1"), 1.0)
+
+        engine.on_prices({mint: 0.5})
+        await asyncio.sleep(0)
+        assert len(engine._exits) == 1
+
+        await engine.stop()
+        assert not engine._exits
+        # The position is still open, so the next start may retry it
+        assert mint not in engine.exiting
+
+    asyncio.run(run())
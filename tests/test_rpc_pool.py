@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from utils.rpc_pool import RpcPool
+
+
+class FakeClient:
+    """Answers each call with the next behaviour scripted for its url"""
+
+    scripts = {}
+
+    def __init__(self, url, commitment=None):
+        self.url = url
+        self.calls = []
+
+    async def close(self):
+        pass
+
+    def __getattr__(self, method):
+        async def call(*args, **kwargs):
+            self.calls.append(method)
+            delay, outcome = FakeClient.scripts[self.url]
+            await asyncio.sleep(delay)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return call
+
+
+def make_pool(scripts, **kwargs):
+    FakeClient.scripts = scripts
+    return RpcPool(list(scripts), client_factory=FakeClient, **kwargs)
+
+
+def test_request_fails_over_down_the_ranking():
+    async def run():
+        pool = make_pool({
+            "a": (0, ConnectionError("refused")),
+            "b": (0, {'error': {'code': -32005, 'message': "behind"}}),
+            "c": (0, {'result': 42}),
+        })
+        assert await pool.get_slot() == {'result': 42}
+        first, second, third = pool.endpoints
+        assert first.errors == second.errors == 1
+        assert third.errors == 0 and third.latency is not None
+
+        # Healthy endpoints now rank ahead of the failing ones
+        assert pool.ranked()[0] is third
+
+    asyncio.run(run())
+
+
+def test_rpc_error_is_returned_when_every_endpoint_fails():
+    async def run():
+        error = {'error': {'code': -32002, 'message': "simulation failed"}}
+        pool = make_pool({"a": (0, ConnectionError("refused")), "b": (0, error)})
+        assert await pool.get_slot() == error
+
+        pool = make_pool({"a": (0, ConnectionError("refused")), "b": (0, TimeoutError())})
+        with pytest.raises(TimeoutError):
+            await pool.get_slot()
+
+    asyncio.run(run())
+
+
+def test_circuit_opens_after_consecutive_failures():
+    async def run():
+        pool = make_pool({
+            "a": (0, ConnectionError("refused")),
+            "b": (0.01, {'result': 1}),
+        }, failure_threshold=2, cooldown=60.0)
+        first, second = pool.endpoints
+        first.latency = 0.001  # Ranked first until its circuit opens
+
+        await pool.get_slot()
+        assert pool.ranked()[0] is first
+        await pool.get_slot()
+        assert first.circuit_opens == 1
+        assert pool.ranked() == [second]
+
+        # Skipped while open
+        await pool.get_slot()
+        assert first.requests == 2
+
+        # With every circuit open, the one that recovers first is tried
+        second.open_until = first.open_until + 1
+        assert pool.ranked() == [first, second]
+
+    asyncio.run(run())
+
+
+def test_send_races_the_top_endpoints_and_keeps_the_first_acceptance():
+    async def run():
+        pool = make_pool({
+            "fast-but-failing": (0, ConnectionError("refused")),
+            "slow": (0.05, {'result': "sig"}),
+            "fastest": (0.01, {'result': "sig"}),
+            "unused": (0, {'result': "sig"}),
+        }, send_fanout=3)
+        unused = pool.endpoints[3]
+        unused.latency = 10.0
+
+        assert await pool.send_raw_transaction(b"tx") == {'result': "sig"}
+        failing, slow, fastest, _ = pool.endpoints
+        assert fastest.sends_won == 1
+        assert failing.errors == 1
+        assert not unused.client.calls
+
+        # The losing send still completes and updates its endpoint's stats
+        assert slow.requests == 0
+        await pool.close()
+        assert slow.requests == 1 and slow.sends_won == 0
+
+    asyncio.run(run())
+
+
+def test_send_returns_the_rpc_error_when_every_endpoint_rejects():
+    async def run():
+        error = {'error': {'code': -32002, 'message': "blockhash not found"}}
+        pool = make_pool({"a": (0, error), "b": (0, error)})
+        assert await pool.send_raw_transaction(b"tx") == error
+
+    asyncio.run(run())
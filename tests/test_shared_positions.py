@@ -0,0 +1,92 @@
+import os
+from decimal import Decimal
+
+import pytest
+
+from utils.position_manager import PositionManager
+from utils.shared_positions import DELETED, SharedPositionTable
+
+
+def test_open_close_and_exposure():
+    table = SharedPositionTable.create(16)
+    table.open("a", 1.0, 2.0, shard=0)
+    table.open("b", 3.0, 0.5, shard=1)
+    assert table.get("a") == (1.0, 2.0, 0)
+    assert table.get("b") == (3.0, 0.5, 1)
+    assert table.exposure() == pytest.approx(2.5)
+
+    # Reopening replaces the amount and moves ownership
+    table.open("a", 1.5, 1.0, shard=1)
+    assert table.get("a") == (1.5, 1.0, 1)
+    assert table.exposure() == pytest.approx(1.5)
+    assert table.open_count() == 2
+
+    assert table.close("a") == 1.0
+    assert table.close("a") is None
+    assert table.get("a") is None
+    assert table.exposure() == pytest.approx(0.5)
+    assert table.open_count() == 1
+
+
+def test_rebuild_drops_deleted_rows():
+    table = SharedPositionTable.create(8)  # Rebuilds past 5 used slots
+    for i in range(5):
+        table.open(f"mint{i}", 1.0, 1.0, shard=0)
+    for i in range(4):
+        table.close(f"mint{i}")
+    assert int(table.header["deleted"][0]) == 4
+
+    table.open("fresh", 2.0, 0.25, shard=2)
+    assert int(table.header["deleted"][0]) == 0
+    assert not (table.rows["state"] == DELETED).any()
+    assert table.get("mint4") == (1.0, 1.0, 0)
+    assert table.get("fresh") == (2.0, 0.25, 2)
+    assert sorted(mint for mint, *_ in table.items()) == ["fresh", "mint4"]
+    assert table.exposure() == pytest.approx(1.25)
+
+
+def test_full_table_raises():
+    table = SharedPositionTable.create(8)
+    for i in range(5):
+        table.open(f"mint{i}", 1.0, 1.0, shard=0)
+    with pytest.raises(RuntimeError):
+        table.open("one-too-many", 1.0, 1.0, shard=0)
+    assert table.exposure() == pytest.approx(5.0)
+
+
+def test_recover_repairs_a_dead_writer():
+    table = SharedPositionTable.create(16)
+    table.open("a", 1.0, 2.0, shard=0)
+
+    # A writer that died between the row write and the header update
+    table.lock.acquire()
+    table.header["writer"] = os.getpid()
+    table.header["version"] += 1
+    table.header["exposure"] = 99.0
+    with pytest.raises(TimeoutError):
+        table.get("a")
+
+    assert not table.recover(os.getpid() + 1)
+    assert table.recover(os.getpid())
+    assert table.exposure() == pytest.approx(2.0)
+    assert table.get("a") == (1.0, 2.0, 0)
+    table.open("b", 1.0, 1.0, shard=0)  # The lock was released
+    assert table.exposure() == pytest.approx(3.0)
+
+
+def test_position_manager_keeps_positions_a_full_table_rejects():
+    table = SharedPositionTable.create(8)
+    for i in range(5):
+        table.open(f"mint{i}", 1.0, 1.0, shard=1)
+    manager = PositionManager(10, shared=table, shard=0)
+
+    manager.open_position("one-too-many", Decimal("2"), 0.5)
+    assert table.get("one-too-many") is None
+    assert manager.positions["one-too-many"]["amount"] == 0.5
+    assert manager.check_exits({"one-too-many": 1.5}) == [("one-too-many", "stop_loss")]
+
+    # Published once the table has room again
+    table.close("mint0")
+    manager.check_exits({"one-too-many": 2.0})
+    assert table.get("one-too-many") == (2.0, 0.5, 0)
+    assert not manager.unpublished
@@ -0,0 +1,141 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from solders.pubkey import Pubkey
+
+from trading.signal_coalescer import SignalCoalescer
+from trading.signal_queue import SignalQueue
+
+
+class FakePending:
+    def __init__(self):
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class FakeTrader:
+    """Records orders; buys stay pending until ``confirm`` is called"""
+
+    def __init__(self, held: float = 0.0, delay: float = 0.0):
+        self.wallets = SimpleNamespace(size=lambda wallet, is_buy, amount: amount)
+        self.config = SimpleNamespace(trade_size_sol=1.0)
+        self.position_manager = SimpleNamespace(amount=lambda mint: held)
+        self.tracer = SimpleNamespace(release=lambda span: None)
+        self.delay = delay
+        self.orders = []
+        self.pending = []
+
+    async def execute_trade(self, token, is_buy, amount, span=None, wallet=None, size=None):
+        await asyncio.sleep(self.delay)
+        self.orders.append((str(token), is_buy, size, wallet))
+        pending = FakePending()
+        self.pending.append(pending)
+        return pending
+
+    def confirm(self):
+        for pending in self.pending:
+            if not pending.future.done():
+                pending.future.set_result(None)
+
+
+def test_opposing_signals_net_into_one_order():
+    async def run():
+        trader = FakeTrader()
+        coalescer = SignalCoalescer(trader, window=0.01)
+        mint = Pubkey.new_unique()
+        coalescer.submit("a", mint, True, 100)
+        coalescer.submit("b", mint, True, 50)
+        coalescer.submit("c", mint, False, 30)
+        coalescer.flush()
+        await coalescer.stop(drain=True)
+
+        assert trader.orders == [(str(mint), True, pytest.approx(1.2), "a")]
+        assert coalescer.stats["orders"] == 1
+        assert coalescer.stats["merged"] == 2
+        assert coalescer.trades_saved() == 2
+
+    asyncio.run(run())
+
+
+def test_fully_netted_window_sends_nothing():
+    async def run():
+        trader = FakeTrader()
+        coalescer = SignalCoalescer(trader, window=0.01)
+        mint = Pubkey.new_unique()
+        coalescer.submit("a", mint, True, 40)
+        coalescer.submit("b", mint, False, 40)
+        await asyncio.sleep(0.05)
+
+        assert trader.orders == []
+        assert coalescer.stats["netted"] == 2
+        assert not coalescer.windows
+
+    asyncio.run(run())
+
+
+def test_buys_are_capped_by_held_and_in_flight_exposure():
+    async def run():
+        trader = FakeTrader(held=0.5)
+        coalescer = SignalCoalescer(trader, window=0.01, max_mint_exposure=2.0)
+        mint = Pubkey.new_unique()
+
+        coalescer.submit("a", mint, True, 100)
+        coalescer.flush()
+        await asyncio.sleep(0)
+        await coalescer.stop(drain=True)
+        assert trader.orders[-1][2] == pytest.approx(1.0)
+        assert coalescer.in_flight[str(mint)] == pytest.approx(1.0)
+
+        # The unconfirmed buy still counts against the cap
+        coalescer.submit("a", mint, True, 100)
+        coalescer.flush()
+        await coalescer.stop(drain=True)
+        assert trader.orders[-1][2] == pytest.approx(0.5)
+        assert coalescer.stats["capped"] == 1
+
+        trader.confirm()
+        await asyncio.sleep(0)
+        assert str(mint) not in coalescer.in_flight
+
+        # No room left: the window ends without an order
+        trader.position_manager.amount = lambda mint: 2.0
+        coalescer.submit("a", mint, True, 100)
+        coalescer.flush()
+        assert len(trader.orders) == 2
+        assert coalescer.stats["capped"] == 2
+
+    asyncio.run(run())
+
+
+def test_stop_cancels_timers_and_unsent_orders():
+    async def run():
+        trader = FakeTrader(delay=10.0)
+        coalescer = SignalCoalescer(trader, window=0.01)
+        sent, waiting = Pubkey.new_unique(), Pubkey.new_unique()
+        coalescer.submit("a", sent, True, 100)
+        coalescer.flush()
+        coalescer.submit("a", waiting, True, 100)
+        await coalescer.stop()
+
+        assert not coalescer.windows
+        assert not coalescer._last_order
+        assert not coalescer.in_flight
+        await asyncio.sleep(0.05)
+        assert trader.orders == []
+
+    asyncio.run(run())
+
+
+def test_signal_queue_stop_stops_its_coalescer():
+    async def run():
+        trader = FakeTrader()
+        coalescer = SignalCoalescer(trader, window=10.0)
+        queue = SignalQueue(trader, workers=1, coalescer=coalescer)
+        queue.start()
+        coalescer.submit("a", Pubkey.new_unique(), True, 100)
+        await queue.stop()
+
+        assert not coalescer.windows
+        assert trader.orders == []
+
+    asyncio.run(run())
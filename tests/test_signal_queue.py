@@ -0,0 +1,162 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from solders.pubkey import Pubkey
+
+from trading.signal_queue import SignalQueue
+
+
+class FakeTrader:
+    """Parses ``{'mint': ..., 'transaction': ...}`` payloads and records trades"""
+
+    def __init__(self):
+        self.trades = []
+        self.released = []
+        self.gate = None
+        self.tracer = SimpleNamespace(release=lambda span: self.released.append(span.name))
+
+    def parse_signal(self, tx_data):
+        return tx_data['mint'], True, 0.1, 100.0
+
+    async def execute_trade(self, token, is_buy, amount, percentage=100.0,
+                            span=None, wallet=None):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.trades.append((wallet, token))
+        return SimpleNamespace()
+
+
+def payload(signature=None, mint=None, slot=None):
+    tx_data = {'mint': mint or Pubkey.new_unique(), 'transaction': {}}
+    if signature is not None:
+        tx_data['transaction']['signatures'] = [signature]
+    if slot is not None:
+        tx_data['slot'] = slot
+    return tx_data
+
+
+def span(name):
+    return SimpleNamespace(name=name, mark=lambda stage: None)
+
+
+def queued(queue):
+    return [signal[6] for shard in queue.queues for signal in shard._queue]
+
+
+def test_duplicate_signatures_are_dropped():
+    async def run():
+        queue = SignalQueue(FakeTrader(), workers=1)
+        await queue.handle_transaction("wallet", payload("sig-1"), span=span("span-1"))
+        await queue.handle_transaction("other", payload("sig-1"), span=span("span-2"))
+        assert queued(queue) == ["sig-1"]
+        assert queue.stats["duplicates"] == 1
+        assert queue.trader.released == ["span-2"]
+
+    asyncio.run(run())
+
+
+def test_payloads_without_a_signature_dedupe_by_wallet_and_slot():
+    async def run():
+        queue = SignalQueue(FakeTrader(), workers=1)
+        await queue.handle_transaction("a", payload(slot=7))
+        await queue.handle_transaction("a", payload(slot=7))
+        await queue.handle_transaction("b", payload(slot=7))
+        await queue.handle_transaction("a", payload())
+        await queue.handle_transaction("a", payload())
+        # No key at all: nothing to dedupe on, both are kept
+        assert queued(queue) == ["a:7", "b:7", None, None]
+        assert queue.stats["duplicates"] == 1
+
+    asyncio.run(run())
+
+
+def test_dedupe_window_forgets_the_oldest_signature():
+    async def run():
+        queue = SignalQueue(FakeTrader(), workers=1, dedupe_size=2)
+        for signature in ("sig-1", "sig-2", "sig-3"):
+            await queue.handle_transaction("wallet", payload(signature))
+        assert list(queue.seen) == ["sig-2", "sig-3"]
+        await queue.handle_transaction("wallet", payload("sig-1"))
+        assert queue.stats["duplicates"] == 0
+
+    asyncio.run(run())
+
+
+def test_drop_oldest_evicts_the_head_and_forgets_its_signature():
+    async def run():
+        queue = SignalQueue(FakeTrader(), workers=1, max_size=2)
+        for n in range(3):
+            await queue.handle_transaction("wallet", payload(f"sig-{n}"), span=span(f"span-{n}"))
+        assert queued(queue) == ["sig-1", "sig-2"]
+        assert queue.stats["dropped"] == 1
+        assert queue.trader.released == ["span-0"]
+
+        # The dropped signal may be delivered again
+        assert "sig-0" not in queue.seen
+        await queue.handle_transaction("wallet", payload("sig-0"))
+        assert queued(queue) == ["sig-2", "sig-0"]
+
+    asyncio.run(run())
+
+
+def test_drop_newest_keeps_the_queue_and_forgets_the_new_signature():
+    async def run():
+        queue = SignalQueue(FakeTrader(), workers=1, max_size=2, overflow_policy="drop_newest")
+        for n in range(3):
+            await queue.handle_transaction("wallet", payload(f"sig-{n}"), span=span(f"span-{n}"))
+        assert queued(queue) == ["sig-0", "sig-1"]
+        assert queue.stats["dropped"] == 1
+        assert queue.trader.released == ["span-2"]
+        assert "sig-2" not in queue.seen
+
+    asyncio.run(run())
+
+
+def test_block_waits_for_room_and_dedupes_meanwhile():
+    async def run():
+        trader = FakeTrader()
+        trader.gate = asyncio.Event()
+        queue = SignalQueue(trader, workers=1, max_size=1, overflow_policy="block")
+        queue.start()
+
+        await queue.handle_transaction("wallet", payload("sig-0"))
+        await asyncio.sleep(0)  # The worker takes sig-0 and waits on the gate
+        await queue.handle_transaction("wallet", payload("sig-1"))
+        blocked = asyncio.create_task(queue.handle_transaction("wallet", payload("sig-2")))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+
+        # Already marked seen while waiting for room
+        await queue.handle_transaction("wallet", payload("sig-2"))
+        assert queue.stats["duplicates"] == 1
+
+        trader.gate.set()
+        await blocked
+        await queue.join()
+        assert len(trader.trades) == 3
+        assert queue.stats["executed"] == 3
+        assert queue.stats["dropped"] == 0
+        await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_trades_for_one_mint_run_in_arrival_order():
+    async def run():
+        trader = FakeTrader()
+        queue = SignalQueue(trader, workers=4)
+        queue.start()
+        mint = Pubkey.new_unique()
+        for wallet in ("a", "b", "c", "d"):
+            await queue.handle_transaction(wallet, payload(f"sig-{wallet}", mint=mint))
+        await queue.join()
+        assert trader.trades == [(wallet, mint) for wallet in ("a", "b", "c", "d")]
+        await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        SignalQueue(FakeTrader(), overflow_policy="drop_all")
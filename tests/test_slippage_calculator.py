@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from slippage_calculator import SlippageCalculator
+
+
+def window_stats(prices):
+    prices = np.asarray(prices)
+    return prices.mean(), ((prices - prices.mean()) ** 2).sum()
+
+
+def test_welford_matches_window_while_growing_and_rolling():
+    calculator = SlippageCalculator(volatility_window=5)
+    rng = np.random.default_rng(7)
+    prices = rng.uniform(0.5, 2.0, 40)
+
+    for i, price in enumerate(prices):
+        calculator.update_price("token", float(price))
+        row = calculator.token_rows["token"]
+        expected_mean, expected_m2 = window_stats(prices[max(0, i - 4):i + 1])
+        assert calculator._mean[row] == pytest.approx(expected_mean)
+        assert calculator._m2[row] == pytest.approx(expected_m2, abs=1e-9)
+
+    assert calculator.get_price_history("token") == pytest.approx(prices[-5:].tolist())
+
+
+def test_scalar_and_vectorized_updates_agree():
+    scalar = SlippageCalculator(volatility_window=4)
+    vectorized = SlippageCalculator(volatility_window=4)
+    rng = np.random.default_rng(11)
+
+    for _ in range(30):
+        tokens = ["a", "b", "c"]
+        prices = rng.uniform(0.1, 1.0, 3).tolist()
+        for token, price in zip(tokens, prices):
+            scalar.update_price(token, price)
+        slippage = vectorized.update_prices(tokens, prices)
+        assert [scalar.get_slippage(token) for token in tokens] == pytest.approx(slippage.tolist())
+
+
+def test_restore_window_resumes_rolling_updates():
+    calculator = SlippageCalculator(volatility_window=4)
+    calculator.restore_window("token", [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    assert calculator.get_price_history("token") == [3.0, 4.0, 5.0, 6.0]
+
+    calculator.update_price("token", 7.0)
+    row = calculator.token_rows["token"]
+    expected_mean, expected_m2 = window_stats([4.0, 5.0, 6.0, 7.0])
+    assert calculator.get_price_history("token") == [4.0, 5.0, 6.0, 7.0]
+    assert calculator._mean[row] == pytest.approx(expected_mean)
+    assert calculator._m2[row] == pytest.approx(expected_m2)
+
+
+def test_restore_partial_window_and_min_samples():
+    calculator = SlippageCalculator(volatility_window=5, min_samples=3, default_slippage=1.0)
+    calculator.restore_window("token", [2.0, 2.0])
+    assert calculator.get_slippage("token") == 1.0
+
+    calculator.update_price("token", 2.0)
+    assert calculator.get_price_history("token") == [2.0, 2.0, 2.0]
+    # No variation, so only the base slippage applies
+    assert calculator.get_slippage("token") == pytest.approx(calculator.base_slippage)
+
+
+def test_slippage_is_capped():
+    calculator = SlippageCalculator(volatility_window=5, min_samples=2,
+                                    volatility_multiplier=10.0, max_slippage=5.0)
+    for price in (1.0, 100.0, 1.0, 100.0):
+        calculator.update_price("token", price)
+    assert calculator.get_slippage("token") == 5.0
@@ -0,0 +1,59 @@
+import asyncio
+import json
+from decimal import Decimal
+
+import pytest
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from config import BotConfig
+from trading.dex_trader import DexTrader
+from utils.mock_client import MockAsyncClient
+from utils.trade_logger import TradeLogger
+
+
+def make_trader(tmp_path, **overrides) -> DexTrader:
+    config = BotConfig(
+        private_key=json.dumps(list(bytes(Keypair()))),
+        state_file=str(tmp_path / "state.db"),
+        **overrides
+    )
+    logger = TradeLogger(str(tmp_path / "bot.log"), str(tmp_path / "trades.jsonl"))
+    logger.listener.handlers = logger.listener.handlers[:1]
+    return DexTrader(MockAsyncClient(), config, logger)
+
+
+def test_restart_resumes_positions_and_volatility_windows(tmp_path):
+    token = Pubkey.new_unique()
+    mint = str(token)
+
+    async def first_run():
+        trader = make_trader(tmp_path)
+        trader.state_store.start()
+        trader.position_manager.open_position(mint, Decimal("1.0"), 0.25)
+        for price in (1.0, 1.2, 0.9, 1.1, 1.3, 0.8):
+            trader.slippage_calculator.update_price(mint, price)
+        slippage = trader.slippage(token)
+        await trader.state_store.stop()
+        trader.signer.close()
+        trader.logger.close()
+        return slippage
+
+    slippage = asyncio.run(first_run())
+    assert slippage > BotConfig.base_slippage
+
+    restarted = make_trader(tmp_path)
+    assert restarted.position_manager.positions[mint]["amount"] == 0.25
+    assert restarted.slippage(token) == pytest.approx(slippage)
+    restarted.signer.close()
+    restarted.logger.close()
+
+
+def test_configured_slippage_overrides_volatility(tmp_path):
+    trader = make_trader(tmp_path, slippage_tolerance=2.5)
+    token = Pubkey.new_unique()
+    for price in (1.0, 2.0, 0.5, 3.0, 0.1):
+        trader.slippage_calculator.update_price(str(token), price)
+    assert trader.slippage(token) == 2.5
+    trader.signer.close()
+    trader.logger.close()
@@ -0,0 +1,195 @@
+import asyncio
+from types import SimpleNamespace
+
+from solana.rpc.websocket_api import SubscriptionError
+from solders.pubkey import Pubkey
+from solders.rpc.responses import parse_websocket_message
+
+import trading.subscription_manager as subscription_manager
+from trading.subscription_manager import SubscriptionManager
+
+REAL_SLEEP = asyncio.sleep
+
+
+def subscription_error() -> SubscriptionError:
+    item = parse_websocket_message(
+        '{"jsonrpc":"2.0","error":{"code":-32602,"message":"Invalid param"},"id":1}'
+    )[0]
+    return SubscriptionError(item, None)
+
+
+def notification(sub_id: int, slot: int):
+    context = SimpleNamespace(slot=slot)
+    return SimpleNamespace(subscription=sub_id, result=SimpleNamespace(context=context))
+
+
+class FakeWebsocket:
+    """Confirms each subscription in order; ``rejected`` accounts get an error reply"""
+
+    def __init__(self, server):
+        self.server = server
+        self.incoming = asyncio.Queue()
+
+    async def __aenter__(self):
+        self.server.sockets.append(self)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def account_subscribe(self, pubkey, commitment=None, encoding=None):
+        account = str(pubkey)
+        self.server.subscribed.append(account)
+        if account in self.server.rejected:
+            self.incoming.put_nowait(subscription_error())
+            return
+        self.server.next_id += 1
+        self.server.ids[account] = self.server.next_id
+        self.incoming.put_nowait([SimpleNamespace(result=self.server.next_id)])
+
+    async def recv(self):
+        item = await self.incoming.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def notify(self, account: str, slot: int):
+        self.incoming.put_nowait([notification(self.server.ids[account], slot)])
+
+    def drop(self):
+        self.incoming.put_nowait(ConnectionError("closed"))
+
+
+class FakeServer:
+    def __init__(self):
+        self.sockets = []
+        self.subscribed = []
+        self.rejected = set()
+        self.ids = {}
+        self.next_id = 0
+        self.urls = []
+        self.sleeps = []
+
+    def connect(self, url):
+        self.urls.append(url)
+        return FakeWebsocket(self)
+
+    async def sleep(self, delay, *args):
+        self.sleeps.append(delay)
+        await REAL_SLEEP(0)
+
+
+async def record(items, item):
+    items.append(item)
+
+
+async def settle():
+    for _ in range(20):
+        await REAL_SLEEP(0)
+
+
+def setup(monkeypatch, **kwargs):
+    server = FakeServer()
+    monkeypatch.setattr(subscription_manager, "connect", server.connect)
+    monkeypatch.setattr(asyncio, "sleep", server.sleep)
+    return server, SubscriptionManager(**kwargs)
+
+
+def test_reconnect_resubscribes_and_reports_gaps(monkeypatch):
+    async def run():
+        gaps, reconnected, received = [], [], []
+        server, manager = setup(monkeypatch, ws_url=["ws://a", "ws://b"],
+                                on_gap=lambda account, slot: record(gaps, (account, slot)))
+        manager.add_reconnect_listener(reconnected.append)
+        active, quiet = str(Pubkey.new_unique()), str(Pubkey.new_unique())
+
+        async def on_notification(account, result):
+            received.append((account, result.context.slot))
+
+        manager.register(Pubkey.from_string(active), on_notification)
+        manager.register(Pubkey.from_string(quiet), on_notification)
+        task = asyncio.create_task(manager.run())
+        await settle()
+        assert manager.is_live(active) and manager.is_live(quiet)
+
+        server.sockets[0].notify(active, 100)
+        await settle()
+        assert received == [(active, 100)]
+
+        server.sockets[0].drop()
+        await settle()
+        assert manager.reconnects == 1
+        assert server.urls == ["ws://a", "ws://b"]
+        assert server.subscribed == [active, quiet, active, quiet]
+        assert manager.is_live(active) and manager.is_live(quiet)
+        assert reconnected == [[active, quiet]]
+        # Only the account that saw activity has a slot to backfill from
+        assert gaps == [(active, 100)]
+
+        # Notifications route through the new subscription ids
+        server.sockets[1].notify(active, 105)
+        await settle()
+        assert received[-1] == (active, 105)
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_backoff_doubles_up_to_the_maximum_and_resets_on_connect(monkeypatch):
+    async def run():
+        server, manager = setup(monkeypatch, ws_url="ws://a",
+                                initial_backoff=0.5, max_backoff=2.0)
+        failures = [0]
+
+        def connect(url):
+            if failures[0] < 4:
+                failures[0] += 1
+                raise ConnectionError("refused")
+            return FakeWebsocket(server)
+
+        monkeypatch.setattr(subscription_manager, "connect", connect)
+        task = asyncio.create_task(manager.run())
+        await settle()
+        assert server.sleeps == [0.5, 1.0, 2.0, 2.0]
+        assert manager.connection_count() == 1
+
+        server.sockets[0].drop()
+        await settle()
+        assert server.sleeps[-1] == 0.5
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+
+
+def test_rejected_subscription_does_not_stall_the_connection(monkeypatch):
+    async def run():
+        server, manager = setup(monkeypatch, ws_url="ws://a")
+        bad, good = str(Pubkey.new_unique()), str(Pubkey.new_unique())
+        server.rejected.add(bad)
+
+        async def on_notification(account, result):
+            pass
+
+        manager.register(Pubkey.from_string(bad), on_notification)
+        manager.register(Pubkey.from_string(good), on_notification)
+        task = asyncio.create_task(manager.run())
+        await settle()
+        assert server.subscribed == [bad, good]
+        assert manager.is_live(good)
+        assert not manager.is_live(bad)
+        assert manager.reconnects == 0
+
+        # Late registrations are still served on the same connection
+        late = str(Pubkey.new_unique())
+        manager.register(Pubkey.from_string(late), on_notification)
+        await settle()
+        assert manager.is_live(late)
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
@@ -0,0 +1,137 @@
+import struct
+
+import pytest
+from solders.pubkey import Pubkey
+
+from trading.decoders import WHIRLPOOL_SWAP, WSOL_MINT
+from trading.quote_engine import QuoteEngine
+from trading.swap_builders import (
+    RAYDIUM_AMM_PROGRAM_ID, SWAP_BUILDERS, WHIRLPOOL_MAX_SQRT_PRICE, WHIRLPOOL_MIN_SQRT_PRICE,
+    WHIRLPOOL_PROGRAM_ID, build_swap, whirlpool_tick_arrays, wrap_sol, wsol_account
+)
+from utils.mock_client import whirlpool_data
+from utils.token_cache import TOKEN_PROGRAM_ID, TokenContext, get_associated_token_address
+
+
+def context_for(owner: Pubkey, mint: Pubkey) -> TokenContext:
+    return TokenContext(
+        mint=mint, decimals=6, token_program=TOKEN_PROGRAM_ID,
+        ata=get_associated_token_address(owner, mint), ata_exists=True
+    )
+
+
+def metas(instruction):
+    return [(meta.pubkey, meta.is_signer, meta.is_writable) for meta in instruction.accounts]
+
+
+def test_every_decoded_pool_kind_has_a_builder():
+    assert {"pump", "raydium", "whirlpool"} <= set(SWAP_BUILDERS)
+
+
+@pytest.mark.parametrize("is_buy", [True, False])
+def test_raydium_swap_base_in(is_buy):
+    owner, mint = Pubkey.new_unique(), Pubkey.new_unique()
+    amm = [Pubkey.new_unique() for _ in range(15)]
+    pool = QuoteEngine().discover(str(mint), ("raydium", str(amm[5]), str(amm[6]),
+                                              *map(str, amm)))
+    context = context_for(owner, mint)
+
+    instruction = build_swap(owner, context, pool, is_buy, 25_000_000, 1_234_567)
+    assert instruction.program_id == RAYDIUM_AMM_PROGRAM_ID
+    assert bytes(instruction.data) == bytes([9]) + struct.pack("<QQ", 25_000_000, 1_234_567)
+
+    readonly = {0, 2, 7, 14}  # token program, authority, serum program, vault signer
+    source, destination = (
+        (wsol_account(owner), context.ata) if is_buy else (context.ata, wsol_account(owner))
+    )
+    assert metas(instruction) == (
+        [(key, False, index not in readonly) for index, key in enumerate(amm)]
+        + [(source, False, True), (destination, False, True), (owner, True, False)]
+    )
+
+
+def test_raydium_pool_without_amm_accounts_is_rejected():
+    owner, mint = Pubkey.new_unique(), Pubkey.new_unique()
+    pool = QuoteEngine().discover(str(mint), ("raydium", str(Pubkey.new_unique()),
+                                              str(Pubkey.new_unique())))
+    with pytest.raises(ValueError):
+        build_swap(owner, context_for(owner, mint), pool, True, 1, 1)
+
+
+@pytest.mark.parametrize("sol_is_a", [True, False])
+@pytest.mark.parametrize("is_buy", [True, False])
+def test_whirlpool_swap(sol_is_a, is_buy):
+    owner, mint, whirlpool = Pubkey.new_unique(), Pubkey.new_unique(), Pubkey.new_unique()
+    vault_a, vault_b = Pubkey.new_unique(), Pubkey.new_unique()
+    mint_a, mint_b = (WSOL_MINT, str(mint)) if sol_is_a else (str(mint), WSOL_MINT)
+    data = bytearray(whirlpool_data(mint_a, mint_b, 10**12, 10**15, tick_spacing=64))
+    struct.pack_into("<i", data, 81, -6000)
+    data[133:165] = bytes(vault_a)
+    data[213:245] = bytes(vault_b)
+    pool = QuoteEngine().discover(str(mint), ("whirlpool", str(whirlpool)))
+    pool.apply(str(whirlpool), bytes(data), 1)
+    context = context_for(owner, mint)
+
+    instruction = build_swap(owner, context, pool, is_buy, 25_000_000, 1_234_567)
+    a_to_b = is_buy == sol_is_a
+    assert instruction.program_id == WHIRLPOOL_PROGRAM_ID
+
+    data = bytes(instruction.data)
+    assert data[:8] == WHIRLPOOL_SWAP
+    assert struct.unpack_from("<QQ", data, 8) == (25_000_000, 1_234_567)
+    limit = WHIRLPOOL_MIN_SQRT_PRICE if a_to_b else WHIRLPOOL_MAX_SQRT_PRICE
+    assert int.from_bytes(data[24:40], "little") == limit
+    assert data[40:] == bytes([1, a_to_b])
+
+    source, destination = (
+        (wsol_account(owner), context.ata) if is_buy else (context.ata, wsol_account(owner))
+    )
+    owner_a, owner_b = (source, destination) if a_to_b else (destination, source)
+    oracle, _ = Pubkey.find_program_address([b"oracle", bytes(whirlpool)], WHIRLPOOL_PROGRAM_ID)
+    tick_arrays = whirlpool_tick_arrays(whirlpool, -6000, 64, a_to_b)
+    assert metas(instruction) == [
+        (TOKEN_PROGRAM_ID, False, False),
+        (owner, True, False),
+        (whirlpool, False, True),
+        (owner_a, False, True),
+        (vault_a, False, True),
+        (owner_b, False, True),
+        (vault_b, False, True),
+    ] + [(tick_array, False, True) for tick_array in tick_arrays] + [(oracle, False, True)]
+
+
+def test_whirlpool_tick_arrays_follow_the_swap_direction():
+    whirlpool = Pubkey.new_unique()
+
+    def tick_array(start):
+        return Pubkey.find_program_address(
+            [b"tick_array", bytes(whirlpool), str(start).encode()], WHIRLPOOL_PROGRAM_ID
+        )[0]
+
+    # 88 ticks of spacing 64 per array: tick -6000 lies in the array from -11264
+    assert whirlpool_tick_arrays(whirlpool, -6000, 64, True) == [
+        tick_array(-11264), tick_array(-16896), tick_array(-22528)
+    ]
+    assert whirlpool_tick_arrays(whirlpool, -6000, 64, False) == [
+        tick_array(-11264), tick_array(-5632), tick_array(0)
+    ]
+    # One tick below an array boundary, swaps up the price start in the next array
+    assert whirlpool_tick_arrays(whirlpool, -5633, 64, False)[0] == tick_array(-5632)
+
+
+def test_wrap_sol_funds_a_buy_and_closes_after():
+    owner = Pubkey.new_unique()
+    account = wsol_account(owner)
+
+    before, after = wrap_sol(owner, True, 25_000_000)
+    create, fund, sync = before
+    assert metas(create)[1] == (account, False, True)
+    assert struct.unpack("<IQ", bytes(fund.data)) == (2, 25_000_000)
+    assert metas(fund) == [(owner, True, True), (account, False, True)]
+    assert bytes(sync.data) == bytes([17])
+    (close,) = after
+    assert bytes(close.data) == bytes([9])
+    assert metas(close) == [(account, False, True), (owner, False, True), (owner, True, False)]
+
+    before, after = wrap_sol(owner, False, 25_000_000)
+    assert len(before) == 1 and len(after) == 1
@@ -0,0 +1,83 @@
+import asyncio
+import base64
+
+from solders.pubkey import Pubkey
+
+from trading.quote_engine import PUMP_CURVE, QuoteEngine
+from utils.token_cache import TOKEN_PROGRAM_ID, TokenCache, get_associated_token_address
+
+
+def account(data: bytes, owner: Pubkey) -> dict:
+    return {
+        'data': [base64.b64encode(data).decode(), 'base64'],
+        'owner': str(owner), 'lamports': 1, 'executable': False, 'rentEpoch': 0
+    }
+
+
+class FakeClient:
+    """Serves getMultipleAccounts from ``accounts`` and records each call"""
+
+    def __init__(self):
+        self.accounts = {}
+        self.calls = []
+
+    async def get_multiple_accounts(self, pubkeys, encoding="base64"):
+        keys = [str(pubkey) for pubkey in pubkeys]
+        self.calls.append(keys)
+        return {'result': {
+            'context': {'slot': 100},
+            'value': [self.accounts.get(key) for key in keys]
+        }}
+
+
+def setup():
+    client = FakeClient()
+    owner, mint, curve = Pubkey.new_unique(), Pubkey.new_unique(), Pubkey.new_unique()
+    client.accounts[str(mint)] = account(bytes(44) + bytes([6]) + bytes(37), TOKEN_PROGRAM_ID)
+    client.accounts[str(curve)] = account(
+        PUMP_CURVE.pack(10**15, 30 * 10**9, 10**15, 30 * 10**9, 10**15, False),
+        Pubkey.new_unique()
+    )
+    return client, owner, mint, curve
+
+
+def test_first_trade_loads_mint_atas_and_pool_in_one_call():
+    async def run():
+        client, owner, mint, curve = setup()
+        quote_engine = QuoteEngine()
+        quote_engine.discover(str(mint), ("pump", str(curve)))
+        cache = TokenCache(client, owner, quote_engine=quote_engine)
+
+        context = await cache.get_or_load(mint)
+        assert len(client.calls) == 1
+        assert client.calls[0][0] == str(mint)
+        assert client.calls[0][3:] == [str(curve)]
+        assert context.decimals == 6
+        assert context.ata == get_associated_token_address(owner, mint)
+        assert not context.ata_exists
+
+        # The quote engine was seeded from the same call
+        assert quote_engine.needs_load(str(mint)) == []
+        assert quote_engine.price(str(mint), 6) == 30 * 10**9 / 10**15 * 10**6 / 10**9
+
+        await cache.get_or_load(mint)
+        assert len(client.calls) == 1
+
+    asyncio.run(run())
+
+
+def test_fresh_or_unknown_pools_are_not_refetched():
+    async def run():
+        client, owner, mint, curve = setup()
+        quote_engine = QuoteEngine()
+        cache = TokenCache(client, owner, quote_engine=quote_engine)
+        await cache.get_or_load(mint)
+        assert len(client.calls[0]) == 3
+
+        quote_engine.discover(str(mint), ("pump", str(curve)))
+        await quote_engine.load(client, str(mint))
+        cache.invalidate(str(mint))
+        await cache.get_or_load(mint)
+        assert len(client.calls[-1]) == 3
+
+    asyncio.run(run())
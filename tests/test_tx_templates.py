@@ -0,0 +1,108 @@
+import asyncio
+import json
+import time
+
+import pytest
+from base58 import b58encode
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+from config import BotConfig
+from trading.decoders import WSOL_MINT
+from trading.dex_trader import DexTrader
+from trading.swap_builders import PUMP_PROGRAM_ID
+from trading.tx_templates import TxTemplate
+from utils.mock_client import MockAsyncClient, whirlpool_data
+from utils.token_cache import TOKEN_PROGRAM_ID, TokenContext, get_associated_token_address
+from utils.trade_logger import TradeLogger
+
+TRADES = [
+    # blockhash seed, amount in, min out, compute unit limit, price
+    (1, 25_000_000, 1_234_567_890, 120_000, 5_000),
+    (1, 999_999_999, 7, 400_000, 1),
+    (2, 1, 10**15, 200_000, 250_000),
+    (3, 2**63, 2**64 - 1, 1_400_000, 10**9),
+]
+
+
+POOLS = {
+    "pump": lambda: ("pump", str(Pubkey.new_unique())),
+    "raydium": lambda: ("raydium",) + tuple(str(Pubkey.new_unique()) for _ in range(17)),
+    "whirlpool": lambda: ("whirlpool", str(Pubkey.new_unique())),
+}
+
+
+def make_trader(tmp_path, kind="pump"):
+    keypair = Keypair()
+    config = BotConfig(private_key=json.dumps(list(bytes(keypair))), state_file=None)
+    trader = DexTrader(
+        MockAsyncClient(), config,
+        TradeLogger(str(tmp_path / "trades.log"), str(tmp_path / "trades.jsonl"))
+    )
+    mint = Pubkey.from_bytes(bytes(range(32)))
+    pool = trader.quote_engine.discover(str(mint), POOLS[kind]())
+    if kind == "whirlpool":
+        pool.apply(pool.accounts[0], whirlpool_data(WSOL_MINT, str(mint), 10**10, 10**15), 1)
+    context = TokenContext(
+        mint=mint,
+        decimals=6,
+        token_program=TOKEN_PROGRAM_ID,
+        ata=get_associated_token_address(keypair.pubkey(), mint),
+        ata_exists=True
+    )
+    trader.blockhash_cache.last_valid_block_height = 2**62
+    return trader, context
+
+
+async def swap_message(trader, context, is_buy, trade, fresh):
+    seed, amount_in, min_out, cu_limit, cu_price = trade
+    trader.blockhash_cache.blockhash = b58encode(bytes([seed]) * 32).decode()
+    trader.blockhash_cache.fetched_at = time.monotonic()
+    if fresh:
+        trader.templates.templates.clear()
+    message, _ = await trader._swap_message(
+        context.mint, is_buy, amount_in, min_out, context, cu_limit, cu_price
+    )
+    return message
+
+
+@pytest.mark.parametrize("kind", sorted(POOLS))
+@pytest.mark.parametrize("is_buy", [True, False])
+@pytest.mark.parametrize("ata_exists", [True, False])
+def test_template_matches_fresh_build(tmp_path, kind, is_buy, ata_exists):
+    async def run():
+        trader, context = make_trader(tmp_path, kind)
+        context.ata_exists = ata_exists
+        try:
+            # Learn the template from a trade unlike any of the checked ones
+            await swap_message(trader, context, is_buy, (9, 5, 6, 1000, 2), fresh=True)
+            learned = trader.templates.templates.copy()
+            for trade in TRADES:
+                hits = trader.templates.hits
+                patched = await swap_message(trader, context, is_buy, trade, fresh=False)
+                assert trader.templates.hits == hits + 1
+                fresh = await swap_message(trader, context, is_buy, trade, fresh=True)
+                assert patched == fresh
+                # A fresh build relearns from its own amounts; keep the first template
+                trader.templates.templates = learned.copy()
+        finally:
+            await trader.stop()
+            trader.logger.close()
+
+    asyncio.run(run())
+
+
+def test_ambiguous_layout_is_rejected(tmp_path):
+    async def run():
+        trader, context = make_trader(tmp_path)
+        try:
+            trade = (1, 5_000, 5_000, 200_000, 1_000)
+            message = await swap_message(trader, context, True, trade, fresh=True)
+            assert not trader.templates.templates
+            assert trader.templates.rejected == 1
+            assert TxTemplate.learn(message, bytes(PUMP_PROGRAM_ID), 5_000, 5_000) is None
+        finally:
+            await trader.stop()
+            trader.logger.close()
+
+    asyncio.run(run())
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+
+import numpy as np
+import pytest
+from solders.pubkey import Pubkey
+
+from trading.wallet_registry import WalletRegistry, shard_of
+
+A, B, C = (str(Pubkey.new_unique()) for _ in range(3))
+
+
+def test_apply_reports_only_the_diff():
+    registry = WalletRegistry([A, B])
+    changes = []
+    registry.attach(lambda added, removed: changes.append((added, removed)))
+
+    assert registry.apply({B: {"size_multiplier": 2.0}, C: {}}) == ([C], [A])
+    assert changes == [([C], [A])]
+    assert sorted(registry.wallets()) == sorted([B, C])
+
+    # Settings changes alone are applied without notifying listeners
+    assert registry.apply({B: {"size_multiplier": 0.5}, C: {}}) == ([], [])
+    assert len(changes) == 1
+    assert registry.size(B, True, 1.0) == 0.5
+
+
+def test_settings_limit_buys_but_not_sells():
+    registry = WalletRegistry()
+    registry.apply({A: {"max_exposure_sol": 1.0}, B: {"enabled": False}})
+
+    assert registry.size(A, True, 0.8) == 0.8
+    registry.on_open(A, "mint", 0.8)
+    assert registry.size(A, True, 0.5) is None
+    registry.on_close("mint")
+    assert registry.size(A, True, 0.5) == 0.5
+
+    assert registry.size(B, True, 1.0) is None
+    assert registry.size(B, False, 1.0) == 1.0
+    assert registry.size(None, True, 3.0) == 3.0
+
+
+@pytest.mark.parametrize("entries", [
+    {A: {}, "not-an-address": {}},
+    {A: {"size_multiplier": -1}},
+    {A: {"size_multiplier": "2"}},
+    {A: {"max_exposure_sol": True}},
+    {A: {"enabled": "yes"}},
+    {A: []},
+])
+def test_invalid_entries_leave_the_registry_unchanged(entries):
+    registry = WalletRegistry([A, B])
+    registry.apply({A: {"size_multiplier": 3.0}, B: {}})
+    changes = []
+    registry.attach(lambda added, removed: changes.append((added, removed)))
+
+    with pytest.raises(ValueError):
+        registry.apply(entries)
+    assert sorted(registry.wallets()) == sorted([A, B])
+    assert registry.size_multiplier[registry.rows[A]] == 3.0
+    assert changes == []
+
+
+def test_failed_listener_changes_are_rolled_back():
+    registry = WalletRegistry([A, B])
+    registry.attach(lambda added, removed: [C, A])
+
+    assert registry.apply({B: {}, C: {}}) == ([], [])
+    assert sorted(registry.wallets()) == sorted([A, B])
+
+    # A listener that raises rolls back every change
+    def broken(added, removed):
+        raise RuntimeError("subscription failed")
+
+    registry.listeners = [broken]
+    assert registry.apply({C: {}}) == ([], [])
+    assert sorted(registry.wallets()) == sorted([A, B])
+
+
+def test_owned_wallets_only():
+    registry = WalletRegistry(owns=lambda wallet: shard_of(wallet, 2) == 0)
+    registry.apply({A: {}, B: {}, C: {}})
+    assert sorted(registry.wallets()) == sorted(w for w in (A, B, C) if shard_of(w, 2) == 0)
+
+
+def test_rows_are_reused_and_grown():
+    registry = WalletRegistry(initial_capacity=2)
+    wallets = [str(Pubkey.new_unique()) for _ in range(5)]
+    registry.apply({wallet: {"size_multiplier": i} for i, wallet in enumerate(wallets)})
+    assert len(registry.enabled) == 8
+    assert [registry.size_multiplier[registry.rows[w]] for w in wallets] == [0, 1, 2, 3, 4]
+
+    registry.apply({wallets[0]: {}})
+    assert len(set(registry.rows.values())) == 1
+    assert not np.any(registry.enabled[[r for r in range(8) if r != registry.rows[wallets[0]]]])
+
+
+def test_reload_skips_half_written_files(tmp_path):
+    path = tmp_path / "wallets.json"
+    path.write_text(json.dumps([A]))
+    registry = WalletRegistry(path=str(path))
+    assert registry.wallets() == [A]
+    mtime = registry._mtime
+
+    path.write_text('{"' + B)
+    os.utime(path, (mtime + 5, mtime + 5))
+    with pytest.raises(json.JSONDecodeError):
+        registry.reload()
+    assert registry._mtime == mtime
+    assert registry.wallets() == [A]
+
+    path.write_text(json.dumps({B: {"enabled": False}}))
+    os.utime(path, (mtime + 10, mtime + 10))
+
+    async def poll():
+        registry.reload_interval = 0.01
+        registry.start()
+        await asyncio.sleep(0.05)
+        await registry.stop()
+
+    asyncio.run(poll())
+    assert registry.wallets() == [B]
+    assert registry._mtime == mtime + 10
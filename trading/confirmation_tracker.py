@@ -0,0 +1,212 @@
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import TxOpts
+from solders.signature import Signature
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from utils.blockhash_cache import BlockhashCache
+
+# getSignatureStatuses accepts at most 256 signatures per request
+MAX_SIGNATURES_PER_REQUEST = 256
+
+CONFIRMED = "confirmed"
+FAILED = "failed"
+EXPIRED = "expired"
+
+COMMITMENT_LEVELS = {"processed": 0, "confirmed": 1, "finalized": 2}
+
+
+class PendingTransaction:
+    """A sent transaction awaiting confirmation"""
+
+    __slots__ = (
+        "signature", "raw", "last_valid_block_height", "on_done", "future",
+        "sent_at", "last_sent", "broadcasts", "status", "slot", "error"
+    )
+
+    def __init__(self, signature: str, raw: bytes, last_valid_block_height: int,
+                 on_done: Optional[Callable[['PendingTransaction'], None]]):
+        self.signature = signature
+        self.raw = raw
+        self.last_valid_block_height = last_valid_block_height
+        self.on_done = on_done
+        self.future = asyncio.get_running_loop().create_future()
+        self.sent_at = self.last_sent = time.monotonic()
+        self.broadcasts = 1
+        self.status: Optional[str] = None
+        self.slot: Optional[int] = None
+        self.error = None
+
+
+class ConfirmationTracker:
+    """
+    In-flight transaction tracker.
+
+    Polls the status of every pending signature with one batched
+    ``getSignatureStatuses`` call per interval, and rebroadcasts the signed
+    bytes of unconfirmed transactions until they land or their blockhash
+    passes its last valid block height. The current block height is
+    estimated from the blockhash cache, so expiry checks cost no extra
+    requests while the cache is fresh.
+    """
+
+    def __init__(self, client: AsyncClient, blockhash_cache: BlockhashCache,
+                 commitment: str = "confirmed", poll_interval: float = 0.4,
+                 rebroadcast_interval: float = 0.3):
+        self.client = client
+        self.blockhash_cache = blockhash_cache
+        self.commitment_level = COMMITMENT_LEVELS[commitment]
+        self.poll_interval = poll_interval
+        self.rebroadcast_interval = rebroadcast_interval
+        self.pending: Dict[str, PendingTransaction] = {}
+
+        self.confirmed = 0
+        self.failed = 0
+        self.expired = 0
+        self.rebroadcasts = 0
+        self.status_requests = 0
+
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, client: AsyncClient, blockhash_cache: BlockhashCache,
+                    config: 'BotConfig') -> 'ConfirmationTracker':
+        return cls(
+            client,
+            blockhash_cache,
+            commitment=config.commitment,
+            poll_interval=config.confirmation_poll_interval,
+            rebroadcast_interval=config.rebroadcast_interval
+        )
+
+    def start(self):
+        """Start the background poll / rebroadcast task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def track(self, signature: str, raw: bytes, last_valid_block_height: int,
+              on_done: Optional[Callable[[PendingTransaction], None]] = None) -> PendingTransaction:
+        """
+        Track a sent transaction until it confirms, fails or expires
+
+        ``on_done`` is called once with the finished PendingTransaction;
+        its ``future`` resolves to the final status at the same time.
+        """
+        pending = PendingTransaction(signature, raw, last_valid_block_height, on_done)
+        self.pending[signature] = pending
+        self._wake.set()
+        return pending
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "pending": len(self.pending),
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "rebroadcasts": self.rebroadcasts,
+            "status_requests": self.status_requests,
+        }
+
+    async def poll(self):
+        """Fetch statuses for all pending signatures and settle finished ones"""
+        signatures = list(self.pending)
+        for start in range(0, len(signatures), MAX_SIGNATURES_PER_REQUEST):
+            batch = signatures[start:start + MAX_SIGNATURES_PER_REQUEST]
+            response = await self.client.get_signature_statuses(
+                [Signature.from_string(signature) for signature in batch]
+            )
+            self.status_requests += 1
+
+            for signature, status in zip(batch, response['result']['value']):
+                if status is None:
+                    continue
+                level = COMMITMENT_LEVELS.get(status.get('confirmationStatus'), 0)
+                if status.get('err') is not None:
+                    self._settle(signature, FAILED, status['slot'], status['err'])
+                elif level >= self.commitment_level:
+                    self._settle(signature, CONFIRMED, status['slot'])
+
+        # Anything still pending past its blockhash can no longer land
+        block_height = await self._block_height()
+        for pending in list(self.pending.values()):
+            if block_height > pending.last_valid_block_height:
+                self._settle(pending.signature, EXPIRED)
+
+    async def rebroadcast(self):
+        """Resend every pending transaction that has not been sent recently"""
+        now = time.monotonic()
+        due = [
+            pending for pending in self.pending.values()
+            if now - pending.last_sent >= self.rebroadcast_interval
+        ]
+        if due:
+            await asyncio.gather(*(self._resend(pending) for pending in due))
+
+    async def _resend(self, pending: PendingTransaction):
+        pending.last_sent = time.monotonic()
+        try:
+            await self.client.send_raw_transaction(
+                pending.raw,
+                opts=TxOpts(skip_preflight=True, skip_confirmation=True)
+            )
+            pending.broadcasts += 1
+            self.rebroadcasts += 1
+        except Exception as e:
+            logging.debug(f"Rebroadcast error for {pending.signature}: {str(e)}")
+
+    async def _block_height(self) -> int:
+        """Current block height, estimated from the blockhash cache when fresh"""
+        cache = self.blockhash_cache
+        if cache.last_valid_block_height is not None and cache.blocks_remaining() > 0:
+            return cache.last_valid_block_height - cache.blocks_remaining()
+        response = await self.client.get_block_height(cache.commitment)
+        return response['result']
+
+    def _settle(self, signature: str, status: str, slot: Optional[int] = None, error=None):
+        pending = self.pending.pop(signature, None)
+        if pending is None:
+            return
+
+        pending.status = status
+        pending.slot = slot
+        pending.error = error
+        if status == CONFIRMED:
+            self.confirmed += 1
+        elif status == FAILED:
+            self.failed += 1
+        else:
+            self.expired += 1
+
+        if pending.on_done is not None:
+            try:
+                pending.on_done(pending)
+            except Exception as e:
+                logging.error(f"Confirmation handler error for {signature}: {str(e)}")
+        if not pending.future.done():
+            pending.future.set_result(status)
+
+    async def _run(self):
+        last_poll = 0.0
+        interval = min(self.poll_interval, self.rebroadcast_interval)
+        while True:
+            if not self.pending:
+                self._wake.clear()
+                await self._wake.wait()
+
+            await asyncio.sleep(interval)
+            try:
+                if time.monotonic() - last_poll >= self.poll_interval:
+                    last_poll = time.monotonic()
+                    await self.poll()
+                await self.rebroadcast()
+            except Exception as e:
+                logging.error(f"Confirmation tracking error: {str(e)}")
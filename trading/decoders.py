@@ -0,0 +1,352 @@
+"""
+Zero-copy decoders for base64-encoded swap transactions.
+
+Transactions are parsed straight from their wire bytes through memoryview
+slices; only the accounts a decoder actually reports are base58-encoded, and
+those strings are cached since the same mints recur across notifications.
+Decoders are registered per program id and turn a matching instruction into
+a compact TradeSignal. Payloads without a recognised swap decode to None so
+callers can fall back to the jsonParsed path.
+"""
+import base64
+import hashlib
+import struct
+from typing import Callable, Dict, List, Optional, Tuple
+
+from base58 import b58decode, b58encode
+
+WSOL_MINT = "So11111111111111111111111111111111111111112"
+WSOL_MINT_BYTES = b58decode(WSOL_MINT)
+LAMPORTS_PER_SOL = 10**9
+KEY_CACHE_SIZE = 4096
+
+U64 = struct.Struct("<Q")
+U64_PAIR = struct.Struct("<QQ")
+
+
+class TradeSignal:
+    __slots__ = ("mint", "is_buy", "amount", "percentage", "pool")
+
+    def __init__(self, mint: str, is_buy: bool, amount: float, percentage: float = 100.0):
+        self.mint = mint
+        self.is_buy = is_buy
+        self.amount = amount
+        self.percentage = percentage
+        # Pool kind and the accounts that price it, e.g. ("pump", curve)
+        self.pool: Optional[Tuple[str, ...]] = None
+
+    def __repr__(self) -> str:
+        side = "buy" if self.is_buy else "sell"
+        return f"TradeSignal({side} {self.amount} {self.mint} {self.percentage:.1f}%)"
+
+
+class RawTransaction:
+    """Account keys and instructions sliced out of a serialized transaction"""
+
+    __slots__ = ("buf", "keys_offset", "key_count", "instructions", "meta", "_balances")
+
+    def __init__(self, buf: memoryview, keys_offset: int, key_count: int,
+                 instructions: List[Tuple[int, memoryview, memoryview]], meta: Dict):
+        self.buf = buf
+        self.keys_offset = keys_offset
+        self.key_count = key_count
+        self.instructions = instructions
+        self.meta = meta or {}
+        self._balances = None
+
+    def key(self, index: int) -> bytes:
+        """Account key bytes, including addresses loaded from lookup tables"""
+        if index < self.key_count:
+            start = self.keys_offset + 32 * index
+            return bytes(self.buf[start:start + 32])
+        loaded = self.meta.get('loadedAddresses') or {}
+        extra = loaded.get('writable', []) + loaded.get('readonly', [])
+        return b58decode(extra[index - self.key_count])
+
+    def key_str(self, index: int) -> str:
+        return encode_key(self.key(index))
+
+    def token_balance(self, index: int) -> Optional[Dict]:
+        """Pre-trade token balance entry for an account index, if any"""
+        if self._balances is None:
+            self._balances = {}
+            for entry in self.meta.get('postTokenBalances') or []:
+                self._balances[entry['accountIndex']] = entry
+            for entry in self.meta.get('preTokenBalances') or []:
+                self._balances[entry['accountIndex']] = entry
+        return self._balances.get(index)
+
+    def mint_of(self, index: int) -> Optional[str]:
+        entry = self.token_balance(index)
+        return entry['mint'] if entry else None
+
+
+_key_strings: Dict[bytes, str] = {}
+
+
+def encode_key(key: bytes) -> str:
+    """Base58 string for a 32-byte key, cached"""
+    encoded = _key_strings.get(key)
+    if encoded is None:
+        if len(_key_strings) >= KEY_CACHE_SIZE:
+            _key_strings.clear()
+        encoded = _key_strings[key] = b58encode(key).decode()
+    return encoded
+
+
+def read_compact_u16(buf: memoryview, offset: int) -> Tuple[int, int]:
+    value = 0
+    for shift in (0, 7, 14):
+        byte = buf[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            break
+    return value, offset
+
+
+def parse_transaction(raw: bytes, meta: Optional[Dict] = None) -> RawTransaction:
+    """Slice a legacy or v0 wire-format transaction without copying"""
+    buf = memoryview(raw)
+    signatures, offset = read_compact_u16(buf, 0)
+    offset += 64 * signatures
+
+    if buf[offset] & 0x80:
+        offset += 1  # Versioned message prefix
+    offset += 3  # Message header
+
+    key_count, offset = read_compact_u16(buf, offset)
+    keys_offset = offset
+    offset += 32 * key_count + 32  # Keys and recent blockhash
+
+    instruction_count, offset = read_compact_u16(buf, offset)
+    instructions = []
+    for _ in range(instruction_count):
+        program_index = buf[offset]
+        account_count = buf[offset + 1]
+        if account_count < 0x80:
+            offset += 2
+        else:
+            account_count, offset = read_compact_u16(buf, offset + 1)
+        accounts = buf[offset:offset + account_count]
+        offset += account_count
+        data_length = buf[offset]
+        if data_length < 0x80:
+            offset += 1
+        else:
+            data_length, offset = read_compact_u16(buf, offset)
+        data = buf[offset:offset + data_length]
+        offset += data_length
+        instructions.append((program_index, accounts, data))
+
+    return RawTransaction(buf, keys_offset, key_count, instructions, meta)
+
+
+Decoder = Callable[[RawTransaction, memoryview, memoryview], Optional[TradeSignal]]
+DECODERS: Dict[bytes, Decoder] = {}
+
+
+def register_decoder(program_id: str):
+    """Register a decoder for instructions of a program"""
+    def wrap(decoder: Decoder) -> Decoder:
+        DECODERS[b58decode(program_id)] = decoder
+        return decoder
+    return wrap
+
+
+def anchor_discriminator(name: str) -> bytes:
+    return hashlib.sha256(f"global:{name}".encode()).digest()[:8]
+
+
+def _encoded_transaction(payload) -> Tuple[Optional[str], Optional[Dict]]:
+    """The base64 transaction string and meta of a notification, if binary"""
+    if not isinstance(payload, dict):
+        return None, None
+    if 'value' in payload and isinstance(payload['value'], dict):
+        payload = payload['value']
+
+    encoded = payload.get('transaction')
+    if isinstance(encoded, (list, tuple)):
+        if len(encoded) < 2 or encoded[1] != 'base64':
+            return None, None
+        encoded = encoded[0]
+    if not isinstance(encoded, str):
+        return None, None
+    return encoded, payload.get('meta')
+
+
+def signature_key(payload) -> Optional[str]:
+    """
+    Dedupe key for a base64 payload without decoding it: the leading 88
+    characters cover the signature count and the whole first signature.
+    """
+    encoded, _ = _encoded_transaction(payload)
+    if encoded is None or len(encoded) < 88:
+        return None
+    return encoded[:88]
+
+
+def decode_signal(payload) -> Optional[TradeSignal]:
+    """Decode a base64 transaction payload into a TradeSignal"""
+    encoded, meta = _encoded_transaction(payload)
+    if encoded is None:
+        return None
+
+    tx = parse_transaction(base64.b64decode(encoded), meta)
+    for program_index, accounts, data in tx.instructions:
+        decoder = DECODERS.get(tx.key(program_index))
+        if decoder is None:
+            continue
+        signal = decoder(tx, accounts, data)
+        if signal is not None:
+            return signal
+    return None
+
+
+def _token_signal(tx: RawTransaction, source: int, destination: int,
+                  amount_in: int) -> Optional[TradeSignal]:
+    """Build a signal from the user's source and destination token accounts"""
+    source_mint = tx.mint_of(source)
+    destination_mint = tx.mint_of(destination)
+
+    if source_mint == WSOL_MINT and destination_mint:
+        return TradeSignal(destination_mint, True, amount_in / LAMPORTS_PER_SOL)
+    if destination_mint == WSOL_MINT and source_mint:
+        return _sell_signal(tx, source, source_mint, amount_in)
+    return None
+
+
+def _sell_signal(tx: RawTransaction, account: int, mint: str,
+                 amount: int) -> TradeSignal:
+    """Size a sell as a share of the wallet's pre-trade balance"""
+    entry = tx.token_balance(account)
+    percentage = 100.0
+    decimals = 0
+    if entry:
+        token_amount = entry['uiTokenAmount']
+        decimals = token_amount.get('decimals', 0)
+        held = int(token_amount.get('amount', 0))
+        if held > 0:
+            percentage = min(100.0, amount / held * 100)
+    return TradeSignal(mint, False, amount / 10**decimals, percentage)
+
+
+@register_decoder("675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8")
+def decode_raydium_amm(tx: RawTransaction, accounts: memoryview,
+                       data: memoryview) -> Optional[TradeSignal]:
+    """Raydium AMM v4 swapBaseIn (9) / swapBaseOut (11)"""
+    if len(data) < 17 or data[0] not in (9, 11) or len(accounts) < 17:
+        return None
+    # swapBaseIn: amount_in, min_out; swapBaseOut: max_in, amount_out
+    amount_in, _ = U64_PAIR.unpack_from(data, 1)
+    signal = _token_signal(tx, accounts[-3], accounts[-2], amount_in)
+    if signal is not None:
+        # Pool coin / pc vaults sit just before the 8 Serum accounts; the
+        # AMM and Serum accounts ahead of the user's are kept to swap with
+        signal.pool = (
+            "raydium", tx.key_str(accounts[-13]), tx.key_str(accounts[-12]),
+            *(tx.key_str(account) for account in accounts[:-3])
+        )
+    return signal
+
+
+PUMP_BUY = anchor_discriminator("buy")
+PUMP_SELL = anchor_discriminator("sell")
+
+
+@register_decoder("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
+def decode_pump_fun(tx: RawTransaction, accounts: memoryview,
+                    data: memoryview) -> Optional[TradeSignal]:
+    """Pump.fun bonding-curve buy / sell; the mint is account 2"""
+    if len(data) < 24 or len(accounts) < 7:
+        return None
+    discriminator = bytes(data[:8])
+    token_amount, sol_amount = U64_PAIR.unpack_from(data, 8)
+    mint = tx.key_str(accounts[2])
+
+    if discriminator == PUMP_BUY:
+        # sol_amount is max_sol_cost
+        signal = TradeSignal(mint, True, sol_amount / LAMPORTS_PER_SOL)
+    elif discriminator == PUMP_SELL:
+        signal = _sell_signal(tx, accounts[5], mint, token_amount)
+    else:
+        return None
+    signal.pool = ("pump", tx.key_str(accounts[3]))
+    return signal
+
+
+JUPITER_ROUTE = anchor_discriminator("route")
+JUPITER_SHARED_ROUTE = anchor_discriminator("shared_accounts_route")
+JUPITER_EXACT_OUT = anchor_discriminator("exact_out_route")
+JUPITER_SHARED_EXACT_OUT = anchor_discriminator("shared_accounts_exact_out_route")
+
+
+@register_decoder("JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4")
+def decode_jupiter(tx: RawTransaction, accounts: memoryview,
+                   data: memoryview) -> Optional[TradeSignal]:
+    """Jupiter v6 routes; amounts are the fixed-size tail after the route plan"""
+    if len(data) < 27:
+        return None
+    discriminator = bytes(data[:8])
+    # ... in/out amount (u64), quoted amount (u64), slippage_bps (u16), fee_bps (u8)
+    amount, quoted = U64_PAIR.unpack_from(data, len(data) - 19)
+
+    if discriminator == JUPITER_SHARED_ROUTE or discriminator == JUPITER_SHARED_EXACT_OUT:
+        if len(accounts) < 9:
+            return None
+        source = accounts[3]
+        source_mint = tx.key(accounts[7])
+        source_is_sol = source_mint == WSOL_MINT_BYTES
+        destination_mint = tx.key(accounts[8])
+    elif discriminator == JUPITER_ROUTE or discriminator == JUPITER_EXACT_OUT:
+        if len(accounts) < 6:
+            return None
+        source = accounts[2]
+        source_mint = tx.mint_of(source)
+        source_is_sol = source_mint == WSOL_MINT
+        destination_mint = tx.key(accounts[5])
+    else:
+        return None
+
+    # exact-out routes carry the output amount first; the quote is the input
+    amount_in = quoted if discriminator in (JUPITER_EXACT_OUT, JUPITER_SHARED_EXACT_OUT) else amount
+    if source_is_sol:
+        return TradeSignal(encode_key(destination_mint), True, amount_in / LAMPORTS_PER_SOL)
+    if destination_mint == WSOL_MINT_BYTES and source_mint:
+        if isinstance(source_mint, bytes):
+            source_mint = encode_key(source_mint)
+        return _sell_signal(tx, source, source_mint, amount_in)
+    return None
+
+
+WHIRLPOOL_SWAP = anchor_discriminator("swap")
+WHIRLPOOL_SWAP_V2 = anchor_discriminator("swap_v2")
+
+
+@register_decoder("whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc")
+def decode_orca_whirlpool(tx: RawTransaction, accounts: memoryview,
+                          data: memoryview) -> Optional[TradeSignal]:
+    """Orca Whirlpool swap / swap_v2"""
+    # amount (u64), threshold (u64), sqrt_price_limit (u128), specified_is_input, a_to_b
+    if len(data) < 42:
+        return None
+    discriminator = bytes(data[:8])
+    amount, threshold = U64_PAIR.unpack_from(data, 8)
+    specified_is_input = bool(data[40])
+    a_to_b = bool(data[41])
+    amount_in = amount if specified_is_input else threshold
+
+    if discriminator == WHIRLPOOL_SWAP and len(accounts) >= 7:
+        whirlpool, owner_a, owner_b = accounts[2], accounts[3], accounts[5]
+    elif discriminator == WHIRLPOOL_SWAP_V2 and len(accounts) >= 11:
+        whirlpool, owner_a, owner_b = accounts[4], accounts[7], accounts[9]
+    else:
+        return None
+
+    if a_to_b:
+        signal = _token_signal(tx, owner_a, owner_b, amount_in)
+    else:
+        signal = _token_signal(tx, owner_b, owner_a, amount_in)
+    if signal is not None:
+        signal.pool = ("whirlpool", tx.key_str(whirlpool))
+    return signal
@@ -1,83 +1,466 @@
-```python
 from solana.rpc.async_api import AsyncClient
 from solana.transaction import Transaction
-from solana.publickey import PublicKey
+from solana.rpc.types import TxOpts
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.pubkey import Pubkey
 from decimal import Decimal
-import logging
-from typing import Dict, Optional
+from base58 import b58decode
+import asyncio
+from typing import Dict, Optional, Set, Tuple
 
+from compute_profiles import ComputeUnitProfiles, RouteKey
+from fee_estimator import PriorityFeeEstimator, RpcFeeSource
+from gas_manager import GasManager
+from slippage_calculator import SlippageCalculator
+from trading.confirmation_tracker import CONFIRMED, FAILED, ConfirmationTracker, PendingTransaction
+from trading.decoders import decode_signal
+from trading.quote_engine import LAMPORTS_PER_SOL, QuoteEngine
+from trading.signal_coalescer import BASE_FEE_LAMPORTS
+from trading.swap_builders import WRAPPED_SOL_KINDS, build_swap, create_ata_idempotent, wrap_sol
+from trading.tx_templates import TemplateCache, TransactionSigner
+from trading.wallet_registry import WalletRegistry, shard_of
+from utils.balance_ledger import BalanceLedger
+from utils.blockhash_cache import BlockhashCache
+from utils.latency_tracer import LatencyTracer, PARSE, PRICE, SEND, Span, TOKEN_CONTEXT
 from utils.position_manager import PositionManager
 from utils.price_tracker import PriceTracker
+from utils.shared_positions import SharedPositionTable
+from utils.state_store import StateStore
+from utils.token_cache import TokenCache, TokenContext
 from utils.trade_logger import TradeLogger
+from wallet import WalletManager
 
 class DexTrader:
     def __init__(self, client: AsyncClient, config: 'BotConfig', 
-                 logger: TradeLogger):
+                 logger: TradeLogger,
+                 position_table: Optional[SharedPositionTable] = None, shard: int = 0):
         self.client = client
         self.config = config
         self.logger = logger
         self.position_manager = PositionManager(
             config.stop_loss_percentage,
-            config.take_profit_percentage
+            config.take_profit_percentage,
+            shared=position_table,
+            shard=shard,
+            max_exposure=config.max_total_exposure_sol
         )
         self.price_tracker = PriceTracker()
+        self.slippage_calculator = SlippageCalculator.from_config(config)
+        self.wallets = WalletRegistry.from_config(
+            config,
+            owns=(lambda wallet: shard_of(wallet, config.shards) == shard)
+            if position_table is not None else None
+        )
+        self.state_store = StateStore.from_config(config)
+        if self.state_store is not None:
+            # Resume stop-losses and volatility windows from before a restart
+            self.state_store.restore(
+                self.position_manager, self.price_tracker, self.slippage_calculator
+            )
+        self.tracer = LatencyTracer()
+        self.blockhash_cache = BlockhashCache(client, config.commitment)
+        self.quote_engine = QuoteEngine(
+            stale_slots=config.pool_stale_slots,
+            slot_source=self.blockhash_cache.current_slot,
+            idle_ttl=config.pool_idle_ttl,
+            keep=self._holds
+        )
+        self.confirmations = ConfirmationTracker.from_config(
+            client, self.blockhash_cache, config
+        )
+        self.keypair = WalletManager.load_private_key(config.private_key)
+        self.templates = TemplateCache(config.tx_template_cache_size)
+        self.signer = TransactionSigner(self.keypair, config.signing_threads)
+        self._blockhash: Tuple[Optional[str], bytes] = (None, b"")
+        self.token_cache = TokenCache(
+            client,
+            self.keypair.pubkey(),
+            max_size=config.token_cache_size,
+            ttl=config.token_cache_ttl,
+            quote_engine=self.quote_engine
+        )
+        self.balances = BalanceLedger.from_config(
+            client, self.keypair.pubkey(), config, shared=position_table, shard=shard
+        )
+        self.fee_estimator = PriorityFeeEstimator(
+            RpcFeeSource(client),
+            percentile=config.priority_fee_percentile,
+            min_fee=config.min_priority_fee,
+            max_fee=config.max_priority_fee,
+            refresh_interval=config.fee_refresh_interval
+        )
+        self.gas_manager = GasManager(
+            {
+                "priority_fee": config.base_priority_fee,
+                "compute_units": config.base_compute_units
+            },
+            fee_estimator=self.fee_estimator
+        )
+        self.compute_profiles = ComputeUnitProfiles(
+            client,
+            percentile=config.compute_unit_percentile,
+            headroom=config.compute_unit_headroom
+        )
+        self.routes: Dict[Tuple[Optional[str], bool], RouteKey] = {}  # (pool kind, side) -> route
+        self._profiling: Set[asyncio.Task] = set()
+        
+    def start(self):
+        """Start background refresh tasks"""
+        self.blockhash_cache.start()
+        self.confirmations.start()
+        if self.state_store is not None:
+            self.state_store.start()
+        self.wallets.start()
+        self.balances.start()
+        self.quote_engine.start()
+        self.fee_estimator.start()
+        
+    async def stop(self):
+        """Stop background refresh tasks"""
+        for task in list(self._profiling):
+            task.cancel()
+        await asyncio.gather(*self._profiling, return_exceptions=True)
+        await self.fee_estimator.stop()
+        await self.quote_engine.stop()
+        await self.balances.stop()
+        await self.wallets.stop()
+        await self.confirmations.stop()
+        await self.blockhash_cache.stop()
+        if self.state_store is not None:
+            await self.state_store.stop()
+        self.signer.close()
+        
+    def parse_signal(self, tx_data: Dict) -> Optional[Tuple[Pubkey, bool, float, float]]:
+        """
+        Extract token and trade details from a monitored transaction
+        
+        Returns None for transactions no registered decoder recognizes,
+        e.g. transfers, unsupported programs or jsonParsed payloads.
+        """
+        signal = decode_signal(tx_data)
+        if signal is None:
+            return None
+        self.quote_engine.discover(signal.mint, signal.pool)
+        return Pubkey.from_string(signal.mint), signal.is_buy, signal.amount, signal.percentage
         
-    async def handle_transaction(self, wallet: str, tx_data: Dict):
+    async def handle_transaction(self, wallet: str, tx_data: Dict,
+                                 span: Optional[Span] = None):
         """Handle incoming transaction from monitored wallet"""
         try:
-            # Extract token and trade details
-            token = self._extract_token_address(tx_data)
-            is_buy = self._is_buy_transaction(tx_data)
-            amount = self._extract_amount(tx_data)
-            percentage = self._calculate_trade_percentage(tx_data)
+            signal = self.parse_signal(tx_data)
+            if signal is None:
+                if span is not None:
+                    self.tracer.release(span)
+                return
+            token, is_buy, amount, percentage = signal
+            if span is not None:
+                span.mark(PARSE)
             
             # Execute mirrored trade
-            await self.execute_trade(token, is_buy, amount, percentage)
+            await self.execute_trade(
+                token, is_buy, amount, percentage, span=span, wallet=wallet
+            )
             
         except Exception as e:
+            if span is not None:
+                self.tracer.release(span)
             self.logger.logger.error(f"Error handling transaction: {str(e)}")
             
-    async def execute_trade(self, token: PublicKey, is_buy: bool, 
-                          base_amount: float, percentage: float = 100.0):
-        """Execute trade with position tracking and risk management"""
+    async def execute_trade(self, token: Pubkey, is_buy: bool, 
+                          base_amount: float, percentage: float = 100.0,
+                          span: Optional[Span] = None,
+                          wallet: Optional[str] = None,
+                          size: Optional[float] = None) -> Optional[PendingTransaction]:
+        """
+        Execute trade with position tracking and risk management
+        
+        Returns the in-flight transaction; positions are only updated once
+        it confirms. ``wallet`` is the copied wallet the signal came from;
+        ``size`` is an order already sized in SOL, e.g. by the coalescer.
+        Once the balance ledger is seeded, buys are capped by free SOL and
+        sells by the tokens held, without any RPC calls.
+        """
+        reserved = 0
         try:
-            # Calculate adjusted amount based on percentage
-            amount = self.config.trade_size_sol * (percentage / 100.0)
+            # Calculate adjusted amount based on percentage and wallet settings
+            amount = size if size is not None else self.wallets.size(
+                wallet, is_buy, self.config.trade_size_sol * (percentage / 100.0)
+            )
+            if amount is None:
+                self.logger.logger.info(f"Skipping buy of {token} from {wallet}: wallet limit")
+                if span is not None:
+                    self.tracer.release(span)
+                return None
+            
+            # Exposure limit, shared across shards
+            if is_buy and not self.position_manager.can_open(amount):
+                self.logger.logger.warning(
+                    f"Skipping buy of {token}: exposure limit of "
+                    f"{self.config.max_total_exposure_sol} SOL reached"
+                )
+                if span is not None:
+                    self.tracer.release(span)
+                return None
+            
+            # Compute budget from the route's learned usage and the fees
+            # recently paid on this mint's pool
+            cu_limit, cu_price = self._compute_budget(token, is_buy)
+            fee_lamports = BASE_FEE_LAMPORTS + cu_limit * cu_price // 10**6
+            
+            # Never spend SOL we do not have
+            if is_buy and self.balances.seeded:
+                available = self.balances.available_sol() - fee_lamports / LAMPORTS_PER_SOL
+                if available * LAMPORTS_PER_SOL < 1:
+                    self.logger.logger.warning(f"Skipping buy of {token}: no free SOL")
+                    if span is not None:
+                        self.tracer.release(span)
+                    return None
+                if amount > available:
+                    self.logger.logger.info(
+                        f"Capping buy of {token} from {amount} to {available} SOL"
+                    )
+                    amount = available
+            
+            # Resolve cached mint accounts and metadata
+            context = await self.token_cache.get_or_load(token)
+            if span is not None:
+                span.mark(TOKEN_CONTEXT)
+            if is_buy:
+                self.balances.watch(context)
             
             # Get current price and execute trade
-            price = await self._get_token_price(token)
+            price = await self._get_token_price(token, context)
+            if span is not None:
+                span.mark(PRICE)
             
-            # Update price tracker
+            # Update price tracker and volatility window
             self.price_tracker.update_price(str(token), Decimal(str(price)))
+            if self.config.slippage_tolerance is None:
+                self.slippage_calculator.update_price(str(token), price)
+            
+            # Size sells from the tokens actually held
+            amount_in = self._amount_in(is_buy, amount, price, context)
+            if not is_buy and self.balances.seeded:
+                held = self.balances.token_account(str(context.ata))
+                amount_in = held if size is None and percentage >= 100 else min(amount_in, held)
+                if amount_in <= 0:
+                    self.logger.logger.info(f"Skipping sell of {token}: none held")
+                    if span is not None:
+                        self.tracer.release(span)
+                    return None
+                amount = amount_in * price / 10**context.decimals
+            
+            # Quote locally for the minimum output
+            min_out = self._min_out(token, is_buy, amount_in)
             
             # Execute the trade
-            result = await self._execute_dex_trade(token, is_buy, amount)
+            message, last_valid_block_height = await self._swap_message(
+                token, is_buy, amount_in, min_out, context, cu_limit, cu_price
+            )
+            reserved = fee_lamports + (amount_in if is_buy else 0)
+            self.balances.reserve(reserved)
+            signature, raw = await self._send_transaction(message)
+            if span is not None:
+                span.mark(SEND)
+                self.tracer.track_landing(signature, span.wallet, span.slot)
+                self.tracer.finish(span)
+                span = None
             
-            if result:
-                if is_buy:
-                    # Open new position
-                    self.position_manager.open_position(
-                        str(token),
-                        Decimal(str(price)),
-                        amount
-                    )
-                else:
-                    # Close position
-                    self.position_manager.close_position(
-                        str(token),
-                        Decimal(str(price))
-                    )
-                
-                # Log trade
-                self.logger.log_trade(
-                    str(token),
-                    "buy" if is_buy else "sell",
-                    amount,
-                    Decimal(str(price)),
-                    self.config.slippage_tolerance or 0.5,
-                    self.config.gas_multiplier
+            # Rebroadcast until it lands; positions follow confirmation
+            return self.confirmations.track(
+                signature,
+                raw,
+                last_valid_block_height,
+                lambda pending: self._on_trade_landed(
+                    token, is_buy, amount, price, pending, wallet,
+                    str(context.ata), amount_in, min_out or 0, reserved, fee_lamports,
+                    self._route(token, is_buy)
                 )
+            )
                 
         except Exception as e:
+            self.balances.release(reserved)
+            if span is not None:
+                self.tracer.release(span)
             self.logger.logger.error(f"Trade execution error: {str(e)}")
-```
\ No newline at end of file
+            return None
+            
+    async def _get_token_price(self, token: Pubkey, context: TokenContext) -> float:
+        """Spot price in SOL from the local quote engine; swaps need a known pool"""
+        mint = str(token)
+        pool = self.quote_engine.pools.get(mint)
+        if pool is None:
+            raise ValueError(f"No known pool for {token}")
+        
+        if not pool.ready or self.quote_engine.is_stale(pool):
+            await self.quote_engine.load(self.client, mint)
+        price = self.quote_engine.price(mint, context.decimals)
+        if price is None:
+            raise ValueError(f"Pool for {token} cannot be priced")
+        return price
+        
+    def _compute_budget(self, token: Pubkey, is_buy: bool) -> Tuple[int, int]:
+        """Compute-unit limit and price (micro-lamports per unit) for a swap"""
+        pool = self.quote_engine.pools.get(str(token))
+        route = self._route(token, is_buy)
+        gas = self.gas_manager.calculate_gas(
+            self.config.gas_multiplier,
+            accounts=pool.accounts if pool is not None else [str(token)],
+            compute_units=self.compute_profiles.get_limit(route) if route is not None else None
+        )
+        return gas["compute_units"], gas["priority_fee"]
+        
+    def _route(self, token: Pubkey, is_buy: bool) -> Optional[RouteKey]:
+        """Compute profile route of a swap, once one has been built for its pool kind"""
+        pool = self.quote_engine.pools.get(str(token))
+        if pool is None:
+            return None
+        return self.routes.get((pool.kind, is_buy))
+        
+    def _profile(self, coroutine):
+        """Run a compute profile lookup in the background"""
+        task = asyncio.ensure_future(coroutine)
+        self._profiling.add(task)
+        task.add_done_callback(self._profiling.discard)
+        
+    def _holds(self, mint: str) -> bool:
+        """Whether we hold a position or tokens in ``mint``"""
+        return mint in self.position_manager.token_rows or self.balances.token(mint) > 0
+        
+    @staticmethod
+    def _amount_in(is_buy: bool, amount: float, price: float,
+                   context: TokenContext) -> int:
+        """Input in base units for a trade of ``amount`` SOL"""
+        if is_buy:
+            return int(amount * LAMPORTS_PER_SOL)
+        return int(amount / price * 10**context.decimals)
+        
+    def _min_out(self, token: Pubkey, is_buy: bool, amount_in: int) -> Optional[int]:
+        """Minimum output in base units for ``amount_in`` base units"""
+        quote = self.quote_engine.quote(str(token), amount_in, is_buy)
+        if quote is None:
+            return None
+        if quote.stale:
+            self.logger.logger.warning(f"Quoting {token} from a stale pool (slot {quote.slot})")
+        return quote.min_out(self.slippage(token))
+        
+    def slippage(self, token: Pubkey) -> float:
+        """Configured slippage percentage, else the token's volatility-based one"""
+        if self.config.slippage_tolerance is not None:
+            return self.config.slippage_tolerance
+        return self.slippage_calculator.get_slippage(str(token))
+        
+    async def _swap_message(self, token: Pubkey, is_buy: bool, amount_in: int,
+                            min_out: Optional[int], context: TokenContext,
+                            cu_limit: int, cu_price: int) -> Tuple[bytes, int]:
+        """
+        Serialized swap message and the block height its blockhash expires at
+        
+        The swap is preceded by SetComputeUnitLimit and SetComputeUnitPrice,
+        and by creating our token account on a mint's first buy; pools that
+        trade against wrapped SOL are bracketed by funding and closing our
+        wrapped SOL account. Repeat
+        trades of a (route, mint, side) patch a cached template, compute
+        budget included; the first one builds the transaction and learns
+        the template.
+        """
+        pool = self.quote_engine.pools.get(str(token))
+        if pool is None or min_out is None:
+            raise ValueError(f"No quoted pool to swap {token} on")
+        
+        blockhash = self.blockhash_cache.get() or await self.blockhash_cache.refresh()
+        last_valid_block_height = self.blockhash_cache.last_valid_block_height
+        
+        key = (pool.kind, str(token), is_buy)
+        template = self.templates.get(key)
+        if template is not None:
+            if blockhash != self._blockhash[0]:
+                self._blockhash = (blockhash, b58decode(blockhash))
+            message = template.render(
+                self._blockhash[1], amount_in, min_out, cu_limit, cu_price
+            )
+            return message, last_valid_block_height
+        
+        owner = self.keypair.pubkey()
+        swap_ix = build_swap(owner, context, pool, is_buy, amount_in, min_out)
+        instructions = [set_compute_unit_limit(cu_limit), set_compute_unit_price(cu_price)]
+        if is_buy and not context.ata_exists:
+            instructions.append(create_ata_idempotent(owner, context))
+        after = []
+        if pool.kind in WRAPPED_SOL_KINDS:
+            before, after = wrap_sol(owner, is_buy, amount_in)
+            instructions += before
+        tx = Transaction(fee_payer=owner).add(*instructions, swap_ix, *after)
+        tx.recent_blockhash = Hash.from_string(blockhash)
+        message = tx.serialize_message()
+        
+        # Learn the route's usage off the hot path: simulate it once if
+        # asked to, confirmed trades refine it
+        route = self.compute_profiles.route_key(swap_ix)
+        self.routes[(pool.kind, is_buy)] = route
+        if (self.config.simulate_unseen_routes
+                and self.compute_profiles.get_limit(route) is None):
+            self._profile(self.compute_profiles.simulate(route, tx))
+        self.templates.learn(key, message, bytes(swap_ix.program_id), amount_in, min_out)
+        return message, last_valid_block_height
+        
+    async def _send_transaction(self, message: bytes) -> Tuple[str, bytes]:
+        """Sign off the event loop and send, returning the signature and signed bytes"""
+        _, raw = await self.signer.sign(message)
+        result = await self.client.send_raw_transaction(
+            raw,
+            opts=TxOpts(skip_preflight=True, skip_confirmation=True)
+        )
+        return result['result'], raw
+        
+    def _on_trade_landed(self, token: Pubkey, is_buy: bool, amount: float,
+                         price: float, pending: PendingTransaction,
+                         wallet: Optional[str] = None, token_account: Optional[str] = None,
+                         amount_in: int = 0, min_out: int = 0, reserved: int = 0,
+                         fee_lamports: int = BASE_FEE_LAMPORTS,
+                         route: Optional[RouteKey] = None):
+        """Update balances, positions and the log once a trade has settled"""
+        self.balances.release(reserved)
+        if self.balances.seeded and pending.status in (CONFIRMED, FAILED):
+            # Failed transactions still pay the fee; output counts at its minimum
+            self.balances.apply_trade(
+                token_account, is_buy, amount_in, min_out, fee_lamports,
+                pending.slot, landed=pending.status == CONFIRMED
+            )
+        
+        if pending.status != CONFIRMED:
+            self.logger.logger.warning(
+                f"Trade {pending.signature} {pending.status} after "
+                f"{pending.broadcasts} broadcasts: {pending.error}"
+            )
+            return
+        
+        self.tracer.on_landed(pending.signature, pending.slot)
+        if route is not None:
+            self._profile(self.compute_profiles.record_confirmed(route, pending.signature))
+        if is_buy:
+            # Open new position
+            self.position_manager.open_position(
+                str(token),
+                Decimal(str(price)),
+                amount
+            )
+            self.wallets.on_open(wallet, str(token), amount)
+        else:
+            # Close position
+            self.position_manager.close_position(
+                str(token),
+                Decimal(str(price))
+            )
+            self.wallets.on_close(str(token))
+        
+        # Log trade
+        self.logger.log_trade(
+            str(token),
+            "buy" if is_buy else "sell",
+            amount,
+            Decimal(str(price)),
+            self.slippage(token),
+            self.config.gas_multiplier
+        )
@@ -0,0 +1,460 @@
+from solana.rpc.async_api import AsyncClient
+from solders.pubkey import Pubkey
+import asyncio
+import base64
+import logging
+import math
+import struct
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from base58 import b58encode
+
+from trading.decoders import WSOL_MINT
+
+LAMPORTS_PER_SOL = 10**9
+Q64 = float(2**64)
+
+# SPL token account layout: mint (32) + owner (32) + amount (8)
+TOKEN_ACCOUNT_AMOUNT_OFFSET = 64
+
+RAYDIUM_FEE_BPS = 25
+PUMP_FEE_BPS = 100
+
+# Pump.fun bonding curve: discriminator, then virtual / real reserves
+PUMP_CURVE = struct.Struct("<8xQQQQQ?")
+
+# Orca Whirlpool: discriminator, config, bump, then tick_spacing (u16) at 41,
+# fee_rate (u16) at 45, liquidity (u128) at 49, sqrt_price (u128) at 65,
+# tick_current_index (i32) at 81, token_mint_a at 101, token_vault_a at 133,
+# token_mint_b at 181, token_vault_b at 213
+WHIRLPOOL_TICK_SPACING = struct.Struct("<H")
+WHIRLPOOL_FEE_RATE = struct.Struct("<H")
+WHIRLPOOL_TICK = struct.Struct("<i")
+
+
+class Quote:
+    __slots__ = ("amount_in", "amount_out", "price_impact", "slot", "stale")
+
+    def __init__(self, amount_in: int, amount_out: int, price_impact: float,
+                 slot: Optional[int], stale: bool):
+        self.amount_in = amount_in
+        self.amount_out = amount_out
+        self.price_impact = price_impact  # Percent below the spot price
+        self.slot = slot
+        self.stale = stale
+
+    def min_out(self, slippage: float) -> int:
+        """Minimum output accepting ``slippage`` percent of further movement"""
+        return int(self.amount_out * (1 - slippage / 100))
+
+
+class Pool:
+    """
+    In-memory pool state for one token/SOL market.
+
+    ``accounts`` are the accounts whose data determines a quote; each
+    update records the slot it was observed at. Amounts are raw base units:
+    lamports on the SOL side and the token's smallest unit on the other.
+    """
+
+    kind: Optional[str] = None  # Route name, as in POOL_TYPES
+
+    def __init__(self, mint: str, accounts: List[str]):
+        self.mint = mint
+        self.accounts = accounts
+        self.slot: Optional[int] = None
+        self.last_used = time.monotonic()
+
+    @property
+    def ready(self) -> bool:
+        raise NotImplementedError
+
+    def apply(self, account: str, data: bytes, slot: Optional[int]):
+        raise NotImplementedError
+
+    def spot_price(self) -> float:
+        """Lamports per token base unit"""
+        raise NotImplementedError
+
+    def amount_out(self, amount_in: int, is_buy: bool) -> int:
+        raise NotImplementedError
+
+    def _observe(self, slot: Optional[int]):
+        if slot is not None:
+            self.slot = slot if self.slot is None else max(self.slot, slot)
+
+
+class ConstantProductPool(Pool):
+    """x*y=k pool with the fee taken on the input side"""
+
+    def __init__(self, mint: str, accounts: List[str], fee_bps: int):
+        super().__init__(mint, accounts)
+        self.fee_bps = fee_bps
+        self.token_reserve = 0
+        self.sol_reserve = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.token_reserve > 0 and self.sol_reserve > 0
+
+    def spot_price(self) -> float:
+        return self.sol_reserve / self.token_reserve
+
+    def amount_out(self, amount_in: int, is_buy: bool) -> int:
+        reserve_in, reserve_out = (
+            (self.sol_reserve, self.token_reserve) if is_buy
+            else (self.token_reserve, self.sol_reserve)
+        )
+        amount_in = amount_in * (10000 - self.fee_bps) // 10000
+        return reserve_out * amount_in // (reserve_in + amount_in)
+
+
+class RaydiumAmmPool(ConstantProductPool):
+    """
+    Raydium AMM v4, priced from its two vault token accounts.
+
+    ``amm_accounts`` are the AMM and Serum accounts of the swap we learned
+    the pool from, in instruction order; a swap of our own reuses them.
+    """
+
+    kind = "raydium"
+
+    def __init__(self, mint: str, coin_vault: str, pc_vault: str, *amm_accounts: str):
+        super().__init__(mint, [coin_vault, pc_vault], RAYDIUM_FEE_BPS)
+        self.amm_accounts = list(amm_accounts)
+
+    def apply(self, account: str, data: bytes, slot: Optional[int]):
+        vault_mint = b58encode(data[:32]).decode()
+        amount = struct.unpack_from("<Q", data, TOKEN_ACCOUNT_AMOUNT_OFFSET)[0]
+        if vault_mint == WSOL_MINT:
+            self.sol_reserve = amount
+        else:
+            self.token_reserve = amount
+        self._observe(slot)
+
+
+class PumpCurvePool(ConstantProductPool):
+    """Pump.fun bonding curve; quotes run on the virtual reserves"""
+
+    kind = "pump"
+
+    def __init__(self, mint: str, bonding_curve: str):
+        super().__init__(mint, [bonding_curve], PUMP_FEE_BPS)
+        self.complete = False
+
+    @property
+    def ready(self) -> bool:
+        return super().ready and not self.complete
+
+    def apply(self, account: str, data: bytes, slot: Optional[int]):
+        token, sol, _, _, _, complete = PUMP_CURVE.unpack_from(data)
+        self.token_reserve = token
+        self.sol_reserve = sol
+        self.complete = complete
+        self._observe(slot)
+
+    def amount_out(self, amount_in: int, is_buy: bool) -> int:
+        # The curve charges its fee in SOL: on the way in for buys, out for sells
+        if is_buy:
+            return super().amount_out(amount_in, True)
+        sol_out = self.sol_reserve * amount_in // (self.token_reserve + amount_in)
+        return sol_out * (10000 - self.fee_bps) // 10000
+
+
+class WhirlpoolPool(Pool):
+    """
+    Orca Whirlpool (CLMM).
+
+    Quotes use the liquidity active at the current tick, which is exact
+    while a swap stays inside the current tick range. Larger swaps would
+    cross into tick arrays we do not track, so their output is an estimate.
+    """
+
+    kind = "whirlpool"
+
+    def __init__(self, mint: str, whirlpool: str):
+        super().__init__(mint, [whirlpool])
+        self.liquidity = 0
+        self.sqrt_price = 0.0  # sqrt(token_b / token_a) in base units
+        self.tick = 0
+        self.fee_rate = 0.0
+        self.tick_spacing = 0
+        self.sol_is_a = False
+        self.vault_a: Optional[str] = None
+        self.vault_b: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.liquidity > 0 and self.sqrt_price > 0
+
+    def apply(self, account: str, data: bytes, slot: Optional[int]):
+        self.tick_spacing = WHIRLPOOL_TICK_SPACING.unpack_from(data, 41)[0]
+        self.fee_rate = WHIRLPOOL_FEE_RATE.unpack_from(data, 45)[0] / 1e6
+        self.liquidity = int.from_bytes(data[49:65], "little")
+        self.sqrt_price = int.from_bytes(data[65:81], "little") / Q64
+        self.tick = WHIRLPOOL_TICK.unpack_from(data, 81)[0]
+        self.sol_is_a = b58encode(data[101:133]).decode() == WSOL_MINT
+        self.vault_a = b58encode(data[133:165]).decode()
+        self.vault_b = b58encode(data[213:245]).decode()
+        self._observe(slot)
+
+    def spot_price(self) -> float:
+        price_b_per_a = self.sqrt_price ** 2
+        return 1 / price_b_per_a if self.sol_is_a else price_b_per_a
+
+    def amount_out(self, amount_in: int, is_buy: bool) -> int:
+        a_to_b = is_buy == self.sol_is_a
+        amount = amount_in * (1 - self.fee_rate)
+        liquidity, sqrt_price = self.liquidity, self.sqrt_price
+
+        if a_to_b:
+            next_sqrt = liquidity * sqrt_price / (liquidity + amount * sqrt_price)
+            out = liquidity * (sqrt_price - next_sqrt)
+        else:
+            next_sqrt = sqrt_price + amount / liquidity
+            out = liquidity * (next_sqrt - sqrt_price) / (sqrt_price * next_sqrt)
+        return int(math.floor(out))
+
+
+POOL_TYPES = {
+    "raydium": RaydiumAmmPool,
+    "pump": PumpCurvePool,
+    "whirlpool": WhirlpoolPool,
+}
+
+
+class QuoteEngine:
+    """
+    Local pricing for the pools we trade.
+
+    Pools are learned from the swaps we copy, loaded once with a single
+    ``getMultipleAccounts`` call and then kept current from account
+    subscriptions, so prices and quotes are computed in-process.
+
+    A pool whose accounts all have live subscriptions is fresh however
+    quiet it is, since any change would have been notified. It needs a
+    reload only after its subscriptions were re-established following a
+    reconnect, or while they are down, in which case it is stale once its
+    last update is more than ``stale_slots`` behind the current slot
+    reported by ``slot_source``. Pools unused for ``idle_ttl`` seconds are
+    dropped and unsubscribed unless ``keep(mint)`` says we hold the token.
+    """
+
+    def __init__(self, stale_slots: int = 10,
+                 slot_source: Optional[Callable[[], Optional[int]]] = None,
+                 idle_ttl: float = 600.0,
+                 keep: Optional[Callable[[str], bool]] = None,
+                 sweep_interval: float = 60.0):
+        self.stale_slots = stale_slots
+        self.slot_source = slot_source
+        self.idle_ttl = idle_ttl
+        self.keep = keep
+        self.sweep_interval = sweep_interval
+        self.pools: Dict[str, Pool] = {}  # mint -> pool
+        self.account_index: Dict[str, Pool] = {}  # watched account -> pool
+        self.reload: Set[str] = set()  # Mints whose subscriptions were re-established
+        self.subscriptions: Optional['SubscriptionManager'] = None
+        self.latest_slot = 0
+        self.updates = 0
+        self.evictions = 0
+        self._task = None
+
+    def start(self):
+        """Start evicting idle pools"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def add_pool(self, pool: Pool) -> Pool:
+        """Track a pool, keeping the existing one if the mint already has it"""
+        existing = self.pools.get(pool.mint)
+        if existing is not None:
+            return existing
+
+        self.pools[pool.mint] = pool
+        for account in pool.accounts:
+            self.account_index[account] = pool
+            if self.subscriptions is not None:
+                self.subscriptions.register(Pubkey.from_string(account), self.on_account_change)
+        return pool
+
+    def discover(self, mint: str, pool_ref: Optional[Tuple[str, ...]]) -> Optional[Pool]:
+        """Track the pool a decoded swap traded through, e.g. ("pump", curve)"""
+        if pool_ref is None or mint in self.pools:
+            return self.pools.get(mint)
+        pool_type = POOL_TYPES.get(pool_ref[0])
+        if pool_type is None:
+            return None
+        return self.add_pool(pool_type(mint, *pool_ref[1:]))
+
+    def attach(self, subscriptions: 'SubscriptionManager'):
+        """Receive account-change notifications for every pool account"""
+        self.subscriptions = subscriptions
+        subscriptions.add_reconnect_listener(self.on_reconnect)
+        for account in self.account_index:
+            subscriptions.register(Pubkey.from_string(account), self.on_account_change)
+
+    def on_reconnect(self, accounts: List[str]):
+        """Flag pools whose notifications may have been missed while disconnected"""
+        for account in accounts:
+            pool = self.account_index.get(account)
+            if pool is not None:
+                self.reload.add(pool.mint)
+
+    def remove_pool(self, mint: str):
+        """Stop tracking a pool and unsubscribe its accounts"""
+        pool = self.pools.pop(mint, None)
+        if pool is None:
+            return
+        self.reload.discard(mint)
+        for account in pool.accounts:
+            if self.account_index.get(account) is pool:
+                del self.account_index[account]
+            if self.subscriptions is not None:
+                self.subscriptions.unregister(Pubkey.from_string(account), self.on_account_change)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop pools idle for ``idle_ttl`` seconds that we hold no tokens of"""
+        now = time.monotonic() if now is None else now
+        idle = [
+            mint for mint, pool in self.pools.items()
+            if now - pool.last_used > self.idle_ttl
+            and (self.keep is None or not self.keep(mint))
+        ]
+        for mint in idle:
+            self.remove_pool(mint)
+        self.evictions += len(idle)
+        return len(idle)
+
+    async def load(self, client: AsyncClient, mint: str) -> Optional[Pool]:
+        """Fetch a pool's accounts once; subscriptions keep them current"""
+        pool = self.pools.get(mint)
+        if pool is None:
+            return None
+
+        response = await client.get_multiple_accounts(
+            [Pubkey.from_string(account) for account in pool.accounts],
+            encoding="base64"
+        )
+        return self.seed(
+            mint, response['result']['value'], response['result']['context']['slot']
+        )
+
+    def needs_load(self, mint: str) -> List[str]:
+        """Accounts to fetch before ``mint`` can be quoted; empty if none"""
+        pool = self.pools.get(mint)
+        if pool is None or (pool.ready and not self.is_stale(pool)):
+            return []
+        return pool.accounts
+
+    def seed(self, mint: str, values: List[Optional[Dict]], slot: int) -> Optional[Pool]:
+        """
+        Apply a getMultipleAccounts result for a pool's accounts, given in
+        ``pool.accounts`` order, e.g. batched into another lookup
+        """
+        pool = self.pools.get(mint)
+        if pool is None:
+            return None
+        pool.last_used = time.monotonic()
+
+        for account, value in zip(pool.accounts, values):
+            if value is not None:
+                pool.apply(account, base64.b64decode(value['data'][0]), slot)
+        self.reload.discard(mint)
+        self._observe(slot)
+        return pool
+
+    async def on_account_change(self, account: str, notification):
+        pool = self.account_index.get(account)
+        if pool is None:
+            return
+
+        data, slot = self._account_data(notification)
+        if data is None:
+            return
+        try:
+            pool.apply(account, data, slot)
+            self.updates += 1
+            self._observe(slot)
+        except Exception as e:
+            logging.error(f"Pool decode error for {account}: {str(e)}")
+
+    def current_slot(self) -> int:
+        slot = self.slot_source() if self.slot_source is not None else None
+        return max(slot or 0, self.latest_slot)
+
+    def is_stale(self, pool: Pool) -> bool:
+        if pool.slot is None or pool.mint in self.reload:
+            return True
+        subscriptions = self.subscriptions
+        if subscriptions is not None and all(subscriptions.is_live(a) for a in pool.accounts):
+            return False
+        return self.current_slot() - pool.slot > self.stale_slots
+
+    def price(self, mint: str, decimals: int) -> Optional[float]:
+        """SOL per whole token, or None without a ready pool"""
+        pool = self.pools.get(mint)
+        if pool is None or not pool.ready:
+            return None
+        pool.last_used = time.monotonic()
+        return pool.spot_price() * 10**decimals / LAMPORTS_PER_SOL
+
+    def quote(self, mint: str, amount_in: int, is_buy: bool) -> Optional[Quote]:
+        """
+        Quote a swap of ``amount_in`` base units
+
+        Buys spend lamports for tokens, sells spend tokens for lamports.
+        """
+        pool = self.pools.get(mint)
+        if pool is None or not pool.ready or amount_in <= 0:
+            return None
+        pool.last_used = time.monotonic()
+
+        amount_out = pool.amount_out(amount_in, is_buy)
+        spot = pool.spot_price()
+        ideal = amount_in / spot if is_buy else amount_in * spot
+        impact = max(0.0, (1 - amount_out / ideal) * 100) if ideal else 0.0
+        return Quote(amount_in, amount_out, impact, pool.slot, self.is_stale(pool))
+
+    def stale_pools(self) -> List[str]:
+        return [mint for mint, pool in self.pools.items() if self.is_stale(pool)]
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                evicted = self.sweep()
+            except Exception as e:
+                logging.error(f"Pool sweep error: {str(e)}")
+                continue
+            if evicted:
+                logging.info(f"Evicted {evicted} idle pools")
+
+    def _observe(self, slot: Optional[int]):
+        if slot is not None and slot > self.latest_slot:
+            self.latest_slot = slot
+
+    @staticmethod
+    def _account_data(notification) -> Tuple[Optional[bytes], Optional[int]]:
+        """Account bytes and context slot from an account notification"""
+        if isinstance(notification, dict):
+            value = notification.get('value')
+            slot = (notification.get('context') or {}).get('slot')
+        else:
+            value = getattr(notification, "value", None)
+            slot = getattr(getattr(notification, "context", None), "slot", None)
+        if value is None:
+            return None, slot
+
+        data = value.get('data') if isinstance(value, dict) else getattr(value, "data", None)
+        if isinstance(data, (list, tuple)):
+            data = base64.b64decode(data[0])
+        elif isinstance(data, str):
+            data = base64.b64decode(data)
+        return (bytes(data) if data is not None else None), slot
@@ -0,0 +1,131 @@
+"""
+Replay captured wallet transactions into DexTrader offline.
+
+    python -m trading.replay capture.bin [--realtime] [--speed 2.0] [--latency 0.02]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from solders.keypair import Keypair
+
+from config import BotConfig
+from utils.capture import CaptureReader
+from utils.latency_tracer import LatencyTracer
+from utils.mock_client import MockAsyncClient
+
+
+class ReplayEngine:
+    """
+    Feed a capture file into a notification handler.
+
+    In realtime mode records are delivered at their original inter-arrival
+    spacing (scaled by ``speed``); otherwise as fast as the handler accepts
+    them. With a tracer, each record starts a latency span the same way
+    TransactionMonitor does for live notifications.
+    """
+
+    def __init__(self, reader: CaptureReader,
+                 handler: Callable[..., Awaitable[None]],
+                 realtime: bool = False, speed: float = 1.0,
+                 tracer: Optional[LatencyTracer] = None):
+        self.reader = reader
+        self.handler = handler
+        self.realtime = realtime
+        self.speed = speed
+        self.tracer = tracer
+
+    async def run(self) -> Dict[str, float]:
+        count = 0
+        max_behind = 0.0
+        first_arrival = None
+        start = time.perf_counter()
+
+        for record in self.reader:
+            if self.realtime:
+                if first_arrival is None:
+                    first_arrival = record.arrival_ns
+                due = (record.arrival_ns - first_arrival) / 1e9 / self.speed
+                delay = due - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    max_behind = max(max_behind, -delay)
+
+            span = None
+            if self.tracer is not None:
+                span = self.tracer.begin(record.account, record.slot)
+            try:
+                await self.handler(record.account, record.decode(), span)
+            except Exception as e:
+                logging.error(f"Replay handler error: {str(e)}")
+            count += 1
+
+        elapsed = time.perf_counter() - start
+        return {
+            "notifications": count,
+            "elapsed_seconds": elapsed,
+            "notifications_per_sec": count / elapsed if elapsed else 0.0,
+            "max_behind_seconds": max_behind,
+        }
+
+
+async def replay(path: str, realtime: bool, speed: float, latency: float) -> Dict:
+    # Imported here so the engine itself has no trader dependency
+    from trading.decoders import decode_signal
+    from trading.dex_trader import DexTrader
+    from trading.signal_queue import SignalQueue
+    from utils.trade_logger import TradeLogger
+
+    keypair = Keypair()
+    config = BotConfig(private_key=json.dumps(list(bytes(keypair))), state_file=None)
+    client = MockAsyncClient(latency=latency)
+    logger = TradeLogger('replay.log', 'replay_trades.jsonl')
+    trader = DexTrader(client, config, logger)
+    signal_queue = SignalQueue.from_config(trader, config)
+
+    async def handle(wallet: str, payload, span=None):
+        # Give the mock the mint and pool accounts the trade will look up
+        signal = decode_signal(payload)
+        if signal is not None and signal.pool is not None:
+            client.add_market(signal.mint, signal.pool)
+        await signal_queue.handle_transaction(wallet, payload, span)
+
+    reader = CaptureReader(path)
+    trader.start()
+    signal_queue.start()
+    try:
+        results = await ReplayEngine(
+            reader, handle, realtime, speed, trader.tracer
+        ).run()
+        await signal_queue.join()
+    finally:
+        await signal_queue.stop()
+        await trader.stop()
+        reader.close()
+        logger.close()
+
+    results.update(signal_queue.stats)
+    results["sent"] = len(client.sent)
+    results["latency"] = trader.tracer.summary()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a notification capture")
+    parser.add_argument('capture')
+    parser.add_argument('--realtime', action='store_true')
+    parser.add_argument('--speed', type=float, default=1.0)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Mock RPC latency in seconds")
+    args = parser.parse_args()
+
+    results = asyncio.run(replay(args.capture, args.realtime, args.speed, args.latency))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+from solders.pubkey import Pubkey
+import asyncio
+import logging
+from typing import Dict, List, Mapping, Set, Tuple
+
+
+class RiskEngine:
+    """
+    Scheduled stop-loss / take-profit enforcement.
+
+    Every tick the open positions are priced from the quote engine's live
+    pool state, falling back to the last traded price for tokens without
+    a ready pool, and checked in one vectorized pass. Each triggered
+    position is sold through
+    ``DexTrader.execute_trade``, sized at the position's current value. A
+    token is only exited once while its sell is in flight, i.e. until the
+    sell confirms, fails or expires.
+    """
+
+    def __init__(self, trader: 'DexTrader', interval: float = 0.4):
+        self.trader = trader
+        self.position_manager = trader.position_manager
+        self.interval = interval
+        self.exiting: Set[str] = set()
+        self.exits_triggered = 0
+        self._task = None
+        self._exits: Set[asyncio.Task] = set()
+
+    def start(self):
+        """Start checking positions every interval"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for task in list(self._exits):
+            task.cancel()
+        await asyncio.gather(*self._exits, return_exceptions=True)
+
+    def current_prices(self) -> Dict[str, float]:
+        """Live pool prices of held tokens, else their last traded prices"""
+        quote_engine = self.trader.quote_engine
+        contexts = self.trader.token_cache.entries
+        traded = self.trader.price_tracker.token_prices
+        prices = {}
+        for token in self.position_manager.token_rows:
+            context = contexts.get(token)
+            price = (
+                quote_engine.price(token, context.decimals)
+                if context is not None else None
+            )
+            if price is None:
+                last = traded.get(token)
+                if last is None:
+                    continue
+                price = float(last)
+            prices[token] = price
+        return prices
+
+    def on_prices(self, prices: Mapping[str, float]) -> List[Tuple[str, str]]:
+        """Check a price snapshot and dispatch exits for triggered positions"""
+        # Forget exits whose sells have closed the position
+        self.exiting &= self.position_manager.token_rows.keys()
+
+        exits = [
+            (token, reason)
+            for token, reason in self.position_manager.check_exits(prices)
+            if token not in self.exiting
+        ]
+        for token, reason in exits:
+            self.exiting.add(token)
+            self.exits_triggered += 1
+            logging.warning(f"{reason} triggered for {token} at {prices[token]} SOL")
+            task = asyncio.create_task(self._exit(token, prices[token]))
+            self._exits.add(task)
+            task.add_done_callback(self._exits.discard)
+        return exits
+
+    async def _exit(self, token: str, price: float):
+        try:
+            # Size the sell at the position's current value, i.e. all of
+            # the tokens it bought
+            entry = float(self.position_manager.entry_prices[token])
+            size = self.position_manager.amount(token) * price / entry
+            pending = await self.trader.execute_trade(
+                Pubkey.from_string(token), False, 0, 100.0, size=size
+            )
+            if pending is not None:
+                await pending.future
+        except Exception as e:
+            logging.error(f"Exit trade error for {token}: {str(e)}")
+        finally:
+            if token in self.position_manager.token_rows:
+                # Sell failed; allow the next tick to retry
+                self.exiting.discard(token)
+
+    async def _run(self):
+        while True:
+            try:
+                self.on_prices(self.current_prices())
+            except Exception as e:
+                logging.error(f"Risk check error: {str(e)}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,216 @@
+from solders.pubkey import Pubkey
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from utils.latency_tracer import Span
+
+LAMPORTS_PER_SOL = 10**9
+BASE_FEE_LAMPORTS = 5000  # Per signature
+DUST_SOL = 1 / LAMPORTS_PER_SOL  # Net sizes below one lamport cancel out
+
+
+class MintWindow:
+    """Signals for one mint collected during one coalescing window"""
+
+    __slots__ = ("token", "net", "signals", "wallets", "spans", "handle")
+
+    def __init__(self, token: Pubkey):
+        self.token = token
+        self.net = 0.0  # SOL, buys positive and sells negative
+        self.signals = 0
+        self.wallets: Dict[Optional[str], float] = {}  # SOL contributed per wallet
+        self.spans: List[Span] = []
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+
+class SignalCoalescer:
+    """
+    Merges signals for the same mint that arrive within ``window`` seconds.
+
+    Each signal is sized with its wallet's settings as it arrives; when the
+    window closes, buys and sells are netted into at most one order, which
+    is capped so the mint's open and in-flight exposure stays within
+    ``max_mint_exposure`` SOL. Orders for a mint execute one after another.
+    Trades saved are signals that did not become an order of their own;
+    fees saved assume each would have paid the base fee plus the
+    configured priority fee.
+    """
+
+    def __init__(self, trader: 'DexTrader', window: float = 0.3,
+                 max_mint_exposure: Optional[float] = None,
+                 fee_per_trade: float = BASE_FEE_LAMPORTS / LAMPORTS_PER_SOL):
+        self.trader = trader
+        self.window = window
+        self.max_mint_exposure = max_mint_exposure
+        self.fee_per_trade = fee_per_trade
+
+        self.windows: Dict[str, MintWindow] = {}
+        self.in_flight: Dict[str, float] = {}  # mint -> SOL of unconfirmed buys
+        self._last_order: Dict[str, asyncio.Task] = {}
+        self.stats: Dict[str, float] = {
+            "signals": 0,
+            "orders": 0,
+            "merged": 0,
+            "netted": 0,
+            "capped": 0,
+            "skipped": 0,
+        }
+
+    @classmethod
+    def from_config(cls, trader: 'DexTrader', config: 'BotConfig') -> 'SignalCoalescer':
+        priority_fee = config.base_priority_fee * config.base_compute_units / 10**6
+        return cls(
+            trader,
+            window=config.coalesce_window,
+            max_mint_exposure=config.max_mint_exposure_sol,
+            fee_per_trade=(BASE_FEE_LAMPORTS + priority_fee) / LAMPORTS_PER_SOL
+        )
+
+    def submit(self, wallet: Optional[str], token: Pubkey, is_buy: bool,
+               percentage: float, span: Optional[Span] = None):
+        """Add a signal to its mint's window, opening one if needed"""
+        self.stats["signals"] += 1
+        amount = self.trader.wallets.size(
+            wallet, is_buy, self.trader.config.trade_size_sol * (percentage / 100.0)
+        )
+        if amount is None:
+            self.stats["skipped"] += 1
+            self._release(span)
+            return
+
+        mint = str(token)
+        window = self.windows.get(mint)
+        if window is None:
+            window = self.windows[mint] = MintWindow(token)
+            window.handle = asyncio.get_running_loop().call_later(
+                self.window, self._close, mint
+            )
+
+        window.net += amount if is_buy else -amount
+        window.signals += 1
+        window.wallets[wallet] = window.wallets.get(wallet, 0.0) + amount
+        if span is not None:
+            window.spans.append(span)
+
+    def flush(self):
+        """Close every open window now"""
+        for mint in list(self.windows):
+            self.windows[mint].handle.cancel()
+            self._close(mint)
+
+    async def stop(self, drain: bool = False):
+        """
+        Abandon open windows and cancel orders not yet sent, or with
+        ``drain`` close the windows now and wait for their orders
+        """
+        if drain:
+            self.flush()
+        else:
+            for window in self.windows.values():
+                window.handle.cancel()
+                for span in window.spans:
+                    self._release(span)
+            self.windows.clear()
+
+        tasks = list(self._last_order.values())
+        if not drain:
+            for task in tasks:
+                task.cancel()
+        # Orders for a mint await each other, so the last ones cover the rest
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._last_order.clear()
+        if not drain:
+            # Orders cancelled before they started never settle their buys
+            self.in_flight.clear()
+
+    def trades_saved(self) -> int:
+        return int(self.stats["signals"] - self.stats["skipped"] - self.stats["orders"])
+
+    def fees_saved(self) -> float:
+        """Estimated SOL in transaction fees not paid"""
+        return self.trades_saved() * self.fee_per_trade
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            **self.stats,
+            "trades_saved": self.trades_saved(),
+            "fees_saved_sol": self.fees_saved(),
+        }
+
+    def _close(self, mint: str):
+        window = self.windows.pop(mint)
+        is_buy = window.net > 0
+        amount = abs(window.net)
+        netted = amount < DUST_SOL
+
+        if is_buy and self.max_mint_exposure is not None:
+            held = self.trader.position_manager.amount(mint) + self.in_flight.get(mint, 0.0)
+            room = max(0.0, self.max_mint_exposure - held)
+            if amount > room:
+                self.stats["capped"] += 1
+                logging.info(f"Capping {mint} buy from {amount} to {room} SOL")
+                amount = room
+
+        # Keep one span to trace the order; the rest end here
+        span = window.spans[0] if window.spans else None
+        for other in window.spans[1:]:
+            self._release(other)
+
+        if amount < DUST_SOL:
+            # Opposing signals cancelled out, or the cap left no room
+            if netted:
+                self.stats["netted"] += window.signals
+            self._release(span)
+            return
+
+        self.stats["orders"] += 1
+        self.stats["merged"] += window.signals - 1
+
+        # Count the buy against the cap until it confirms or fails
+        if is_buy:
+            self.in_flight[mint] = self.in_flight.get(mint, 0.0) + amount
+
+        # Attribute the order to the wallet that contributed most
+        wallet = max(window.wallets, key=window.wallets.get)
+        previous = self._last_order.get(mint)
+        task = asyncio.create_task(
+            self._execute(previous, window.token, is_buy, amount, wallet, span)
+        )
+        self._last_order[mint] = task
+        task.add_done_callback(lambda done: self._forget_order(mint, done))
+
+    async def _execute(self, previous: Optional[asyncio.Task], token: Pubkey,
+                       is_buy: bool, amount: float, wallet: Optional[str],
+                       span: Optional[Span]):
+        """Execute one order after the mint's previous order has been sent"""
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+
+        mint = str(token)
+        pending = None
+        try:
+            pending = await self.trader.execute_trade(
+                token, is_buy, 0, span=span, wallet=wallet, size=amount
+            )
+        except Exception as e:
+            logging.error(f"Coalesced trade error for {mint}: {str(e)}")
+        finally:
+            if is_buy:
+                if pending is None:
+                    self._settle(mint, amount)
+                else:
+                    pending.future.add_done_callback(lambda _: self._settle(mint, amount))
+
+    def _settle(self, mint: str, amount: float):
+        remaining = self.in_flight.pop(mint, 0.0) - amount
+        if remaining > 1e-12:
+            self.in_flight[mint] = remaining
+
+    def _forget_order(self, mint: str, task: asyncio.Task):
+        if self._last_order.get(mint) is task:
+            del self._last_order[mint]
+
+    def _release(self, span: Optional[Span]):
+        if span is not None:
+            self.trader.tracer.release(span)
@@ -0,0 +1,213 @@
+from solders.pubkey import Pubkey
+from collections import OrderedDict
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from trading.decoders import signature_key
+from trading.signal_coalescer import SignalCoalescer
+from utils.latency_tracer import DEQUEUE, PARSE, Span
+
+# wallet, token, is_buy, amount, percentage, span, dedupe key
+Signal = Tuple[str, Pubkey, bool, float, float, Optional[Span], Optional[str]]
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class SignalQueue:
+    """
+    Bounded pipeline stage between TransactionMonitor and DexTrader.
+
+    Exposes the same ``handle_transaction`` coroutine as DexTrader so the
+    monitor can hand it transactions directly. Signals are deduplicated by
+    transaction signature (or wallet and slot when the payload has none)
+    and sharded by mint onto one queue per worker, so
+    trades for the same token always execute in arrival order while slow
+    trades on other tokens keep draining. With a coalescer, parsed signals
+    are handed to it instead, and it decides which trades to execute.
+    """
+
+    def __init__(self, trader: 'DexTrader', workers: int = 4,
+                 max_size: int = 1000, overflow_policy: str = "drop_oldest",
+                 dedupe_size: int = 10000,
+                 coalescer: Optional['SignalCoalescer'] = None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.trader = trader
+        self.coalescer = coalescer
+        self.workers = max(1, workers)
+        self.overflow_policy = overflow_policy
+        self.dedupe_size = dedupe_size
+
+        shard_size = max(1, max_size // self.workers)
+        self.queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=shard_size) for _ in range(self.workers)
+        ]
+        self.seen: "OrderedDict[str, None]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "received": 0,
+            "duplicates": 0,
+            "dropped": 0,
+            "executed": 0,
+            "coalesced": 0,
+            "failed": 0,
+            "ignored": 0,
+        }
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_config(cls, trader: 'DexTrader', config: 'BotConfig') -> 'SignalQueue':
+        return cls(
+            trader,
+            workers=config.trade_workers,
+            max_size=config.signal_queue_size,
+            overflow_policy=config.queue_overflow_policy,
+            coalescer=(
+                SignalCoalescer.from_config(trader, config)
+                if config.coalesce_window > 0 else None
+            )
+        )
+
+    def start(self):
+        """Start the trade workers"""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(queue)) for queue in self.queues
+            ]
+
+    async def stop(self):
+        """Cancel the trade workers, abandoning queued signals"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.coalescer is not None:
+            await self.coalescer.stop()
+
+    async def join(self):
+        """Wait until every queued signal has been processed"""
+        for queue in self.queues:
+            await queue.join()
+
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self.queues)
+
+    async def handle_transaction(self, wallet: str, tx_data: Dict,
+                                 span: Optional[Span] = None):
+        """Parse a monitored transaction and queue the mirrored trade"""
+        self.stats["received"] += 1
+
+        key = self._dedupe_key(wallet, tx_data)
+        if key is not None and key in self.seen:
+            self.stats["duplicates"] += 1
+            self._release(span)
+            return
+
+        try:
+            signal = self.trader.parse_signal(tx_data)
+        except Exception as e:
+            logging.error(f"Error parsing signal from {wallet}: {str(e)}")
+            self._release(span)
+            return
+        if signal is None:
+            # Not a swap any decoder recognizes
+            self.stats["ignored"] += 1
+            self._release(span)
+            return
+        token, is_buy, amount, percentage = signal
+
+        if span is not None:
+            span.mark(PARSE)
+
+        # Held as seen while enqueuing, so a copy arriving meanwhile is
+        # a duplicate; forgotten again if the signal is not enqueued
+        self._mark_seen(key)
+        queue = self.queues[hash(str(token)) % self.workers]
+        enqueued = False
+        try:
+            enqueued = await self._put(
+                queue, (wallet, token, is_buy, amount, percentage, span, key)
+            )
+        finally:
+            if not enqueued:
+                self._forget(key)
+
+    async def _put(self, queue: asyncio.Queue, signal: Signal) -> bool:
+        """Enqueue a signal according to the overflow policy; False if it was dropped"""
+        if self.overflow_policy == "block":
+            await queue.put(signal)
+            return True
+
+        if queue.full():
+            self.stats["dropped"] += 1
+            if self.overflow_policy == "drop_newest":
+                logging.warning(f"Signal queue full, dropping {signal[1]}")
+                self._release(signal[5])
+                return False
+
+            dropped = queue.get_nowait()
+            queue.task_done()
+            logging.warning(f"Signal queue full, dropping {dropped[1]}")
+            self._release(dropped[5])
+            self._forget(dropped[6])
+
+        queue.put_nowait(signal)
+        return True
+
+    async def _worker(self, queue: asyncio.Queue):
+        """Drain one shard, executing trades in arrival order"""
+        while True:
+            wallet, token, is_buy, amount, percentage, span, _ = await queue.get()
+            if span is not None:
+                span.mark(DEQUEUE)
+            if self.coalescer is not None:
+                self.coalescer.submit(wallet, token, is_buy, percentage, span)
+                self.stats["coalesced"] += 1
+                queue.task_done()
+                continue
+            try:
+                pending = await self.trader.execute_trade(
+                    token, is_buy, amount, percentage, span=span, wallet=wallet
+                )
+                # execute_trade logs and returns None for trades it did not send
+                self.stats["executed" if pending is not None else "failed"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                logging.error(f"Trade worker error for {wallet}: {str(e)}")
+            finally:
+                queue.task_done()
+
+    def _release(self, span: Optional[Span]):
+        if span is not None:
+            self.trader.tracer.release(span)
+
+    def _mark_seen(self, key: Optional[str]):
+        if key is None:
+            return
+        self.seen[key] = None
+        if len(self.seen) > self.dedupe_size:
+            self.seen.popitem(last=False)
+
+    def _forget(self, key: Optional[str]):
+        if key is not None:
+            self.seen.pop(key, None)
+
+    @staticmethod
+    def _extract_signature(tx_data) -> Optional[str]:
+        """Return the first transaction signature, if the payload carries one"""
+        try:
+            return tx_data['transaction']['signatures'][0]
+        except (KeyError, IndexError, TypeError):
+            return signature_key(tx_data)
+
+    @classmethod
+    def _dedupe_key(cls, wallet: str, tx_data) -> Optional[str]:
+        """Signature of the payload, else the wallet and slot it landed in"""
+        signature = cls._extract_signature(tx_data)
+        if signature is not None:
+            return signature
+        slot = tx_data.get('slot') if isinstance(tx_data, dict) else None
+        if slot is None:
+            slot = getattr(getattr(tx_data, "context", None), "slot", None)
+        return f"{wallet}:{slot}" if slot is not None else None
@@ -0,0 +1,333 @@
+from solana.rpc.websocket_api import SubscriptionError, connect
+from solders.pubkey import Pubkey
+from solders.rpc.config import RpcTransactionLogsFilterMentions
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+NotificationCallback = Callable[[str, Dict], Awaitable[None]]
+GapCallback = Callable[[str, int], Awaitable[None]]
+ReconnectCallback = Callable[[List[str]], None]
+
+
+class SubscriptionManager:
+    """
+    Long-lived websocket subscription manager.
+
+    Holds a small fixed number of websocket connections, subscribes every
+    account exactly once and routes notifications by subscription id to
+    each handler registered for the account. Accounts can be registered
+    and unregistered while connections are up; only those accounts are
+    subscribed or unsubscribed. ``kind`` selects ``accountSubscribe``
+    (account state) or ``logsSubscribe`` mentioning the account (one
+    notification per transaction, with its signature).
+    Dropped connections are reconnected with exponential backoff and all
+    of their accounts are resubscribed; accounts that saw activity before
+    the drop are reported through ``on_gap`` so missed slots can be
+    backfilled, and reconnect listeners get every resubscribed account so
+    cached account state can be reloaded. ``is_live`` tells whether an
+    account currently has a confirmed subscription on an open connection;
+    one whose subscription the node rejects stays unsubscribed until the
+    next reconnect.
+    With several websocket endpoints, connections start on
+    different endpoints and move to the next one after each drop.
+    """
+
+    def __init__(self, ws_url: Union[str, List[str]], commitment: str = "confirmed",
+                 encoding: str = "jsonParsed", max_connections: int = 1,
+                 initial_backoff: float = 0.5, max_backoff: float = 30.0,
+                 on_gap: Optional[GapCallback] = None, kind: str = "account"):
+        if kind not in ("account", "logs"):
+            raise ValueError(f"Unknown subscription kind: {kind}")
+        self.ws_urls = [ws_url] if isinstance(ws_url, str) else list(ws_url)
+        self.commitment = commitment
+        self.encoding = encoding
+        self.kind = kind
+        self.max_connections = max(1, max_connections)
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.on_gap = on_gap
+
+        # Registered accounts, split into one shard per connection
+        self.callbacks: Dict[str, List[NotificationCallback]] = {}
+        self.shards: List[List[str]] = [[] for _ in range(self.max_connections)]
+
+        # Live routing tables
+        self.routes: Dict[int, str] = {}  # subscription id -> account
+        self.live: Dict[str, int] = {}  # account -> subscription id
+        self.last_slots: Dict[str, int] = {}  # account -> last notified slot
+        self.connected: List[bool] = [False] * self.max_connections
+        self.reconnects = 0
+        self.notifications = 0
+        self.reconnect_listeners: List[ReconnectCallback] = []
+
+        self._pending: List[asyncio.Queue] = [
+            asyncio.Queue() for _ in range(self.max_connections)
+        ]
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, account: Pubkey, callback: NotificationCallback):
+        """Register a handler; an account is only subscribed for its first one"""
+        key = str(account)
+        if key in self.callbacks:
+            if callback not in self.callbacks[key]:
+                self.callbacks[key].append(callback)
+            return
+
+        self.callbacks[key] = [callback]
+        index = min(range(self.max_connections), key=lambda i: len(self.shards[i]))
+        self.shards[index].append(key)
+
+        # Subscribe immediately if the connection is already up
+        if self.connected[index]:
+            self._pending[index].put_nowait((True, key))
+
+    def unregister(self, account: Pubkey,
+                   callback: Optional[NotificationCallback] = None):
+        """
+        Remove one handler, or all with no ``callback``; an account left
+        without handlers is unsubscribed on its live connection
+        """
+        key = str(account)
+        callbacks = self.callbacks.get(key)
+        if callbacks is None:
+            return
+        if callback is not None:
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if callbacks:
+                return
+        del self.callbacks[key]
+
+        index = next(i for i, shard in enumerate(self.shards) if key in shard)
+        self.shards[index].remove(key)
+        self.last_slots.pop(key, None)
+        self.live.pop(key, None)
+        for sub_id in [s for s, a in self.routes.items() if a == key]:
+            del self.routes[sub_id]
+            if self.connected[index]:
+                self._pending[index].put_nowait((False, sub_id))
+
+    def is_live(self, account: str) -> bool:
+        """Whether notifications for ``account`` are currently flowing"""
+        return account in self.live
+
+    def add_reconnect_listener(self, callback: ReconnectCallback):
+        """Call ``callback`` with the accounts resubscribed after each reconnect"""
+        self.reconnect_listeners.append(callback)
+
+    def connection_count(self) -> int:
+        """Number of currently open websocket connections"""
+        return sum(self.connected)
+
+    async def run(self):
+        """Run all connections until cancelled"""
+        self._tasks = [
+            asyncio.create_task(self._run_connection(i))
+            for i in range(self.max_connections)
+        ]
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Cancel all connection tasks"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run_connection(self, index: int):
+        """Keep one websocket connection alive, resubscribing after drops"""
+        backoff = self.initial_backoff
+        first_connect = True
+        endpoint = index
+
+        while True:
+            try:
+                async with connect(self.ws_urls[endpoint % len(self.ws_urls)]) as websocket:
+                    self.connected[index] = True
+                    self._drain_pending(index)
+
+                    for account in list(self.shards[index]):
+                        await self._subscribe(websocket, account)
+
+                    if not first_connect:
+                        self._report_reconnect(index)
+                        await self._report_gaps(index)
+                    first_connect = False
+                    backoff = self.initial_backoff
+
+                    await self._listen(websocket, index)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Websocket connection {index} error: {str(e)}")
+            finally:
+                self.connected[index] = False
+                self._drop_routes(index)
+
+            self.reconnects += 1
+            endpoint += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _subscribe(self, websocket, account: str):
+        """Send one account subscription and record its subscription id"""
+        if self.kind == "logs":
+            await websocket.logs_subscribe(
+                RpcTransactionLogsFilterMentions(Pubkey.from_string(account)),
+                commitment=self.commitment
+            )
+        else:
+            await websocket.account_subscribe(
+                Pubkey.from_string(account),
+                commitment=self.commitment,
+                encoding=self.encoding
+            )
+
+        # Route any notifications that arrive ahead of the confirmation
+        while True:
+            try:
+                messages = await websocket.recv()
+            except SubscriptionError as e:
+                # Leave a rejected account unsubscribed until the next
+                # reconnect rather than dropping the rest of the shard
+                logging.error(f"Subscription error for {account}: {str(e)}")
+                return
+            for message in messages:
+                if self._is_confirmation(message):
+                    if account not in self.callbacks:
+                        # Unregistered while the subscription was in flight
+                        await self._unsubscribe(websocket, message.result)
+                        return
+                    self.routes[message.result] = account
+                    self.live[account] = message.result
+                    return
+                await self._dispatch(message)
+
+    async def _unsubscribe(self, websocket, sub_id: int):
+        """Cancel one subscription, routing notifications that arrive meanwhile"""
+        if self.kind == "logs":
+            await websocket.logs_unsubscribe(sub_id)
+        else:
+            await websocket.account_unsubscribe(sub_id)
+
+        while True:
+            try:
+                messages = await websocket.recv()
+            except SubscriptionError as e:
+                logging.error(f"Unsubscribe error for {sub_id}: {str(e)}")
+                return
+            for message in messages:
+                if self._is_unsubscribed(message):
+                    return
+                await self._dispatch(message)
+
+    async def _listen(self, websocket, index: int):
+        """Route notifications and serve late registrations for one connection"""
+        pending = self._pending[index]
+
+        while True:
+            recv_task = asyncio.ensure_future(websocket.recv())
+            pending_task = asyncio.ensure_future(pending.get())
+            try:
+                done, _ = await asyncio.wait(
+                    {recv_task, pending_task},
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                # Both may finish together: route received messages first;
+                # a registration that finished is kept and served below
+                if recv_task in done:
+                    for message in recv_task.result():
+                        await self._dispatch(message)
+            finally:
+                # Never leave a recv or a registration read behind, also when
+                # cancelled or the connection drops; the shard is resubscribed
+                # in full on reconnect
+                recv_task.cancel()
+                pending_task.cancel()
+                await asyncio.gather(recv_task, pending_task, return_exceptions=True)
+
+            if pending_task.cancelled():
+                continue
+
+            subscribe, target = pending_task.result()
+            if subscribe:
+                await self._subscribe(websocket, target)
+            else:
+                await self._unsubscribe(websocket, target)
+
+    async def _dispatch(self, message):
+        """Route a single notification to its account callback"""
+        account = self.routes.get(getattr(message, "subscription", None))
+        if account is None:
+            return
+
+        result = message.result
+        slot = getattr(getattr(result, "context", None), "slot", None)
+        if slot is not None:
+            self.last_slots[account] = max(slot, self.last_slots.get(account, 0))
+
+        self.notifications += 1
+
+        for callback in list(self.callbacks.get(account, ())):
+            try:
+                await callback(account, result)
+            except Exception as e:
+                logging.error(f"Notification handler error for {account}: {str(e)}")
+
+    async def _report_gaps(self, index: int):
+        """Report accounts that may have missed notifications while disconnected"""
+        if self.on_gap is None:
+            return
+
+        for account in self.shards[index]:
+            last_slot = self.last_slots.get(account)
+            if last_slot is None:
+                continue
+            try:
+                await self.on_gap(account, last_slot)
+            except Exception as e:
+                logging.error(f"Gap recovery error for {account}: {str(e)}")
+
+    def _report_reconnect(self, index: int):
+        """Tell listeners which accounts were resubscribed after a drop"""
+        accounts = list(self.shards[index])
+        for callback in self.reconnect_listeners:
+            try:
+                callback(accounts)
+            except Exception as e:
+                logging.error(f"Reconnect listener error: {str(e)}")
+
+    def _drop_routes(self, index: int):
+        """Forget subscription ids that belonged to a closed connection"""
+        accounts = set(self.shards[index])
+        for sub_id in [s for s, a in self.routes.items() if a in accounts]:
+            del self.routes[sub_id]
+        for account in accounts:
+            self.live.pop(account, None)
+
+    def _drain_pending(self, index: int):
+        """Clear queued registrations; the full shard is resubscribed on connect"""
+        pending = self._pending[index]
+        while not pending.empty():
+            pending.get_nowait()
+
+    @staticmethod
+    def _is_confirmation(message) -> bool:
+        result = getattr(message, "result", None)
+        return (
+            not hasattr(message, "subscription")
+            and isinstance(result, int) and not isinstance(result, bool)
+        )
+
+    @staticmethod
+    def _is_unsubscribed(message) -> bool:
+        return (
+            not hasattr(message, "subscription")
+            and isinstance(getattr(message, "result", None), bool)
+        )
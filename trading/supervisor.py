@@ -0,0 +1,197 @@
+import asyncio
+import copy
+import logging
+import multiprocessing
+import signal
+import time
+from typing import Dict, List, Optional
+
+from trading.wallet_registry import shard_of
+from utils.shared_positions import SharedPositionTable
+
+MAX_RESTART_DELAY = 60.0
+
+
+async def _heartbeat(heartbeats, shard: int, interval: float):
+    """Beat from the event loop itself, so a blocked loop goes silent too"""
+    while True:
+        heartbeats[shard] = time.time()
+        await asyncio.sleep(interval)
+
+
+async def _run_worker(config: 'BotConfig', table: SharedPositionTable, shard: int,
+                      heartbeats, interval: float):
+    from main import run_bot
+
+    task = asyncio.current_task()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    beat = asyncio.create_task(_heartbeat(heartbeats, shard, interval))
+    try:
+        await run_bot(config, position_table=table, shard=shard)
+    finally:
+        beat.cancel()
+
+
+def _worker_main(config: 'BotConfig', shard: int, buffer, lock, heartbeats,
+                 interval: float):
+    """Process entry point for one shard"""
+    table = SharedPositionTable(buffer, lock)
+    try:
+        asyncio.run(_run_worker(config, table, shard, heartbeats, interval))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+class ShardWorker:
+    __slots__ = ("shard", "wallets", "process", "started_at", "restarts", "restart_at")
+
+    def __init__(self, shard: int, wallets: List[str]):
+        self.shard = shard
+        self.wallets = wallets
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.restart_at = 0.0
+
+
+class ShardSupervisor:
+    """
+    Runs the bot as several worker processes.
+
+    Target wallets are split by a stable hash across ``shards`` processes, each
+    running its own monitor, decoder and trader. Open positions and total
+    exposure live in a SharedPositionTable so limits hold across shards,
+    as do the wallet's SOL balance and the SOL reserved for pending buys.
+    Workers apply the same hash to wallets added by a reload, so each
+    wallet is only ever copied by one shard.
+    Workers beat a shared heartbeat slot from their event loop; a worker
+    that exits or stays silent for ``heartbeat_timeout`` seconds is
+    restarted, backing off exponentially if it keeps failing.
+    """
+
+    def __init__(self, config: 'BotConfig', shards: int = 2,
+                 heartbeat_timeout: float = 10.0, capacity: int = 4096):
+        wallets = config.target_wallets
+        self.config = config
+        self.shards = shards if config.wallets_file else max(1, min(shards, len(wallets)))
+        self.heartbeat_timeout = heartbeat_timeout
+        self.heartbeat_interval = heartbeat_timeout / 5
+        self.context = multiprocessing.get_context("spawn")
+        self.table = SharedPositionTable.create(capacity, self.context, self.shards)
+        self.heartbeats = self.context.RawArray('d', self.shards)
+        self.workers = [
+            ShardWorker(shard, [w for w in wallets if shard_of(w, self.shards) == shard])
+            for shard in range(self.shards)
+        ]
+
+    @classmethod
+    def from_config(cls, config: 'BotConfig') -> 'ShardSupervisor':
+        return cls(
+            config,
+            shards=config.shards,
+            heartbeat_timeout=config.worker_heartbeat_timeout,
+            capacity=config.shared_position_capacity
+        )
+
+    def start(self):
+        """Spawn every worker"""
+        for worker in self.workers:
+            self._spawn(worker)
+
+    async def run(self):
+        """Start the workers and keep them healthy until cancelled"""
+        self.start()
+        logging.info(
+            f"Supervising {self.shards} shards over {len(self.config.target_wallets)} wallets"
+        )
+        try:
+            while True:
+                await asyncio.sleep(self.heartbeat_interval)
+                self.check()
+        finally:
+            self.stop()
+
+    def check(self):
+        """Restart workers that have exited or stopped sending heartbeats"""
+        now = time.time()
+        for worker in self.workers:
+            process = worker.process
+            if process is None:
+                if now >= worker.restart_at:
+                    self._spawn(worker)
+                continue
+
+            if not process.is_alive():
+                reason = f"exited with code {process.exitcode}"
+            elif now - self.heartbeats[worker.shard] > self.heartbeat_timeout:
+                reason = f"missed heartbeats for {now - self.heartbeats[worker.shard]:.1f}s"
+                # Its loop is stuck, so it could not handle SIGTERM anyway
+                process.kill()
+            else:
+                continue
+
+            logging.error(f"Shard {worker.shard} {reason}; restarting")
+            process.join()
+            worker.process = None
+            if self.table.recover(process.pid):
+                logging.warning(f"Released the position table lock held by shard {worker.shard}")
+            self.table.clear_reservations(worker.shard)
+
+            # Back off while a worker keeps failing soon after starting
+            if now - worker.started_at > MAX_RESTART_DELAY:
+                worker.restarts = 0
+            delay = min(MAX_RESTART_DELAY, 2 ** worker.restarts - 1)
+            worker.restarts += 1
+            worker.restart_at = now + delay
+            if delay == 0:
+                self._spawn(worker)
+
+    def stop(self, timeout: float = 5.0):
+        """Terminate every worker, killing those that do not exit in time"""
+        processes = [worker.process for worker in self.workers if worker.process is not None]
+        for process in processes:
+            process.terminate()
+        deadline = time.time() + timeout
+        for process in processes:
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+            self.table.recover(process.pid)
+        for worker in self.workers:
+            worker.process = None
+
+    def stats(self) -> Dict[str, Dict]:
+        now = time.time()
+        return {
+            "shards": {
+                worker.shard: {
+                    "wallets": len(worker.wallets),
+                    "alive": worker.process is not None and worker.process.is_alive(),
+                    "restarts": worker.restarts,
+                    "heartbeat_age": now - self.heartbeats[worker.shard],
+                }
+                for worker in self.workers
+            },
+            "positions": self.table.stats(),
+        }
+
+    def _spawn(self, worker: ShardWorker):
+        config = copy.copy(self.config)
+        config.target_wallets = worker.wallets
+        config.shards = self.shards
+
+        # Count startup against the heartbeat timeout
+        worker.started_at = self.heartbeats[worker.shard] = time.time()
+        worker.process = self.context.Process(
+            target=_worker_main,
+            args=(config, worker.shard, self.table.buffer, self.table.lock,
+                  self.heartbeats, self.heartbeat_interval),
+            name=f"shard-{worker.shard}",
+            daemon=True
+        )
+        worker.process.start()
+        logging.info(
+            f"Started shard {worker.shard} (pid {worker.process.pid}) "
+            f"with {len(worker.wallets)} wallets"
+        )
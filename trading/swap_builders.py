@@ -0,0 +1,264 @@
+"""
+Swap instruction builders, registered per pool kind.
+
+A builder turns a trade already sized in base units into the program's
+swap instruction, using only the token context and the pool accounts the
+quote engine tracks, so no RPC call is made. ``amount_in`` and
+``min_out`` are encoded as plain u64s so the transaction templates can
+patch them in place.
+
+Builders registered with ``wraps_sol`` trade against our wrapped SOL
+account; ``wrap_sol`` gives the instructions that fund it before the swap
+and close it back to SOL after.
+"""
+import struct
+from typing import Callable, Dict, List, Set, Tuple
+
+from solana.transaction import AccountMeta, Instruction
+from solders.pubkey import Pubkey
+from solders.system_program import TransferParams, transfer
+
+from trading.decoders import PUMP_BUY, PUMP_SELL, WHIRLPOOL_SWAP, WSOL_MINT
+from trading.quote_engine import Pool
+from utils.token_cache import (
+    ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID, TokenContext, get_associated_token_address
+)
+
+SYSTEM_PROGRAM_ID = Pubkey.from_string("11111111111111111111111111111111")
+RENT_SYSVAR_ID = Pubkey.from_string("SysvarRent111111111111111111111111111111111")
+
+PUMP_PROGRAM_ID = Pubkey.from_string("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
+PUMP_GLOBAL = Pubkey.from_string("4wTV1YmiEkRvAtNtsSGPtUrqRYQMe5SKy2uB4Jjaxnjf")
+PUMP_FEE_RECIPIENT = Pubkey.from_string("CebN5WGQ4jvEPvsVU4EoHEpgzq1VV7AbicfhtW4xC9iM")
+PUMP_EVENT_AUTHORITY = Pubkey.from_string("Ce6TQqeHC9p8KetsN6JsjHK7UTZk7nasjjnr7XxXp9F1")
+
+RAYDIUM_AMM_PROGRAM_ID = Pubkey.from_string("675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8")
+RAYDIUM_SWAP_BASE_IN = bytes([9])
+
+WHIRLPOOL_PROGRAM_ID = Pubkey.from_string("whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc")
+WHIRLPOOL_TICK_ARRAY_SIZE = 88
+WHIRLPOOL_MIN_SQRT_PRICE = 4295048016
+WHIRLPOOL_MAX_SQRT_PRICE = 79226673515401279992447579055
+
+WSOL_MINT_ID = Pubkey.from_string(WSOL_MINT)
+
+CREATE_ATA_IDEMPOTENT = bytes([1])
+TOKEN_CLOSE_ACCOUNT = bytes([9])
+TOKEN_SYNC_NATIVE = bytes([17])
+
+U64_PAIR = struct.Struct("<QQ")
+
+SwapBuilder = Callable[[Pubkey, TokenContext, Pool, bool, int, int], Instruction]
+SWAP_BUILDERS: Dict[str, SwapBuilder] = {}
+WRAPPED_SOL_KINDS: Set[str] = set()
+
+
+def register_builder(kind: str, wraps_sol: bool = False):
+    """Register a swap builder for a pool kind"""
+    def register(builder: SwapBuilder) -> SwapBuilder:
+        SWAP_BUILDERS[kind] = builder
+        if wraps_sol:
+            WRAPPED_SOL_KINDS.add(kind)
+        return builder
+    return register
+
+
+def build_swap(owner: Pubkey, context: TokenContext, pool: Pool, is_buy: bool,
+               amount_in: int, min_out: int) -> Instruction:
+    """Swap instruction for ``pool``; raises ValueError for unsupported kinds"""
+    builder = SWAP_BUILDERS.get(pool.kind)
+    if builder is None:
+        raise ValueError(f"No swap builder for {pool.kind} pools")
+    return builder(owner, context, pool, is_buy, amount_in, min_out)
+
+
+def create_ata_idempotent(owner: Pubkey, context: TokenContext) -> Instruction:
+    """Create our token account for a mint, a no-op if it already exists"""
+    return _create_ata(owner, context.ata, context.mint, context.token_program)
+
+
+def _create_ata(owner: Pubkey, ata: Pubkey, mint: Pubkey,
+                token_program: Pubkey) -> Instruction:
+    return Instruction(
+        ASSOCIATED_TOKEN_PROGRAM_ID,
+        CREATE_ATA_IDEMPOTENT,
+        [
+            AccountMeta(owner, True, True),
+            AccountMeta(ata, False, True),
+            AccountMeta(owner, False, False),
+            AccountMeta(mint, False, False),
+            AccountMeta(SYSTEM_PROGRAM_ID, False, False),
+            AccountMeta(token_program, False, False),
+        ]
+    )
+
+
+def wsol_account(owner: Pubkey) -> Pubkey:
+    return get_associated_token_address(owner, WSOL_MINT_ID)
+
+
+def wrap_sol(owner: Pubkey, is_buy: bool,
+             amount_in: int) -> Tuple[List[Instruction], List[Instruction]]:
+    """
+    Instructions to run before and after a swap on our wrapped SOL account
+
+    The account is created if needed, funded with ``amount_in`` lamports
+    for a buy, and closed after the swap so its balance returns as SOL.
+    """
+    account = wsol_account(owner)
+    before = [_create_ata(owner, account, WSOL_MINT_ID, TOKEN_PROGRAM_ID)]
+    if is_buy:
+        before += [
+            transfer(TransferParams(from_pubkey=owner, to_pubkey=account, lamports=amount_in)),
+            Instruction(TOKEN_PROGRAM_ID, TOKEN_SYNC_NATIVE, [AccountMeta(account, False, True)]),
+        ]
+    after = [Instruction(
+        TOKEN_PROGRAM_ID,
+        TOKEN_CLOSE_ACCOUNT,
+        [
+            AccountMeta(account, False, True),
+            AccountMeta(owner, False, True),
+            AccountMeta(owner, True, False),
+        ]
+    )]
+    return before, after
+
+
+def _sol_side(owner: Pubkey, context: TokenContext,
+              is_buy: bool) -> Tuple[Pubkey, Pubkey]:
+    """Our source and destination token accounts for a swap against wrapped SOL"""
+    if is_buy:
+        return wsol_account(owner), context.ata
+    return context.ata, wsol_account(owner)
+
+
+@register_builder("pump")
+def build_pump_swap(owner: Pubkey, context: TokenContext, pool: Pool, is_buy: bool,
+                    amount_in: int, min_out: int) -> Instruction:
+    """
+    Pump.fun bonding-curve buy or sell
+
+    A buy asks for ``min_out`` tokens at a cost of at most ``amount_in``
+    lamports; a sell gives ``amount_in`` tokens for at least ``min_out``.
+    """
+    curve = Pubkey.from_string(pool.accounts[0])
+    accounts = [
+        AccountMeta(PUMP_GLOBAL, False, False),
+        AccountMeta(PUMP_FEE_RECIPIENT, False, True),
+        AccountMeta(context.mint, False, False),
+        AccountMeta(curve, False, True),
+        AccountMeta(
+            get_associated_token_address(curve, context.mint, context.token_program),
+            False, True
+        ),
+        AccountMeta(context.ata, False, True),
+        AccountMeta(owner, True, True),
+        AccountMeta(SYSTEM_PROGRAM_ID, False, False),
+    ]
+    if is_buy:
+        data = PUMP_BUY + U64_PAIR.pack(min_out, amount_in)
+        accounts += [
+            AccountMeta(context.token_program, False, False),
+            AccountMeta(RENT_SYSVAR_ID, False, False),
+        ]
+    else:
+        data = PUMP_SELL + U64_PAIR.pack(amount_in, min_out)
+        accounts += [
+            AccountMeta(ASSOCIATED_TOKEN_PROGRAM_ID, False, False),
+            AccountMeta(context.token_program, False, False),
+        ]
+    accounts += [
+        AccountMeta(PUMP_EVENT_AUTHORITY, False, False),
+        AccountMeta(PUMP_PROGRAM_ID, False, False),
+    ]
+    return Instruction(PUMP_PROGRAM_ID, data, accounts)
+
+
+@register_builder("raydium", wraps_sol=True)
+def build_raydium_swap(owner: Pubkey, context: TokenContext, pool: Pool, is_buy: bool,
+                       amount_in: int, min_out: int) -> Instruction:
+    """
+    Raydium AMM v4 swapBaseIn
+
+    The AMM and Serum accounts are the ones observed in the swap the pool
+    was learned from; the token program, AMM authority, Serum program and
+    Serum vault signer are read-only, the rest writable.
+    """
+    amm_accounts = pool.amm_accounts
+    if not amm_accounts:
+        raise ValueError(f"Raydium pool for {pool.mint} has no AMM accounts")
+    readonly = {0, 2, len(amm_accounts) - 8, len(amm_accounts) - 1}
+    source, destination = _sol_side(owner, context, is_buy)
+    accounts = [
+        AccountMeta(Pubkey.from_string(account), False, index not in readonly)
+        for index, account in enumerate(amm_accounts)
+    ]
+    accounts += [
+        AccountMeta(source, False, True),
+        AccountMeta(destination, False, True),
+        AccountMeta(owner, True, False),
+    ]
+    return Instruction(
+        RAYDIUM_AMM_PROGRAM_ID,
+        RAYDIUM_SWAP_BASE_IN + U64_PAIR.pack(amount_in, min_out),
+        accounts
+    )
+
+
+def whirlpool_tick_arrays(whirlpool: Pubkey, tick: int, tick_spacing: int,
+                          a_to_b: bool) -> List[Pubkey]:
+    """The three tick arrays a swap may cross, starting at the current one"""
+    span = WHIRLPOOL_TICK_ARRAY_SIZE * tick_spacing
+    # Swaps up the price start one tick ahead, as the Orca SDK does
+    start = (tick if a_to_b else tick + tick_spacing) // span * span
+    step = -span if a_to_b else span
+    return [
+        Pubkey.find_program_address(
+            [b"tick_array", bytes(whirlpool), str(start + step * i).encode()],
+            WHIRLPOOL_PROGRAM_ID
+        )[0]
+        for i in range(3)
+    ]
+
+
+@register_builder("whirlpool", wraps_sol=True)
+def build_whirlpool_swap(owner: Pubkey, context: TokenContext, pool: Pool, is_buy: bool,
+                         amount_in: int, min_out: int) -> Instruction:
+    """
+    Orca Whirlpool exact-input swap
+
+    Tick arrays and the oracle are derived from the pool state, so a
+    swap that runs past the third tick array fails rather than filling
+    at a price the quote did not cover.
+    """
+    if not pool.ready or not pool.tick_spacing:
+        raise ValueError(f"Whirlpool for {pool.mint} is not loaded")
+    whirlpool = Pubkey.from_string(pool.accounts[0])
+    a_to_b = is_buy == pool.sol_is_a
+    source, destination = _sol_side(owner, context, is_buy)
+    owner_a, owner_b = (source, destination) if a_to_b else (destination, source)
+    sqrt_price_limit = WHIRLPOOL_MIN_SQRT_PRICE if a_to_b else WHIRLPOOL_MAX_SQRT_PRICE
+    oracle, _ = Pubkey.find_program_address([b"oracle", bytes(whirlpool)], WHIRLPOOL_PROGRAM_ID)
+
+    accounts = [
+        AccountMeta(TOKEN_PROGRAM_ID, False, False),
+        AccountMeta(owner, True, False),
+        AccountMeta(whirlpool, False, True),
+        AccountMeta(owner_a, False, True),
+        AccountMeta(Pubkey.from_string(pool.vault_a), False, True),
+        AccountMeta(owner_b, False, True),
+        AccountMeta(Pubkey.from_string(pool.vault_b), False, True),
+    ]
+    accounts += [
+        AccountMeta(tick_array, False, True)
+        for tick_array in whirlpool_tick_arrays(whirlpool, pool.tick, pool.tick_spacing, a_to_b)
+    ]
+    accounts.append(AccountMeta(oracle, False, True))
+
+    data = (
+        WHIRLPOOL_SWAP
+        + U64_PAIR.pack(amount_in, min_out)
+        + sqrt_price_limit.to_bytes(16, "little")
+        + bytes([True, a_to_b])
+    )
+    return Instruction(WHIRLPOOL_PROGRAM_ID, data, accounts)
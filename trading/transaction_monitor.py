@@ -1,46 +1,201 @@
-```python
 from solana.rpc.async_api import AsyncClient
-from solana.publickey import PublicKey
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from typing import Dict, List, Optional, Set, Union
 import asyncio
-from typing import List, Callable
 import logging
 
+from trading.subscription_manager import SubscriptionManager
+from utils.capture import CaptureWriter, encode_payload
+from utils.latency_tracer import LatencyTracer, Span
+
 class TransactionMonitor:
+    """
+    Streams the transactions of the target wallets to the trader.
+
+    Each wallet has a ``logsSubscribe`` subscription mentioning it, which
+    notifies the signature of every transaction the wallet takes part in.
+    Successful ones are fetched with ``getTransaction`` in ``encoding``
+    (base64 by default, for the binary decoders) and handed over in the
+    order their notifications arrived per wallet, while the fetches
+    themselves run concurrently. With a recorder, every fetched
+    transaction is also appended to a capture file for offline replay.
+
+    Components that follow account state (token cache, quote engine,
+    balance ledger) attach to ``accounts``, a separate account-kind
+    manager without gap recovery, so their accounts are never treated as
+    copied wallets.
+    """
+
     def __init__(self, client: AsyncClient, target_wallets: List[str],
-                 trader: 'DexTrader'):
+                 trader: 'DexTrader', max_connections: int = 1,
+                 tracer: Optional[LatencyTracer] = None,
+                 recorder: Optional[CaptureWriter] = None,
+                 ws_url: Optional[Union[str, List[str]]] = None,
+                 encoding: str = "base64", fetch_attempts: int = 3,
+                 fetch_retry_delay: float = 0.2):
         self.client = client
-        self.target_wallets = [PublicKey(addr) for addr in target_wallets]
+        self.target_wallets = [Pubkey.from_string(addr) for addr in target_wallets]
         self.trader = trader
-        
+        self.tracer = tracer
+        self.recorder = recorder
+        self.encoding = encoding
+        self.fetch_attempts = max(1, fetch_attempts)
+        self.fetch_retry_delay = fetch_retry_delay
+        ws_url = ws_url or [
+            url.replace('http', 'ws', 1)
+            for url in getattr(client, 'endpoint_uris', [client._provider.endpoint_uri])
+        ]
+        self.subscriptions = SubscriptionManager(
+            ws_url,
+            commitment="confirmed",
+            max_connections=max_connections,
+            on_gap=self._recover_missed,
+            kind="logs"
+        )
+        # Pool, mint and balance accounts: account state only, never copied
+        self.accounts = SubscriptionManager(
+            ws_url,
+            commitment="confirmed",
+            encoding="base64",
+            max_connections=max_connections
+        )
+        self.fetched = 0
+        self.fetch_failures = 0
+        self._fetching: Set[str] = set()  # Signatures being fetched or delivered
+        self._last: Dict[str, asyncio.Task] = {}  # wallet -> last delivery
+
     async def start_monitoring(self):
         """Start monitoring transactions for target wallets"""
-        while True:
+        for wallet in self.target_wallets:
+            self._subscribe_to_wallet(wallet)
+
+        try:
+            await asyncio.gather(self.subscriptions.run(), self.accounts.run())
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Cancel fetches that have not been delivered yet"""
+        tasks = list(self._last.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._last.clear()
+
+    def _subscribe_to_wallet(self, wallet: Pubkey):
+        """Register a wallet with the shared subscription manager"""
+        self.subscriptions.register(wallet, self._on_logs)
+
+    def update_wallets(self, added: List[str], removed: List[str]) -> List[str]:
+        """
+        Subscribe added wallets and unsubscribe removed ones, leaving the rest
+        Returns the wallets that could not be updated
+        """
+        failed = []
+        for addr in removed:
             try:
-                # Subscribe to transaction websocket for each wallet
-                ws_url = self.client._provider.endpoint.replace('http', 'ws')
-                subscription_ids = []
-                
-                for wallet in self.target_wallets:
-                    sub_id = await self._subscribe_to_wallet(wallet)
-                    subscription_ids.append(sub_id)
-                    
-                await asyncio.sleep(0.001)  # Millisecond-level monitoring
-                    
+                wallet = Pubkey.from_string(addr)
+                self.subscriptions.unregister(wallet)
+                if wallet in self.target_wallets:
+                    self.target_wallets.remove(wallet)
             except Exception as e:
-                logging.error(f"Monitoring error: {str(e)}")
-                await asyncio.sleep(1)
-                
-    async def _subscribe_to_wallet(self, wallet: PublicKey):
-        """Subscribe to a wallet's transactions"""
-        ws = await self.client.create_subscription()
-        
-        async def on_transaction(tx):
-            await self.trader.handle_transaction(str(wallet), tx)
-                
-        return await ws.account_subscribe(
-            wallet,
-            encoding="jsonParsed",
-            commitment="confirmed",
-            callback=on_transaction
+                logging.error(f"Error unsubscribing wallet {addr}: {str(e)}")
+                failed.append(addr)
+        for addr in added:
+            try:
+                wallet = Pubkey.from_string(addr)
+                self._subscribe_to_wallet(wallet)
+                self.target_wallets.append(wallet)
+            except Exception as e:
+                logging.error(f"Error subscribing wallet {addr}: {str(e)}")
+                failed.append(addr)
+        return failed
+
+    async def _on_logs(self, wallet: str, notification):
+        """Fetch the transaction behind a logs notification"""
+        value = notification.value
+        if value.err is not None:
+            return
+        self._deliver_later(wallet, str(value.signature), notification.context.slot)
+
+    def _deliver_later(self, wallet: str, signature: str, slot: Optional[int]):
+        """Start fetching now; deliver after the wallet's earlier transactions"""
+        if signature in self._fetching:
+            return
+        self._fetching.add(signature)
+
+        span = self.tracer.begin(wallet, slot) if self.tracer is not None else None
+        fetch = asyncio.ensure_future(self._fetch(signature))
+        task = asyncio.ensure_future(
+            self._deliver(self._last.get(wallet), wallet, signature, fetch, span)
+        )
+        self._last[wallet] = task
+        task.add_done_callback(
+            lambda done: self._last.get(wallet) is done and self._last.pop(wallet)
         )
-```
\ No newline at end of file
+
+    async def _deliver(self, previous: Optional[asyncio.Task], wallet: str,
+                       signature: str, fetch: asyncio.Future, span: Optional[Span]):
+        try:
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            tx = await fetch
+            if tx is None:
+                if span is not None:
+                    self.tracer.release(span)
+                return
+            if self.recorder is not None:
+                self.recorder.record(wallet, tx.get('slot'), encode_payload(tx))
+            await self.trader.handle_transaction(wallet, tx, span)
+        except asyncio.CancelledError:
+            fetch.cancel()
+            raise
+        except Exception as e:
+            logging.error(f"Error delivering {signature} for {wallet}: {str(e)}")
+        finally:
+            self._fetching.discard(signature)
+
+    async def _fetch(self, signature: str) -> Optional[Dict]:
+        """The confirmed transaction, retrying while the node has not indexed it"""
+        for attempt in range(self.fetch_attempts):
+            if attempt:
+                await asyncio.sleep(self.fetch_retry_delay)
+            try:
+                response = await self.client.get_transaction(
+                    Signature.from_string(signature),
+                    encoding=self.encoding,
+                    commitment="confirmed",
+                    max_supported_transaction_version=0
+                )
+            except Exception as e:
+                logging.error(f"Error fetching transaction {signature}: {str(e)}")
+                continue
+            tx = response.get('result')
+            if tx is not None:
+                self.fetched += 1
+                return tx
+        self.fetch_failures += 1
+        logging.warning(f"Transaction {signature} not available after {self.fetch_attempts} attempts")
+        return None
+
+    async def _recover_missed(self, wallet: str, last_slot: int):
+        """Replay wallet transactions that landed after the last seen slot"""
+        response = await self.client.get_signatures_for_address(
+            Pubkey.from_string(wallet),
+            limit=100,
+            commitment="confirmed"
+        )
+        missed = [
+            entry for entry in response['result']
+            if entry['slot'] > last_slot and not entry.get('err')
+        ]
+        if missed:
+            logging.warning(
+                f"Recovering {len(missed)} transactions for {wallet} "
+                f"after slot {last_slot}"
+            )
+
+        # Oldest first so buys and sells replay in order
+        for entry in reversed(missed):
+            self._deliver_later(wallet, entry['signature'], entry['slot'])
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from base58 import b58decode, b58encode
+
+from trading.decoders import read_compact_u16
+
+COMPUTE_BUDGET_PROGRAM = "ComputeBudget111111111111111111111111111111"
+COMPUTE_BUDGET_PROGRAM_BYTES = b58decode(COMPUTE_BUDGET_PROGRAM)
+SYSTEM_PROGRAM_BYTES = bytes(32)
+SYSTEM_TRANSFER = 2  # u32 discriminator, then u64 lamports
+SET_COMPUTE_UNIT_LIMIT = 2  # u32 follows the discriminator
+SET_COMPUTE_UNIT_PRICE = 3  # u64 micro-lamports follows the discriminator
+
+U32 = struct.Struct("<I")
+U64 = struct.Struct("<Q")
+
+
+def message_layout(message: bytes) -> Tuple[int, List[Tuple[bytes, int, int]]]:
+    """
+    Blockhash offset and (program id, data offset, data length) for each
+    instruction of a serialized legacy message
+    """
+    buf = memoryview(message)
+    key_count, offset = read_compact_u16(buf, 3)
+    keys_offset = offset
+    blockhash_offset = offset + 32 * key_count
+
+    instruction_count, offset = read_compact_u16(buf, blockhash_offset + 32)
+    instructions = []
+    for _ in range(instruction_count):
+        program = keys_offset + 32 * buf[offset]
+        account_count, offset = read_compact_u16(buf, offset + 1)
+        data_length, offset = read_compact_u16(buf, offset + account_count)
+        instructions.append((bytes(buf[program:program + 32]), offset, data_length))
+        offset += data_length
+    return blockhash_offset, instructions
+
+
+def _unique(data: bytes, value: bytes, start: int, end: int) -> Optional[int]:
+    """Offset of the only occurrence of ``value`` in data[start:end]"""
+    offset = data.find(value, start, end)
+    if offset < 0 or data.find(value, offset + 1, end) >= 0:
+        return None
+    return offset
+
+
+class TxTemplate:
+    """
+    A serialized swap message whose variable fields are patched in place.
+
+    Only the recent blockhash, amount in, minimum out and compute budget
+    values differ between two trades of the same token, side and route,
+    so a trade copies the cached message and overwrites those bytes
+    instead of rebuilding and recompiling the transaction. A SOL transfer
+    of exactly the amount in, wrapping SOL for the swap, is patched too.
+    """
+
+    __slots__ = ("message", "blockhash_offset", "amount_offset", "min_out_offset",
+                 "cu_limit_offset", "cu_price_offset", "wrap_offset")
+
+    def __init__(self, message: bytes, blockhash_offset: int, amount_offset: int,
+                 min_out_offset: int, cu_limit_offset: Optional[int] = None,
+                 cu_price_offset: Optional[int] = None, wrap_offset: Optional[int] = None):
+        self.message = bytes(message)
+        self.blockhash_offset = blockhash_offset
+        self.amount_offset = amount_offset
+        self.min_out_offset = min_out_offset
+        self.cu_limit_offset = cu_limit_offset
+        self.wrap_offset = wrap_offset
+        self.cu_price_offset = cu_price_offset
+
+    @classmethod
+    def learn(cls, message: bytes, program: bytes, amount_in: int,
+              min_out: int) -> Optional['TxTemplate']:
+        """
+        Locate the fields of a freshly compiled swap message
+
+        ``amount_in`` and ``min_out`` must each appear exactly once as a
+        u64 in the data of the ``program`` instruction; otherwise the
+        layout is ambiguous and None is returned.
+        """
+        blockhash_offset, instructions = message_layout(message)
+        amount_offset = min_out_offset = None
+        cu_limit_offset = cu_price_offset = wrap_offset = None
+
+        for program_id, offset, length in instructions:
+            if program_id == COMPUTE_BUDGET_PROGRAM_BYTES and length:
+                if message[offset] == SET_COMPUTE_UNIT_LIMIT:
+                    cu_limit_offset = offset + 1
+                elif message[offset] == SET_COMPUTE_UNIT_PRICE:
+                    cu_price_offset = offset + 1
+            elif program_id == SYSTEM_PROGRAM_BYTES and length == U32.size + U64.size:
+                if (U32.unpack_from(message, offset)[0] == SYSTEM_TRANSFER
+                        and U64.unpack_from(message, offset + U32.size)[0] == amount_in):
+                    wrap_offset = offset + U32.size
+            elif program_id == program and amount_offset is None:
+                end = offset + length
+                amount_offset = _unique(message, U64.pack(amount_in), offset, end)
+                min_out_offset = _unique(message, U64.pack(min_out), offset, end)
+
+        if amount_offset is None or min_out_offset is None:
+            return None
+        if abs(amount_offset - min_out_offset) < U64.size:
+            return None
+        return cls(message, blockhash_offset, amount_offset, min_out_offset,
+                   cu_limit_offset, cu_price_offset, wrap_offset)
+
+    def render(self, blockhash: bytes, amount_in: int, min_out: int,
+               cu_limit: Optional[int] = None, cu_price: Optional[int] = None) -> bytes:
+        """Message bytes for one trade"""
+        message = bytearray(self.message)
+        message[self.blockhash_offset:self.blockhash_offset + 32] = blockhash
+        U64.pack_into(message, self.amount_offset, amount_in)
+        U64.pack_into(message, self.min_out_offset, min_out)
+        if cu_limit is not None and self.cu_limit_offset is not None:
+            U32.pack_into(message, self.cu_limit_offset, cu_limit)
+        if cu_price is not None and self.cu_price_offset is not None:
+            U64.pack_into(message, self.cu_price_offset, cu_price)
+        if self.wrap_offset is not None:
+            U64.pack_into(message, self.wrap_offset, amount_in)
+        return bytes(message)
+
+
+class TemplateCache:
+    """LRU of transaction templates keyed by (route, mint, side)"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.templates: "OrderedDict[Hashable, TxTemplate]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def get(self, key: Hashable) -> Optional[TxTemplate]:
+        template = self.templates.get(key)
+        if template is None:
+            self.misses += 1
+            return None
+        self.templates.move_to_end(key)
+        self.hits += 1
+        return template
+
+    def learn(self, key: Hashable, message: bytes, program: bytes,
+              amount_in: int, min_out: int) -> Optional[TxTemplate]:
+        """Cache the template for a compiled message if its fields can be located"""
+        try:
+            template = TxTemplate.learn(message, program, amount_in, min_out)
+        except Exception as e:
+            logging.error(f"Template layout error: {str(e)}")
+            template = None
+        if template is None:
+            self.rejected += 1
+            return None
+
+        self.templates[key] = template
+        self.templates.move_to_end(key)
+        while len(self.templates) > self.max_size:
+            self.templates.popitem(last=False)
+        return template
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "templates": len(self.templates),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+        }
+
+
+class TransactionSigner:
+    """
+    Signs serialized messages on a thread pool.
+
+    ed25519 signing is the one CPU-bound step left per trade; running it
+    on ``workers`` threads keeps it off the event loop.
+    """
+
+    def __init__(self, keypair: 'Keypair', workers: int = 2):
+        self.keypair = keypair
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='signer')
+
+    def sign_message(self, message: bytes) -> Tuple[str, bytes]:
+        """Signature and wire-format transaction for a single-signer message"""
+        signature = bytes(self.keypair.sign_message(message))
+        return b58encode(signature).decode(), b"\x01" + signature + message
+
+    async def sign(self, message: bytes) -> Tuple[str, bytes]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.sign_message, message
+        )
+
+    def close(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import logging
+import os
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from solders.pubkey import Pubkey
+
+# Called with (added, removed); returns the wallets it failed to apply
+WalletListener = Callable[[List[str], List[str]], Optional[List[str]]]
+
+
+def shard_of(wallet: str, shards: int) -> int:
+    """Stable shard for a wallet, the same in every process"""
+    return zlib.crc32(wallet.encode()) % shards
+
+
+class WalletRegistry:
+    """
+    Live set of copied wallets and their per-wallet settings.
+
+    Settings sit in columnar arrays indexed by a wallet -> row dict, so the
+    trade path reads them in O(1). With a ``path``, a JSON file is polled
+    every ``reload_interval`` seconds; on change only the wallets added or
+    removed are passed to listeners, which subscribe or unsubscribe them.
+    The file maps addresses to settings, or is a plain list of addresses:
+
+        {"<address>": {"size_multiplier": 0.5, "max_exposure_sol": 2.0,
+                       "enabled": true}}
+
+    Disabled wallets stay subscribed but their buys are skipped; their
+    sells still go through so positions can be exited. A file with an
+    invalid address or setting is rejected as a whole, and a wallet a
+    listener fails to add or remove keeps its previous state.
+    """
+
+    def __init__(self, wallets: Optional[List[str]] = None, path: Optional[str] = None,
+                 reload_interval: float = 1.0,
+                 owns: Optional[Callable[[str], bool]] = None,
+                 initial_capacity: int = 64):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.owns = owns
+        self.listeners: List[WalletListener] = []
+        self.reloads = 0
+
+        # Columnar settings, one row per wallet
+        self.rows: Dict[str, int] = {}
+        self._free_rows: List[int] = list(range(initial_capacity - 1, -1, -1))
+        self.size_multiplier = np.ones(initial_capacity)
+        self.max_exposure = np.full(initial_capacity, np.inf)
+        self.enabled = np.zeros(initial_capacity, dtype=bool)
+        self.exposure = np.zeros(initial_capacity)
+
+        # Open positions attributed to the wallet whose buy opened them
+        self.token_wallets: Dict[str, Tuple[int, float]] = {}
+
+        self._mtime: Optional[float] = None
+        self._task = None
+
+        self.apply({wallet: {} for wallet in wallets or []})
+        if path is not None and os.path.exists(path):
+            self.reload()
+
+    @classmethod
+    def from_config(cls, config: 'BotConfig',
+                    owns: Optional[Callable[[str], bool]] = None) -> 'WalletRegistry':
+        return cls(
+            config.target_wallets,
+            path=config.wallets_file,
+            reload_interval=config.wallets_reload_interval,
+            owns=owns
+        )
+
+    def wallets(self) -> List[str]:
+        return list(self.rows)
+
+    def attach(self, listener: WalletListener):
+        """
+        Call ``listener(added, removed)`` whenever the wallet set changes;
+        wallets it returns as failed are rolled back
+        """
+        self.listeners.append(listener)
+
+    def start(self):
+        """Start watching the wallets file"""
+        if self.path is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def size(self, wallet: Optional[str], is_buy: bool, amount: float) -> Optional[float]:
+        """
+        Trade size in SOL for a signal from ``wallet``, or None to skip it
+
+        Signals that do not come from a registered wallet, such as
+        stop-loss exits, are sized as given.
+        """
+        row = self.rows.get(wallet)
+        if row is None:
+            return amount
+        amount *= float(self.size_multiplier[row])
+        if is_buy and (
+            not self.enabled[row] or self.exposure[row] + amount > self.max_exposure[row]
+        ):
+            return None
+        return amount
+
+    def on_open(self, wallet: Optional[str], token: str, amount: float):
+        """Attribute a confirmed buy to the wallet that signalled it"""
+        row = self.rows.get(wallet)
+        if row is None:
+            return
+        self.on_close(token)
+        self.token_wallets[token] = (row, amount)
+        self.exposure[row] += amount
+
+    def on_close(self, token: str):
+        attributed = self.token_wallets.pop(token, None)
+        if attributed is not None:
+            row, amount = attributed
+            self.exposure[row] = max(0.0, self.exposure[row] - amount)
+
+    def reload(self) -> Tuple[List[str], List[str]]:
+        """Re-read the wallets file and apply it"""
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path) as f:
+            entries = json.load(f)
+        # A half-written file fails to parse and is read again next poll
+        self._mtime = mtime
+        if isinstance(entries, list):
+            entries = {wallet: {} for wallet in entries}
+        self.reloads += 1
+        return self.apply(entries)
+
+    def apply(self, entries: Dict[str, Dict]) -> Tuple[List[str], List[str]]:
+        """
+        Replace the wallet set and settings
+        Returns the (added, removed) wallets; raises ValueError, leaving the
+        registry unchanged, if any address or setting is invalid
+        """
+        if not isinstance(entries, dict):
+            raise ValueError("Wallets must be a list of addresses or an object")
+        settings_by_wallet = {
+            wallet: self._validate(wallet, settings) for wallet, settings in entries.items()
+        }
+        if self.owns is not None:
+            settings_by_wallet = {wallet: settings
+                                  for wallet, settings in settings_by_wallet.items()
+                                  if self.owns(wallet)}
+
+        removed = [wallet for wallet in self.rows if wallet not in settings_by_wallet]
+        added = [wallet for wallet in settings_by_wallet if wallet not in self.rows]
+
+        failed = set()
+        if added or removed:
+            for listener in self.listeners:
+                try:
+                    failed.update(listener(added, removed) or ())
+                except Exception as e:
+                    logging.error(f"Wallet listener error: {str(e)}")
+                    failed.update(added + removed)
+        if failed:
+            # Keep wallets that could not be unsubscribed; drop those that
+            # could not be subscribed
+            logging.error(f"Rolled back {len(failed)} wallet changes")
+            added = [wallet for wallet in added if wallet not in failed]
+            removed = [wallet for wallet in removed if wallet not in failed]
+            for wallet in failed:
+                settings_by_wallet.pop(wallet, None)
+
+        for wallet in removed:
+            self._release_row(wallet)
+
+        for wallet, (size_multiplier, max_exposure, enabled) in settings_by_wallet.items():
+            row = self.rows.get(wallet)
+            if row is None:
+                row = self._allocate_row(wallet)
+            self.size_multiplier[row] = size_multiplier
+            self.max_exposure[row] = max_exposure
+            self.enabled[row] = enabled
+
+        if added or removed:
+            logging.info(f"Wallets updated: {len(added)} added, {len(removed)} removed")
+        return added, removed
+
+    @staticmethod
+    def _validate(wallet: str, settings: Dict) -> Tuple[float, float, bool]:
+        """Parsed (size_multiplier, max_exposure, enabled) for one entry"""
+        try:
+            Pubkey.from_string(wallet)
+        except Exception:
+            raise ValueError(f"Invalid wallet address: {wallet}")
+        if not isinstance(settings, dict):
+            raise ValueError(f"Settings for {wallet} must be an object")
+
+        size_multiplier = settings.get("size_multiplier", 1.0)
+        max_exposure = settings.get("max_exposure_sol")
+        enabled = settings.get("enabled", True)
+        if isinstance(size_multiplier, bool) or not isinstance(size_multiplier, (int, float)) \
+                or not 0 <= size_multiplier < np.inf:
+            raise ValueError(f"Invalid size_multiplier for {wallet}: {size_multiplier}")
+        if max_exposure is not None and (
+                isinstance(max_exposure, bool) or not isinstance(max_exposure, (int, float))
+                or not max_exposure >= 0):
+            raise ValueError(f"Invalid max_exposure_sol for {wallet}: {max_exposure}")
+        if not isinstance(enabled, bool):
+            raise ValueError(f"Invalid enabled flag for {wallet}: {enabled}")
+        return (
+            float(size_multiplier),
+            np.inf if max_exposure is None else float(max_exposure),
+            enabled
+        )
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                if os.path.exists(self.path) and os.stat(self.path).st_mtime != self._mtime:
+                    self.reload()
+            except Exception as e:
+                logging.error(f"Wallets file reload error: {str(e)}")
+
+    def _allocate_row(self, wallet: str) -> int:
+        if not self._free_rows:
+            self._grow()
+        row = self._free_rows.pop()
+        self.rows[wallet] = row
+        self.exposure[row] = 0.0
+        return row
+
+    def _release_row(self, wallet: str):
+        row = self.rows.pop(wallet)
+        self.enabled[row] = False
+        for token in [t for t, (r, _) in self.token_wallets.items() if r == row]:
+            del self.token_wallets[token]
+        self._free_rows.append(row)
+
+    def _grow(self):
+        """Double row capacity"""
+        size = len(self.enabled)
+        self._free_rows.extend(range(2 * size - 1, size - 1, -1))
+        self.size_multiplier = np.concatenate([self.size_multiplier, np.ones(size)])
+        self.max_exposure = np.concatenate([self.max_exposure, np.full(size, np.inf)])
+        self.enabled = np.concatenate([self.enabled, np.zeros(size, dtype=bool)])
+        self.exposure = np.concatenate([self.exposure, np.zeros(size)])
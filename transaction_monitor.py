@@ -1,5 +1,5 @@
 from solana.rpc.async_api import AsyncClient
-from solana.publickey import PublicKey
+from solders.pubkey import Pubkey
 import asyncio
 from typing import List, Dict, Callable
 import json
@@ -8,7 +8,7 @@ import logging
 class TransactionMonitor:
     def __init__(self, client: AsyncClient, target_wallets: List[str]):
         self.client = client
-        self.target_wallets = [PublicKey(addr) for addr in target_wallets]
+        self.target_wallets = [Pubkey.from_string(addr) for addr in target_wallets]
         self.callbacks: List[Callable] = []
         
     def add_callback(self, callback: Callable):
@@ -33,7 +33,7 @@ class TransactionMonitor:
                 logging.error(f"Monitoring error: {str(e)}")
                 await asyncio.sleep(1)
                 
-    async def _subscribe_to_wallet(self, wallet: PublicKey):
+    async def _subscribe_to_wallet(self, wallet: Pubkey):
         """Subscribe to a wallet's transactions"""
         ws = await self.client.create_subscription()
         
@@ -0,0 +1,317 @@
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import TokenAccountOpts
+from solders.pubkey import Pubkey
+from dataclasses import dataclass
+import asyncio
+import base64
+import logging
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from utils.token_cache import TOKEN_2022_PROGRAM_ID, TOKEN_PROGRAM_ID, TokenContext
+
+LAMPORTS_PER_SOL = 10**9
+
+# SPL token account layout: mint (32) + owner (32) + amount (8)
+TOKEN_ACCOUNT_MINT = slice(0, 32)
+TOKEN_ACCOUNT_AMOUNT_OFFSET = 64
+
+
+@dataclass
+class TokenBalance:
+    account: str
+    mint: str
+    amount: int  # Base units
+    slot: int = 0  # Slot the amount was last known at
+
+
+class BalanceLedger:
+    """
+    In-memory SOL and SPL token balances of our own wallet.
+
+    Seeded with one ``getBalance`` and one ``getTokenAccountsByOwner`` call
+    per token program, issued together, then kept current from account
+    notifications on the wallet and its token accounts and from the
+    results of our confirmed trades. Every value carries the slot it was
+    last known at: notifications and reconcile reads replace values from
+    older slots, and a trade result only applies to accounts not yet
+    updated at or after its slot, so a notification for the same trade is
+    never counted twice. Trade results are conservative (tokens received
+    count as the quoted minimum) until the next notification; a background
+    reconcile every ``reconcile_interval`` seconds repairs anything missed.
+
+    Reads never await, so trades can be sized from the ledger in-line.
+    When sharded, the SOL balance and every shard's reservations are also
+    kept in the SharedPositionTable, and free SOL is computed from those,
+    so shards spending the same wallet never commit the same lamports.
+    """
+
+    def __init__(self, client: AsyncClient, owner: Pubkey,
+                 reconcile_interval: float = 30.0, sol_reserve: float = 0.01,
+                 shared: Optional['SharedPositionTable'] = None, shard: int = 0):
+        self.client = client
+        self.owner = owner
+        self.reconcile_interval = reconcile_interval
+        self.sol_reserve = int(sol_reserve * LAMPORTS_PER_SOL)
+        self.shared = shared
+        self.shard = shard
+
+        self.lamports = 0
+        self.lamports_slot = 0
+        self.accounts: Dict[str, TokenBalance] = {}  # token account -> balance
+        self.mint_accounts: Dict[str, List[str]] = {}  # mint -> token accounts
+        self.reserved = 0  # Lamports committed to unconfirmed buys
+        self.seeded = False
+        self.subscriptions: Optional['SubscriptionManager'] = None
+        self.stats: Dict[str, int] = {
+            "notifications": 0,
+            "trades": 0,
+            "reconciles": 0,
+            "drift": 0,
+        }
+        self._task = None
+
+    @classmethod
+    def from_config(cls, client: AsyncClient, owner: Pubkey, config: 'BotConfig',
+                    shared: Optional['SharedPositionTable'] = None,
+                    shard: int = 0) -> 'BalanceLedger':
+        return cls(
+            client,
+            owner,
+            reconcile_interval=config.balance_reconcile_interval,
+            sol_reserve=config.sol_reserve,
+            shared=shared,
+            shard=shard
+        )
+
+    def sol(self) -> float:
+        return self.lamports / LAMPORTS_PER_SOL
+
+    def available_sol(self) -> float:
+        """SOL free to spend after unconfirmed buys and the fee reserve"""
+        lamports, reserved = self.lamports, self.reserved
+        if self.shared is not None:
+            lamports, reserved = self.shared.lamports(), self.shared.reserved()
+        return max(0, lamports - reserved - self.sol_reserve) / LAMPORTS_PER_SOL
+
+    def token(self, mint: str) -> int:
+        """Base units of ``mint`` held across our token accounts"""
+        return sum(self.accounts[account].amount for account in self.mint_accounts.get(mint, ()))
+
+    def token_account(self, account: str) -> int:
+        """Base units held in one token account"""
+        balance = self.accounts.get(account)
+        return balance.amount if balance is not None else 0
+
+    def reserve(self, lamports: int):
+        self.reserved += lamports
+        if self.shared is not None:
+            self.shared.reserve(self.shard, lamports)
+
+    def release(self, lamports: int):
+        self.reserved = max(0, self.reserved - lamports)
+        if self.shared is not None:
+            self.shared.release(self.shard, lamports)
+
+    def start(self):
+        """Start the periodic reconcile"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def seed(self):
+        """Load every balance once; later reads come from memory"""
+        try:
+            await self.reconcile()
+        except Exception as e:
+            logging.error(f"Error seeding balance ledger: {str(e)}")
+            return
+        self.seeded = True
+        logging.info(
+            f"Balance ledger seeded: {self.sol():.4f} SOL, "
+            f"{len(self.accounts)} token accounts"
+        )
+
+    async def reconcile(self):
+        """Re-read every balance, replacing values older than the response"""
+        balance, *token_accounts = await asyncio.gather(
+            self.client.get_balance(self.owner),
+            *(
+                self.client.get_token_accounts_by_owner(
+                    self.owner, TokenAccountOpts(program_id=program, encoding="base64")
+                )
+                for program in (TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID)
+            )
+        )
+        self.stats["reconciles"] += 1
+
+        slot = balance['result']['context']['slot']
+        self._set_lamports(balance['result']['value'], slot, drift=self.seeded)
+
+        listed = set()
+        for response in token_accounts:
+            slot = response['result']['context']['slot']
+            for entry in response['result']['value']:
+                data = base64.b64decode(entry['account']['data'][0])
+                listed.add(entry['pubkey'])
+                self._set_token(entry['pubkey'], data, slot, drift=self.seeded)
+
+        # Forget accounts closed since they were last seen; watched ATAs
+        # that have never existed (slot 0) are kept for their first buy
+        oldest = min(response['result']['context']['slot'] for response in token_accounts)
+        for account in [a for a in self.accounts if a not in listed]:
+            balance = self.accounts[account]
+            if 0 < balance.slot <= oldest:
+                if balance.amount:
+                    self.stats["drift"] += 1
+                self._forget(account)
+
+    def attach(self, subscriptions: 'SubscriptionManager'):
+        """Receive account-change notifications for the wallet and its token accounts"""
+        self.subscriptions = subscriptions
+        subscriptions.register(self.owner, self.on_account_change)
+        for account in self.accounts:
+            subscriptions.register(Pubkey.from_string(account), self.on_account_change)
+
+    def watch(self, context: TokenContext):
+        """Track a mint's ATA before it exists, so its first balance is notified"""
+        account = str(context.ata)
+        if account not in self.accounts:
+            self._track(TokenBalance(account, str(context.mint), 0))
+
+    async def on_account_change(self, account: str, notification):
+        value, slot = self._account_value(notification)
+        if value is None or slot is None:
+            return
+        self.stats["notifications"] += 1
+
+        if account == str(self.owner):
+            self._set_lamports(self._field(value, 'lamports') or 0, slot)
+            return
+
+        data = self._account_bytes(value)
+        if data is None or len(data) < TOKEN_ACCOUNT_AMOUNT_OFFSET + 8:
+            # Closed account
+            balance = self.accounts.get(account)
+            if balance is not None and slot >= balance.slot:
+                balance.amount, balance.slot = 0, slot
+            return
+        self._set_token(account, data, slot)
+
+    def apply_trade(self, account: str, is_buy: bool, amount_in: int, amount_out: int,
+                    fee: int, slot: Optional[int], landed: bool = True):
+        """
+        Apply a settled trade's balance changes
+
+        Buys spend ``amount_in`` lamports for ``amount_out`` tokens in the
+        token ``account``, sells the reverse. A failed trade
+        (``landed=False``) only pays ``fee``.
+        """
+        self.stats["trades"] += 1
+        slot = slot or 0
+        if self.lamports_slot < slot or not slot:
+            lamports = -fee
+            if landed:
+                lamports += -amount_in if is_buy else amount_out
+            self.lamports = max(0, self.lamports + lamports)
+            self.lamports_slot = max(self.lamports_slot, slot)
+            if self.shared is not None:
+                try:
+                    self.shared.add_lamports(lamports, slot)
+                except TimeoutError as e:
+                    logging.error(f"Error sharing SOL balance: {str(e)}")
+
+        balance = self.accounts.get(account)
+        if not landed or balance is None:
+            return
+        if balance.slot < slot or not slot:
+            change = amount_out if is_buy else -amount_in
+            balance.amount = max(0, balance.amount + change)
+            balance.slot = max(balance.slot, slot)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            **self.stats,
+            "sol": self.sol(),
+            "reserved_sol": self.reserved / LAMPORTS_PER_SOL,
+            "token_accounts": len(self.accounts),
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            if not self.seeded:
+                await self.seed()
+                continue
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logging.error(f"Balance reconcile error: {str(e)}")
+
+    def _set_lamports(self, lamports: int, slot: int, drift: bool = False):
+        if slot < self.lamports_slot:
+            return
+        if drift and lamports != self.lamports:
+            self.stats["drift"] += 1
+        self.lamports = lamports
+        self.lamports_slot = slot
+        if self.shared is not None:
+            try:
+                self.shared.set_lamports(lamports, slot)
+            except TimeoutError as e:
+                logging.error(f"Error sharing SOL balance: {str(e)}")
+
+    def _set_token(self, account: str, data: bytes, slot: int, drift: bool = False):
+        amount, = struct.unpack_from("<Q", data, TOKEN_ACCOUNT_AMOUNT_OFFSET)
+        balance = self.accounts.get(account)
+        if balance is None:
+            mint = str(Pubkey(data[TOKEN_ACCOUNT_MINT]))
+            self._track(TokenBalance(account, mint, amount, slot))
+            return
+        if slot < balance.slot:
+            return
+        if drift and amount != balance.amount:
+            self.stats["drift"] += 1
+        balance.amount = amount
+        balance.slot = slot
+
+    def _track(self, balance: TokenBalance):
+        self.accounts[balance.account] = balance
+        self.mint_accounts.setdefault(balance.mint, []).append(balance.account)
+        if self.subscriptions is not None:
+            self.subscriptions.register(Pubkey.from_string(balance.account), self.on_account_change)
+
+    def _forget(self, account: str):
+        balance = self.accounts.pop(account)
+        accounts = self.mint_accounts[balance.mint]
+        accounts.remove(account)
+        if not accounts:
+            del self.mint_accounts[balance.mint]
+        if self.subscriptions is not None:
+            self.subscriptions.unregister(Pubkey.from_string(account), self.on_account_change)
+
+    @staticmethod
+    def _field(value, name: str):
+        return value.get(name) if isinstance(value, dict) else getattr(value, name, None)
+
+    @staticmethod
+    def _account_value(notification) -> Tuple[Optional[object], Optional[int]]:
+        """Account value and context slot from an account notification"""
+        if isinstance(notification, dict):
+            return notification.get('value'), (notification.get('context') or {}).get('slot')
+        slot = getattr(getattr(notification, "context", None), "slot", None)
+        return getattr(notification, "value", None), slot
+
+    @classmethod
+    def _account_bytes(cls, value) -> Optional[bytes]:
+        data = cls._field(value, 'data')
+        if isinstance(data, (list, tuple)):
+            data = base64.b64decode(data[0])
+        elif isinstance(data, str):
+            data = base64.b64decode(data)
+        return bytes(data) if data else None
@@ -0,0 +1,130 @@
+from solana.rpc.async_api import AsyncClient
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+# Solana targets ~400ms slots and a blockhash stays valid for 150 blocks
+SLOT_TIME = 0.4
+BLOCKHASH_VALIDITY = 150
+
+
+class BlockhashCache:
+    """
+    Background recent-blockhash provider.
+
+    A refresh task keeps the latest blockhash and its last valid block
+    height in memory so trade construction can read it without awaiting.
+    Reads of a stale value wake the refresh task immediately.
+    """
+
+    def __init__(self, client: AsyncClient, commitment: str = "confirmed",
+                 refresh_slots: int = 10, stale_slots: int = 60):
+        self.client = client
+        self.commitment = commitment
+        self.refresh_interval = refresh_slots * SLOT_TIME
+        self.stale_after = stale_slots * SLOT_TIME
+
+        self.blockhash: Optional[str] = None
+        self.last_valid_block_height: Optional[int] = None
+        self.slot: Optional[int] = None
+        self.fetched_at: Optional[float] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_reads = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background refresh task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background refresh task"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def get(self) -> Optional[str]:
+        """
+        Return the cached blockhash without awaiting
+
+        Returns None when nothing has been fetched yet or the cached value
+        has expired; the caller should then fetch one directly.
+        """
+        if self.blockhash is None or self.blocks_remaining() <= 0:
+            self.misses += 1
+            self._wake.set()
+            return None
+
+        if self.age() > self.stale_after:
+            self.stale_reads += 1
+            self._wake.set()
+
+        self.hits += 1
+        return self.blockhash
+
+    def age(self) -> float:
+        """Seconds since the cached blockhash was fetched"""
+        if self.fetched_at is None:
+            return float("inf")
+        return time.monotonic() - self.fetched_at
+
+    def current_slot(self) -> Optional[int]:
+        """Estimated current slot, extrapolated from the last refresh"""
+        if self.slot is None:
+            return None
+        return self.slot + int(self.age() / SLOT_TIME)
+
+    def blocks_remaining(self) -> int:
+        """Estimated blocks left before the cached blockhash expires"""
+        if self.last_valid_block_height is None:
+            return 0
+        return BLOCKHASH_VALIDITY - int(self.age() / SLOT_TIME)
+
+    def metrics(self) -> Dict[str, float]:
+        reads = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_reads": self.stale_reads,
+            "hit_rate": self.hits / reads if reads else 0.0,
+            "age_seconds": self.age(),
+            "blocks_remaining": self.blocks_remaining(),
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
+    async def refresh(self) -> str:
+        """Fetch the latest blockhash and store it"""
+        response = await self.client.get_latest_blockhash(self.commitment)
+        value = response['result']['value']
+
+        self.blockhash = value['blockhash']
+        self.last_valid_block_height = value['lastValidBlockHeight']
+        self.slot = response['result']['context']['slot']
+        self.fetched_at = time.monotonic()
+        self.refreshes += 1
+        return self.blockhash
+
+    async def _run(self):
+        """Refresh every few slots, or immediately when woken by a stale read"""
+        while True:
+            self._wake.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.refresh_errors += 1
+                logging.error(f"Blockhash refresh error: {str(e)}")
+                await asyncio.sleep(SLOT_TIME)
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
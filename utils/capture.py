@@ -0,0 +1,143 @@
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Iterator, NamedTuple, Optional
+
+MAGIC = b"SOLCAP01"
+# magic, committed length
+FILE_HEADER = struct.Struct("<8sQ")
+# arrival ns, slot (-1 if unknown), account length, payload length
+RECORD_HEADER = struct.Struct("<QqHI")
+
+
+class CaptureRecord(NamedTuple):
+    arrival_ns: int
+    slot: Optional[int]
+    account: str
+    payload: memoryview
+
+    def decode(self):
+        """Parse the JSON payload"""
+        return json.loads(bytes(self.payload))
+
+
+def encode_payload(notification) -> bytes:
+    """Serialize a notification result or fetched transaction to JSON bytes"""
+    to_json = getattr(notification, "to_json", None)
+    if to_json is not None:
+        return to_json().encode()
+    return json.dumps(notification, default=str).encode()
+
+
+class CaptureWriter:
+    """
+    Memory-mapped append-only capture of wallet transactions.
+
+    Records are copied straight into the mapping, so capturing never blocks
+    the event loop on file I/O. The committed length in the file header is
+    advanced after each record, so a crash never exposes a torn record.
+    An existing capture is appended to from its committed length; any
+    other file at ``path`` is moved aside to the first free ``path.N``.
+    """
+
+    def __init__(self, path: str, initial_size: int = 64 * 1024 * 1024):
+        self.path = path
+        self.records = 0
+        self._offset = self._committed_length(path)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._size = max(initial_size, self._offset + initial_size)
+        os.ftruncate(self._fd, self._size)
+        self._map = mmap.mmap(self._fd, self._size)
+        FILE_HEADER.pack_into(self._map, 0, MAGIC, self._offset)
+
+    def record(self, account: str, slot: Optional[int], payload: bytes,
+               arrival_ns: Optional[int] = None):
+        """Append one notification"""
+        if arrival_ns is None:
+            arrival_ns = time.time_ns()
+        account_bytes = account.encode()
+        length = RECORD_HEADER.size + len(account_bytes) + len(payload)
+        if self._offset + length > self._size:
+            self._grow(self._offset + length)
+
+        offset = self._offset
+        RECORD_HEADER.pack_into(
+            self._map, offset, arrival_ns, -1 if slot is None else slot,
+            len(account_bytes), len(payload)
+        )
+        offset += RECORD_HEADER.size
+        self._map[offset:offset + len(account_bytes)] = account_bytes
+        offset += len(account_bytes)
+        self._map[offset:offset + len(payload)] = payload
+
+        self._offset = offset + len(payload)
+        FILE_HEADER.pack_into(self._map, 0, MAGIC, self._offset)
+        self.records += 1
+
+    def close(self):
+        """Flush the mapping and trim the file to the committed length"""
+        self._map.flush()
+        self._map.close()
+        os.ftruncate(self._fd, self._offset)
+        os.close(self._fd)
+
+    @staticmethod
+    def _committed_length(path: str) -> int:
+        """Where to resume an existing capture, after moving a foreign file aside"""
+        if not os.path.exists(path):
+            return FILE_HEADER.size
+        with open(path, "rb") as f:
+            header = f.read(FILE_HEADER.size)
+            end = f.seek(0, os.SEEK_END)
+        if len(header) == FILE_HEADER.size:
+            magic, length = FILE_HEADER.unpack(header)
+            if magic == MAGIC and FILE_HEADER.size <= length <= end:
+                return length
+
+        suffix = 1
+        while os.path.exists(f"{path}.{suffix}"):
+            suffix += 1
+        os.rename(path, f"{path}.{suffix}")
+        return FILE_HEADER.size
+
+    def _grow(self, needed: int):
+        # Doubling keeps remaps rare; unflushed pages stay in the page
+        # cache across the remap, so the loop never waits on a sync
+        size = self._size
+        while size < needed:
+            size *= 2
+        self._map.close()
+        os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._size = size
+
+
+class CaptureReader:
+    """Iterate over the committed records of a capture file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.length = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a capture file: {path}")
+
+    def __iter__(self) -> Iterator[CaptureRecord]:
+        view = memoryview(self._map)
+        offset = FILE_HEADER.size
+        while offset < self.length:
+            arrival_ns, slot, account_length, payload_length = (
+                RECORD_HEADER.unpack_from(view, offset)
+            )
+            offset += RECORD_HEADER.size
+            account = bytes(view[offset:offset + account_length]).decode()
+            offset += account_length
+            payload = view[offset:offset + payload_length]
+            offset += payload_length
+            yield CaptureRecord(arrival_ns, None if slot < 0 else slot, account, payload)
+
+    def close(self):
+        self._map.close()
@@ -0,0 +1,190 @@
+from array import array
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+# Span marks in the order a signal passes them
+STAGES = ("notify", "parse", "dequeue", "token_context", "price", "send")
+NOTIFY, PARSE, DEQUEUE, TOKEN_CONTEXT, PRICE, SEND = range(len(STAGES))
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+BUCKET_COUNT = 64 * SUB_BUCKETS
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of non-negative integers.
+
+    Each power of two is split into 16 linear sub-buckets, giving ~6%
+    relative precision with O(1) recording and a fixed 8 KiB footprint.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        if value < 0:
+            value = 0
+        if value < SUB_BUCKETS:
+            index = value
+        else:
+            shift = value.bit_length() - SUB_BUCKET_BITS - 1
+            index = (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+            if index >= BUCKET_COUNT:
+                index = BUCKET_COUNT - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> int:
+        """Approximate value at percentile q (0-100)"""
+        if not self.count:
+            return 0
+        target = max(1, int(self.count * q / 100 + 0.5))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                return min(self._midpoint(index), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @staticmethod
+    def _midpoint(index: int) -> int:
+        if index < SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        lower = (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+        return lower + ((1 << shift) >> 1)
+
+
+class Span:
+    """Monotonic ns marks for one signal; instances are pooled and reused"""
+
+    __slots__ = ("wallet", "slot", "marks")
+
+    def __init__(self):
+        self.wallet = ""
+        self.slot: Optional[int] = None
+        self.marks = [0] * len(STAGES)
+
+    def mark(self, stage: int):
+        self.marks[stage] = time.perf_counter_ns()
+
+
+class LatencyTracer:
+    """
+    Per-signal latency tracing from wallet notification to transaction send.
+
+    Stage durations are the gaps between consecutive span marks and feed one
+    histogram per stage; end-to-end latency also feeds a histogram per
+    target wallet. Slot lag between the copied transaction and our landed
+    transaction is recorded per wallet once landing is reported.
+    """
+
+    def __init__(self, pool_size: int = 1024, max_pending_landings: int = 4096):
+        self.stage_histograms: Dict[str, LatencyHistogram] = {
+            stage: LatencyHistogram() for stage in STAGES[1:]
+        }
+        self.total_histogram = LatencyHistogram()
+        self.wallet_histograms: Dict[str, LatencyHistogram] = {}
+        self.slot_lag_histograms: Dict[str, LatencyHistogram] = {}
+        self.pending_landings: Dict[str, tuple] = {}
+        self.max_pending_landings = max_pending_landings
+        self.pool_size = pool_size
+        self._pool: List[Span] = [Span() for _ in range(pool_size)]
+        self._task: Optional[asyncio.Task] = None
+
+    def begin(self, wallet: str, slot: Optional[int] = None) -> Span:
+        """Start a span at notification arrival"""
+        span = self._pool.pop() if self._pool else Span()
+        span.wallet = wallet
+        span.slot = slot
+        marks = span.marks
+        for i in range(len(marks)):
+            marks[i] = 0
+        marks[NOTIFY] = time.perf_counter_ns()
+        return span
+
+    def finish(self, span: Span):
+        """Record a completed span and return it to the pool"""
+        marks = span.marks
+        previous = marks[NOTIFY]
+        for stage in range(1, len(STAGES)):
+            mark = marks[stage]
+            if mark:
+                self.stage_histograms[STAGES[stage]].record(mark - previous)
+                previous = mark
+
+        total = previous - marks[NOTIFY]
+        self.total_histogram.record(total)
+        histogram = self.wallet_histograms.get(span.wallet)
+        if histogram is None:
+            histogram = self.wallet_histograms[span.wallet] = LatencyHistogram()
+        histogram.record(total)
+
+        self.release(span)
+
+    def release(self, span: Span):
+        """Return a span to the pool without recording it"""
+        if len(self._pool) < self.pool_size:
+            self._pool.append(span)
+
+    def track_landing(self, signature: str, wallet: str, source_slot: Optional[int]):
+        """Remember the source slot of a sent transaction until it lands"""
+        if source_slot is None:
+            return
+        if len(self.pending_landings) >= self.max_pending_landings:
+            self.pending_landings.pop(next(iter(self.pending_landings)))
+        self.pending_landings[signature] = (wallet, source_slot)
+
+    def on_landed(self, signature: str, landing_slot: int):
+        """Record slot lag between the copied transaction and ours"""
+        pending = self.pending_landings.pop(signature, None)
+        if pending is None:
+            return
+        wallet, source_slot = pending
+        histogram = self.slot_lag_histograms.get(wallet)
+        if histogram is None:
+            histogram = self.slot_lag_histograms[wallet] = LatencyHistogram()
+        histogram.record(landing_slot - source_slot)
+
+    def summary(self) -> str:
+        """One-line latency summary in milliseconds"""
+        total = self.total_histogram
+        parts = [
+            f"signals={total.count}",
+            f"e2e p50={total.percentile(50) / 1e6:.2f}ms "
+            f"p99={total.percentile(99) / 1e6:.2f}ms max={total.max / 1e6:.2f}ms"
+        ]
+        for stage, histogram in self.stage_histograms.items():
+            if histogram.count:
+                parts.append(f"{stage} p99={histogram.percentile(99) / 1e6:.2f}ms")
+        return "LATENCY: " + " | ".join(parts)
+
+    def start_summary(self, interval: float = 60.0):
+        """Log a summary line every interval seconds"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._log_summaries(interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _log_summaries(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            logging.info(self.summary())
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from typing import Callable, List, Optional
+
+from utils.latency_tracer import LatencyHistogram, LatencyTracer
+from utils.rpc_pool import RpcPool
+
+QUANTILES = (50, 90, 99, 99.9)
+
+
+def render_histogram(lines: List[str], name: str, histogram: LatencyHistogram,
+                     labels: str = "", scale: float = 1.0):
+    """Append a histogram as a Prometheus summary"""
+    prefix = f"{labels}," if labels else ""
+    for q in QUANTILES:
+        lines.append(
+            f'{name}{{{prefix}quantile="{q / 100:g}"}} {histogram.percentile(q) * scale}'
+        )
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.total * scale}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+
+
+def render_tracer(tracer: LatencyTracer) -> List[str]:
+    lines = [
+        "# TYPE copytrade_signal_latency_seconds summary",
+    ]
+    render_histogram(
+        lines, "copytrade_signal_latency_seconds", tracer.total_histogram, scale=1e-9
+    )
+
+    lines.append("# TYPE copytrade_stage_latency_seconds summary")
+    for stage, histogram in tracer.stage_histograms.items():
+        render_histogram(
+            lines, "copytrade_stage_latency_seconds", histogram,
+            f'stage="{stage}"', scale=1e-9
+        )
+
+    lines.append("# TYPE copytrade_wallet_latency_seconds summary")
+    for wallet, histogram in tracer.wallet_histograms.items():
+        render_histogram(
+            lines, "copytrade_wallet_latency_seconds", histogram,
+            f'wallet="{wallet}"', scale=1e-9
+        )
+
+    lines.append("# TYPE copytrade_landing_slot_lag summary")
+    for wallet, histogram in tracer.slot_lag_histograms.items():
+        render_histogram(
+            lines, "copytrade_landing_slot_lag", histogram, f'wallet="{wallet}"'
+        )
+    return lines
+
+
+def render_rpc_pool(pool: RpcPool) -> List[str]:
+    lines = []
+    metrics = (
+        ("copytrade_rpc_latency_seconds", "gauge", lambda e: e.latency or 0.0),
+        ("copytrade_rpc_error_rate", "gauge", lambda e: e.error_rate),
+        ("copytrade_rpc_available", "gauge", lambda e: int(e.available(time.monotonic()))),
+        ("copytrade_rpc_requests_total", "counter", lambda e: e.requests),
+        ("copytrade_rpc_errors_total", "counter", lambda e: e.errors),
+        ("copytrade_rpc_sends_won_total", "counter", lambda e: e.sends_won),
+        ("copytrade_rpc_circuit_opens_total", "counter", lambda e: e.circuit_opens),
+    )
+    for name, kind, value in metrics:
+        lines.append(f"# TYPE {name} {kind}")
+        for endpoint in pool.endpoints:
+            lines.append(f'{name}{{endpoint="{endpoint.url}"}} {value(endpoint)}')
+    return lines
+
+
+def render_coalescer(coalescer: 'SignalCoalescer') -> List[str]:
+    lines = []
+    metrics = (
+        ("copytrade_coalesced_signals_total", "counter", coalescer.stats["signals"]),
+        ("copytrade_coalesced_orders_total", "counter", coalescer.stats["orders"]),
+        ("copytrade_coalesced_netted_total", "counter", coalescer.stats["netted"]),
+        ("copytrade_coalesced_capped_total", "counter", coalescer.stats["capped"]),
+        ("copytrade_trades_saved_total", "counter", coalescer.trades_saved()),
+        ("copytrade_fees_saved_sol_total", "counter", coalescer.fees_saved()),
+    )
+    for name, kind, value in metrics:
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+    return lines
+
+
+def render_balances(ledger: 'BalanceLedger') -> List[str]:
+    lines = []
+    metrics = (
+        ("copytrade_balance_sol", "gauge", ledger.sol()),
+        ("copytrade_reserved_sol", "gauge", ledger.reserved / 10**9),
+        ("copytrade_token_accounts", "gauge", len(ledger.accounts)),
+        ("copytrade_balance_reconciles_total", "counter", ledger.stats["reconciles"]),
+        ("copytrade_balance_drift_total", "counter", ledger.stats["drift"]),
+    )
+    for name, kind, value in metrics:
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+    return lines
+
+
+class MetricsServer:
+    """
+    Minimal Prometheus-style ``/metrics`` HTTP endpoint.
+
+    Collectors are callables returning exposition-format lines, so other
+    components can publish metrics next to the latency tracer.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9108):
+        self.host = host
+        self.port = port
+        self.collectors: List[Callable[[], List[str]]] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for collector in self.collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logging.error(f"Metrics collector error: {str(e)}")
+        return "\n".join(lines) + "\n"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logging.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1] == "/metrics":
+                status, body = "200 OK", self.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logging.error(f"Metrics request error: {str(e)}")
+        finally:
+            writer.close()
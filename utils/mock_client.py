@@ -0,0 +1,221 @@
+import asyncio
+import base64
+import hashlib
+import itertools
+import math
+import random
+import struct
+from typing import Dict, List, Optional, Set, Tuple
+
+from base58 import b58decode, b58encode
+
+from trading.decoders import WSOL_MINT
+from trading.quote_engine import PUMP_CURVE
+
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+PUMP_PROGRAM_ID = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+WHIRLPOOL_PROGRAM_ID = "whirLbMiicVdio4qvUfM5KAg6Ct8VwpYzGff3uctyCc"
+
+# Reserves of the pools add_market creates: token base units, lamports
+TOKEN_RESERVE = 1_073_000_000 * 10**6
+SOL_RESERVE = 30 * 10**9
+
+
+def token_account_data(mint: str, amount: int) -> bytes:
+    """SPL token account: mint, owner, amount, then the remaining fields"""
+    return b58decode(mint) + bytes(32) + struct.pack("<Q", amount) + bytes(93)
+
+
+def whirlpool_data(mint_a: str, mint_b: str, reserve_a: int, reserve_b: int,
+                   fee_rate: int = 3000, tick_spacing: int = 64) -> bytes:
+    """Whirlpool account priced at reserve_b / reserve_a with matching liquidity"""
+    data = bytearray(261)
+    struct.pack_into("<H", data, 41, tick_spacing)
+    struct.pack_into("<H", data, 45, fee_rate)
+    data[49:65] = int(math.sqrt(reserve_a * reserve_b)).to_bytes(16, "little")
+    data[65:81] = int(math.sqrt(reserve_b / reserve_a) * 2**64).to_bytes(16, "little")
+    data[101:133] = b58decode(mint_a)
+    data[181:213] = b58decode(mint_b)
+    return bytes(data)
+
+
+class MockResponse:
+    def __init__(self, body: Dict):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self) -> Dict:
+        return self.body
+
+
+class MockProvider:
+    """
+    The part of AsyncHTTPProvider that raw JSON-RPC callers use, e.g.
+    RpcFeeSource posting getRecentPrioritizationFees
+    """
+
+    endpoint_uri = "http://127.0.0.1:8899"
+
+    def __init__(self, client: 'MockAsyncClient'):
+        self.client = client
+        self.session = self
+
+    async def post(self, url: str, json: Dict) -> MockResponse:
+        if json['method'] != 'getRecentPrioritizationFees':
+            raise ValueError(f"Unsupported raw request: {json['method']}")
+        return MockResponse(await self.client.get_recent_prioritization_fees(*json['params']))
+
+
+class MockAsyncClient:
+    """
+    Offline stand-in for ``AsyncClient``.
+
+    Serves the RPC calls the trading path makes with dict responses shaped
+    like the real ones, after a configurable latency. Accounts are served
+    from ``accounts`` by pubkey; ``add_market`` creates a mint and the
+    accounts of its pool, so the quote engine can price it. Sent
+    transactions are kept in ``sent`` so replays and benchmarks can inspect
+    them. Each send is dropped with probability ``drop_rate``; only
+    signatures with at least one landed send report a confirmed status.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0,
+                 slot: int = 250000000, decimals: int = 6, drop_rate: float = 0.0,
+                 priority_fee: int = 10000):
+        self.latency = latency
+        self.jitter = jitter
+        self.slot = slot
+        self.decimals = decimals
+        self.drop_rate = drop_rate
+        self.priority_fee = priority_fee
+        self.rng = random.Random(seed)
+        self.accounts: Dict[str, Dict] = {}
+        self.sent: List = []
+        self.landed: Set[str] = set()
+        self.calls: Dict[str, int] = {}
+        self._signatures = itertools.count()
+        self._provider = MockProvider(self)
+
+    def set_account(self, pubkey: str, data: bytes, owner: str, lamports: int = 2039280):
+        self.accounts[str(pubkey)] = {
+            'data': [base64.b64encode(data).decode(), 'base64'],
+            'owner': owner,
+            'lamports': lamports,
+            'executable': False,
+            'rentEpoch': 0
+        }
+
+    def add_mint(self, mint: str):
+        """An SPL mint with the client's decimals"""
+        self.set_account(mint, bytes(44) + bytes([self.decimals]) + bytes(37), TOKEN_PROGRAM_ID)
+
+    def add_market(self, mint: str, pool: Tuple[str, ...]):
+        """
+        A mint and the accounts of its pool, given as a decoder's pool
+        reference, e.g. ("pump", curve) or ("raydium", coin_vault, pc_vault, ...)
+        """
+        self.add_mint(mint)
+        kind, *accounts = pool
+        if kind == "pump":
+            self.set_account(
+                accounts[0],
+                PUMP_CURVE.pack(TOKEN_RESERVE, SOL_RESERVE, TOKEN_RESERVE, SOL_RESERVE,
+                                TOKEN_RESERVE, False),
+                PUMP_PROGRAM_ID
+            )
+        elif kind == "raydium":
+            coin_vault, pc_vault = accounts[:2]
+            self.set_account(coin_vault, token_account_data(mint, TOKEN_RESERVE), TOKEN_PROGRAM_ID)
+            self.set_account(pc_vault, token_account_data(WSOL_MINT, SOL_RESERVE), TOKEN_PROGRAM_ID)
+        elif kind == "whirlpool":
+            self.set_account(
+                accounts[0],
+                whirlpool_data(WSOL_MINT, mint, SOL_RESERVE, TOKEN_RESERVE),
+                WHIRLPOOL_PROGRAM_ID
+            )
+        else:
+            raise ValueError(f"Unknown pool kind: {kind}")
+
+    async def _respond(self, method: str, value, context: bool = True) -> Dict:
+        self.calls[method] = self.calls.get(method, 0) + 1
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if context:
+            value = {'context': {'slot': self.slot}, 'value': value}
+        return {'jsonrpc': '2.0', 'id': 1, 'result': value}
+
+    async def get_latest_blockhash(self, commitment: Optional[str] = None) -> Dict:
+        blockhash = b58encode(hashlib.sha256(str(self.slot).encode()).digest()).decode()
+        return await self._respond('getLatestBlockhash', {
+            'blockhash': blockhash,
+            'lastValidBlockHeight': self.slot + 150
+        })
+
+    async def get_balance(self, pubkey, commitment: Optional[str] = None) -> Dict:
+        return await self._respond('getBalance', 10 * 10**9)
+
+    async def get_multiple_accounts(self, pubkeys, commitment: Optional[str] = None,
+                                    encoding: str = "base64") -> Dict:
+        return await self._respond(
+            'getMultipleAccounts', [self.accounts.get(str(pubkey)) for pubkey in pubkeys]
+        )
+
+    async def get_recent_prioritization_fees(self, accounts: List[str]) -> Dict:
+        """Served through ``_provider``, as AsyncClient has no such method"""
+        fees = [
+            {'slot': self.slot - i,
+             'prioritizationFee': int(self.priority_fee * self.rng.lognormvariate(0, 1))}
+            for i in range(150)
+        ]
+        return await self._respond('getRecentPrioritizationFees', fees, context=False)
+
+    async def get_token_accounts_by_owner(self, owner, opts,
+                                          commitment: Optional[str] = None) -> Dict:
+        return await self._respond('getTokenAccountsByOwner', [])
+
+    async def send_transaction(self, tx, *signers, opts=None) -> Dict:
+        self.sent.append(tx)
+        # Resending the same bytes yields the same signature
+        seed = tx if isinstance(tx, bytes) else str(next(self._signatures)).encode()
+        signature = b58encode(hashlib.sha512(seed).digest()).decode()
+        if self.rng.random() >= self.drop_rate:
+            self.landed.add(signature)
+        return await self._respond('sendTransaction', signature, context=False)
+
+    async def send_raw_transaction(self, txn: bytes, opts=None) -> Dict:
+        return await self.send_transaction(txn, opts=opts)
+
+    async def simulate_transaction(self, tx, sig_verify: bool = False,
+                                   commitment: Optional[str] = None) -> Dict:
+        return await self._respond('simulateTransaction', {
+            'err': None, 'logs': [], 'unitsConsumed': 60000
+        })
+
+    async def get_signatures_for_address(self, account, before=None, until=None,
+                                         limit=None, commitment=None) -> Dict:
+        return await self._respond('getSignaturesForAddress', [], context=False)
+
+    async def get_transaction(self, signature, encoding: str = "json",
+                              commitment: Optional[str] = None,
+                              max_supported_transaction_version=None) -> Dict:
+        return await self._respond('getTransaction', {
+            'slot': self.slot,
+            'meta': {'err': None, 'computeUnitsConsumed': 60000}
+        }, context=False)
+
+    async def get_signature_statuses(self, signatures, search_transaction_history=False) -> Dict:
+        return await self._respond('getSignatureStatuses', [
+            {'slot': self.slot, 'confirmations': 0, 'err': None,
+             'confirmationStatus': 'confirmed'}
+            if str(signature) in self.landed else None
+            for signature in signatures
+        ])
+
+    async def get_block_height(self, commitment: Optional[str] = None) -> Dict:
+        return await self._respond('getBlockHeight', self.slot, context=False)
+
+    async def close(self):
+        pass
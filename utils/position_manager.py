@@ -1,45 +1,214 @@
-```python
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, List, Mapping, Optional, Set, Tuple
 import logging
+import numpy as np
+
+from utils.shared_positions import SharedPositionTable
 
 class PositionManager:
-    def __init__(self, stop_loss_pct: float, take_profit_pct: Optional[float] = None):
-        self.positions: Dict[str, Dict] = {}
+    def __init__(self, stop_loss_pct: float, take_profit_pct: Optional[float] = None,
+                 initial_capacity: int = 256,
+                 shared: Optional[SharedPositionTable] = None, shard: int = 0,
+                 max_exposure: Optional[float] = None):
         self.stop_loss_pct = stop_loss_pct
         self.take_profit_pct = take_profit_pct
-        
-    def open_position(self, token: str, entry_price: Decimal, amount: float):
-        self.positions[token] = {
-            'entry_price': entry_price,
-            'amount': amount,
-            'pnl_percentage': 0
+
+        # Positions across all shards when sharded; this shard only enforces
+        # stops on the positions it owns
+        self.shared = shared
+        self.shard = shard
+        self.max_exposure = max_exposure
+        # Local positions the shared table had no room for, republished
+        # once it has
+        self.unpublished: Set[str] = set()
+
+        # Optional StateStore persisting opens and closes for warm restarts
+        self.store: Optional['StateStore'] = None
+
+        # Columnar position storage, one row per open token
+        self.token_rows: Dict[str, int] = {}
+        self.row_tokens: List[Optional[str]] = [None] * initial_capacity
+        self.entry_prices: Dict[str, Decimal] = {}
+        self._free_rows: List[int] = list(range(initial_capacity - 1, -1, -1))
+        self._entry = np.zeros(initial_capacity)
+        self._amount = np.zeros(initial_capacity)
+        self._stop = np.zeros(initial_capacity)
+        self._take = np.full(initial_capacity, np.inf)
+        self._pnl = np.zeros(initial_capacity)
+
+        if shared is not None:
+            self._adopt_shared()
+
+    @property
+    def positions(self) -> Dict[str, Dict]:
+        """Open positions as plain dicts"""
+        return {
+            token: {
+                'entry_price': self.entry_prices[token],
+                'amount': float(self._amount[row]),
+                'pnl_percentage': float(self._pnl[row])
+            }
+            for token, row in self.token_rows.items()
         }
+
+    def open_position(self, token: str, entry_price: Decimal, amount: float,
+                      publish: bool = True):
+        row = self.token_rows.get(token)
+        if row is None:
+            row = self._allocate_row(token)
+
+        price = float(entry_price)
+        self.entry_prices[token] = entry_price
+        self._entry[row] = price
+        self._amount[row] = amount
+        self._pnl[row] = 0
+        self._stop[row] = price * (1 - self.stop_loss_pct / 100)
+        self._take[row] = (
+            price * (1 + self.take_profit_pct / 100)
+            if self.take_profit_pct else np.inf
+        )
+        if self.shared is not None and publish:
+            try:
+                self.shared.open(token, price, amount, self.shard)
+                self.unpublished.discard(token)
+            except TimeoutError as e:
+                logging.error(f"Error publishing position for {token}: {str(e)}")
+            except RuntimeError as e:
+                # Table full; keep enforcing stops on the local position
+                self.unpublished.add(token)
+                logging.error(f"Error publishing position for {token}: {str(e)}")
+        if self.store is not None:
+            self.store.save_position(token, entry_price, amount)
         logging.info(f"Opened position for {token} at {entry_price} SOL")
-        
+
+    def amount(self, token: str) -> float:
+        """SOL held in a token, across every shard when sharded"""
+        if self.shared is not None:
+            try:
+                position = self.shared.get(token)
+                return position[1] if position is not None else 0.0
+            except TimeoutError as e:
+                logging.error(f"Error reading shared position for {token}: {str(e)}")
+        row = self.token_rows.get(token)
+        return float(self._amount[row]) if row is not None else 0.0
+
+    def exposure(self) -> float:
+        """SOL held in open positions, across every shard when sharded"""
+        if self.shared is not None:
+            return self.shared.exposure()
+        return float(self._amount.sum())
+
+    def can_open(self, amount: float) -> bool:
+        """Whether a buy of ``amount`` SOL stays within the exposure limit"""
+        return self.max_exposure is None or self.exposure() + amount <= self.max_exposure
+
     def update_position(self, token: str, current_price: Decimal) -> Optional[str]:
-        if token not in self.positions:
+        if token not in self.token_rows:
             return None
-            
-        position = self.positions[token]
-        entry_price = position['entry_price']
-        pnl_percentage = float((current_price - entry_price) / entry_price * 100)
-        position['pnl_percentage'] = pnl_percentage
-        
-        # Check stop loss
-        if pnl_percentage <= -self.stop_loss_pct:
-            return 'stop_loss'
-            
-        # Check take profit
-        if self.take_profit_pct and pnl_percentage >= self.take_profit_pct:
-            return 'take_profit'
-            
-        return None
-        
+
+        exits = self.check_exits({token: float(current_price)})
+        return exits[0][1] if exits else None
+
+    def check_exits(self, prices: Mapping[str, float]) -> List[Tuple[str, str]]:
+        """
+        Check every open position in a price snapshot in one vectorized pass
+        Returns (token, 'stop_loss' | 'take_profit') for positions to exit
+        """
+        if self.shared is not None:
+            try:
+                self._sync_shared()
+            except TimeoutError as e:
+                logging.error(f"Error syncing shared positions: {str(e)}")
+
+        tokens = [token for token in prices if token in self.token_rows]
+        if not tokens:
+            return []
+
+        rows = np.fromiter(
+            (self.token_rows[token] for token in tokens), dtype=np.int64, count=len(tokens)
+        )
+        price = np.fromiter(
+            (prices[token] for token in tokens), dtype=np.float64, count=len(tokens)
+        )
+
+        entry = self._entry[rows]
+        self._pnl[rows] = (price - entry) / entry * 100
+
+        # Check stop loss before take profit
+        stop_hit = price <= self._stop[rows]
+        take_hit = ~stop_hit & (price >= self._take[rows])
+
+        return (
+            [(tokens[i], 'stop_loss') for i in np.flatnonzero(stop_hit)] +
+            [(tokens[i], 'take_profit') for i in np.flatnonzero(take_hit)]
+        )
+
     def close_position(self, token: str, exit_price: Decimal):
-        if token in self.positions:
-            position = self.positions[token]
-            pnl = float((exit_price - position['entry_price']) / position['entry_price'] * 100)
+        if self.shared is not None:
+            # Any shard's sell closes the position for all of them
+            try:
+                self.shared.close(token)
+            except TimeoutError as e:
+                logging.error(f"Error closing shared position for {token}: {str(e)}")
+        if self.store is not None:
+            self.store.delete_position(token)
+        if token in self.token_rows:
+            entry_price = self.entry_prices.pop(token)
+            pnl = float((exit_price - entry_price) / entry_price * 100)
             logging.info(f"Closed position for {token} at {exit_price} SOL. PnL: {pnl:.2f}%")
-            del self.positions[token]
-```
\ No newline at end of file
+            self._release_row(token)
+
+    def _adopt_shared(self):
+        """Resume stops for positions this shard owned before a restart"""
+        for token, entry, amount, shard in self.shared.items():
+            if shard == self.shard:
+                self.open_position(token, Decimal(str(entry)), amount, publish=False)
+
+    def _sync_shared(self):
+        """Drop positions another shard has closed or taken over"""
+        for token in list(self.token_rows):
+            position = self.shared.get(token)
+            if position is None and token in self.unpublished:
+                self._publish(token)
+                continue
+            if position is None or position[2] != self.shard:
+                self.entry_prices.pop(token, None)
+                self._release_row(token)
+                if self.store is not None:
+                    self.store.delete_position(token)
+
+    def _publish(self, token: str):
+        """Retry publishing a position the shared table was too full for"""
+        row = self.token_rows[token]
+        try:
+            self.shared.open(token, float(self._entry[row]), float(self._amount[row]), self.shard)
+            self.unpublished.discard(token)
+        except RuntimeError:
+            pass
+
+    def _allocate_row(self, token: str) -> int:
+        if not self._free_rows:
+            self._grow()
+        row = self._free_rows.pop()
+        self.token_rows[token] = row
+        self.row_tokens[row] = token
+        return row
+
+    def _release_row(self, token: str):
+        row = self.token_rows.pop(token)
+        self.unpublished.discard(token)
+        self.row_tokens[row] = None
+        self._amount[row] = 0
+        self._take[row] = np.inf
+        self._free_rows.append(row)
+
+    def _grow(self):
+        """Double row capacity"""
+        size = len(self.row_tokens)
+        self.row_tokens.extend([None] * size)
+        self._free_rows.extend(range(2 * size - 1, size - 1, -1))
+        self._entry = np.concatenate([self._entry, np.zeros(size)])
+        self._amount = np.concatenate([self._amount, np.zeros(size)])
+        self._stop = np.concatenate([self._stop, np.zeros(size)])
+        self._take = np.concatenate([self._take, np.full(size, np.inf)])
+        self._pnl = np.concatenate([self._pnl, np.zeros(size)])
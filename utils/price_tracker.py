@@ -1,4 +1,3 @@
-```python
 from decimal import Decimal
 from typing import Dict, Optional
 import logging
@@ -21,4 +20,3 @@ class PriceTracker:
         entry_price = self.entry_prices[token]
         current_price = self.token_prices[token]
         return float((current_price - entry_price) / entry_price * 100)
-```
\ No newline at end of file
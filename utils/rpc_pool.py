@@ -0,0 +1,241 @@
+from solana.rpc.async_api import AsyncClient
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Set
+
+DEFAULT_LATENCY = 0.5  # Seconds assumed for endpoints with no samples yet
+ERROR_PENALTY = 10.0  # Score multiplier per unit of recent error rate
+
+
+class RpcError(Exception):
+    """JSON-RPC error response returned by an endpoint"""
+
+    def __init__(self, response: Dict):
+        super().__init__(response.get('error'))
+        self.response = response
+
+
+def to_dict(response):
+    """JSON-RPC dict for a typed response; RPC errors become ``{'error': ...}``"""
+    if isinstance(response, dict) or not hasattr(response, 'to_json'):
+        return response
+    payload = json.loads(response.to_json())
+    return payload if 'result' in payload else {'error': payload}
+
+
+class RpcEndpoint:
+    """One RPC endpoint with a persistent client and its health statistics"""
+
+    def __init__(self, url: str, client: AsyncClient, alpha: float = 0.2):
+        self.url = url
+        self.client = client
+        self.alpha = alpha
+
+        self.latency: Optional[float] = None  # EWMA of response time in seconds
+        self.error_rate = 0.0  # EWMA of failures
+        self.requests = 0
+        self.errors = 0
+        self.sends_won = 0
+        self.circuit_opens = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def available(self, now: float) -> bool:
+        return now >= self.open_until
+
+    def score(self) -> float:
+        """Lower is better: recent latency inflated by recent errors"""
+        latency = DEFAULT_LATENCY if self.latency is None else self.latency
+        return latency * (1 + ERROR_PENALTY * self.error_rate)
+
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.error_rate *= 1 - self.alpha
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.alpha * (latency - self.latency)
+
+    def record_failure(self, failure_threshold: int, cooldown: float):
+        """Count a failure and open the circuit after repeated failures"""
+        self.requests += 1
+        self.errors += 1
+        self.consecutive_failures += 1
+        self.error_rate += self.alpha * (1 - self.error_rate)
+
+        # A half-open endpoint that fails again goes straight back out
+        if self.consecutive_failures >= failure_threshold:
+            self.open_until = time.monotonic() + cooldown
+            self.circuit_opens += 1
+            logging.warning(
+                f"RPC endpoint {self.url} disabled for {cooldown:.0f}s after "
+                f"{self.consecutive_failures} consecutive failures"
+            )
+
+    def stats(self) -> Dict:
+        return {
+            "url": self.url,
+            "latency_ms": None if self.latency is None else self.latency * 1000,
+            "error_rate": self.error_rate,
+            "score": self.score(),
+            "requests": self.requests,
+            "errors": self.errors,
+            "sends_won": self.sends_won,
+            "circuit_opens": self.circuit_opens,
+            "available": self.available(time.monotonic()),
+        }
+
+
+class RpcPool:
+    """
+    Health-scored pool of RPC endpoints behind the ``AsyncClient`` interface.
+
+    Sends are raced across the best ``send_fanout`` endpoints and the first
+    acceptance is returned; the slower sends are left to finish so the
+    transaction still reaches every leader path. Every other call goes to
+    the endpoint with the lowest latency/error score and fails over down
+    the ranking. Endpoints that fail ``failure_threshold`` times in a row
+    are skipped for ``cooldown`` seconds.
+
+    Typed responses are returned as JSON-RPC dicts, and RPC errors as
+    ``{'error': ...}``, so callers read ``response['result']`` whatever
+    client version the endpoints use.
+    """
+
+    def __init__(self, urls: Sequence[str], commitment: Optional[str] = None,
+                 send_fanout: int = 3, failure_threshold: int = 5,
+                 cooldown: float = 10.0,
+                 client_factory: Callable[..., AsyncClient] = AsyncClient):
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+
+        self.endpoints = [
+            RpcEndpoint(url, client_factory(url, commitment=commitment))
+            for url in urls
+        ]
+        self.send_fanout = max(1, send_fanout)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._background: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls, config: 'BotConfig') -> 'RpcPool':
+        return cls(
+            config.rpc_url,
+            commitment=config.commitment,
+            send_fanout=config.rpc_send_fanout,
+            failure_threshold=config.rpc_failure_threshold,
+            cooldown=config.rpc_cooldown
+        )
+
+    @property
+    def endpoint_uris(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    @property
+    def _provider(self):
+        """Provider of the best endpoint, for callers that post raw requests"""
+        return self.ranked()[0].client._provider
+
+    def ranked(self) -> List[RpcEndpoint]:
+        """Endpoints with closed circuits, best score first"""
+        now = time.monotonic()
+        available = [e for e in self.endpoints if e.available(now)]
+        if not available:
+            # Everything is tripped; try whichever recovers first
+            return sorted(self.endpoints, key=lambda e: e.open_until)
+        return sorted(available, key=RpcEndpoint.score)
+
+    def stats(self) -> List[Dict]:
+        return [endpoint.stats() for endpoint in self.endpoints]
+
+    def __getattr__(self, method: str):
+        if method.startswith('_'):
+            raise AttributeError(method)
+
+        async def call(*args, **kwargs):
+            return await self.request(method, *args, **kwargs)
+        return call
+
+    async def request(self, method: str, *args, **kwargs):
+        """Call ``method`` on the best endpoint, failing over down the ranking"""
+        response = None
+        error: Optional[Exception] = None
+        for endpoint in self.ranked():
+            try:
+                response = await self._call(endpoint, method, args, kwargs)
+                return response
+            except RpcError as e:
+                response = e.response
+            except Exception as e:
+                error = e
+
+        if response is not None:
+            return response
+        raise error
+
+    async def send_transaction(self, *args, **kwargs):
+        return await self._race("send_transaction", args, kwargs)
+
+    async def send_raw_transaction(self, *args, **kwargs):
+        return await self._race("send_raw_transaction", args, kwargs)
+
+    async def close(self):
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        await asyncio.gather(
+            *(endpoint.client.close() for endpoint in self.endpoints),
+            return_exceptions=True
+        )
+
+    async def _race(self, method: str, args, kwargs):
+        """Send through the top endpoints at once; the first acceptance wins"""
+        targets = self.ranked()[:self.send_fanout]
+        tasks = [
+            asyncio.ensure_future(self._call(endpoint, method, args, kwargs))
+            for endpoint in targets
+        ]
+        owners = {task: endpoint for task, endpoint in zip(tasks, targets)}
+
+        pending = set(tasks)
+        error: Optional[Exception] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    continue
+                if task.exception() is None:
+                    owners[task].sends_won += 1
+                    self._finish_in_background(pending | (done - {task}))
+                    return task.result()
+                error = task.exception()
+
+        if isinstance(error, RpcError):
+            return error.response
+        raise error
+
+    async def _call(self, endpoint: RpcEndpoint, method: str, args, kwargs):
+        start = time.perf_counter()
+        try:
+            response = to_dict(await getattr(endpoint.client, method)(*args, **kwargs))
+        except Exception:
+            endpoint.record_failure(self.failure_threshold, self.cooldown)
+            raise
+
+        if isinstance(response, dict) and 'error' in response:
+            endpoint.record_failure(self.failure_threshold, self.cooldown)
+            raise RpcError(response)
+        endpoint.record_success(time.perf_counter() - start)
+        return response
+
+    def _finish_in_background(self, tasks: Set[asyncio.Task]):
+        """Let losing sends complete so their endpoints' stats stay current"""
+        for task in tasks:
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            # Losing sends are expected to fail sometimes; mark them retrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
@@ -0,0 +1,264 @@
+import multiprocessing
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+EMPTY = 0
+OPEN = 1
+DELETED = 2
+
+HEADER_DTYPE = np.dtype([
+    ("version", "<i8"),  # Odd while a write is in progress
+    ("capacity", "<i8"),
+    ("open", "<i8"),
+    ("deleted", "<i8"),
+    ("exposure", "<f8"),  # Total SOL in open positions across all shards
+    ("writer", "<i8"),  # Pid holding the write lock, 0 when unlocked
+    ("shards", "<i8"),
+    ("lamports", "<i8"),  # Wallet SOL balance, shared since every shard spends it
+    ("lamports_slot", "<i8"),
+])
+ROW_DTYPE = np.dtype([
+    ("mint", "S44"),
+    ("state", "u1"),
+    ("shard", "<i2"),
+    ("entry", "<f8"),
+    ("amount", "<f8"),
+    ("opened_at", "<f8"),
+], align=True)
+
+# Rebuild once open and deleted rows fill this share of the table
+MAX_LOAD = 0.7
+
+# Seconds a writer waits for the lock, and a reader for a write to finish,
+# before giving up; a writer that died mid-write is repaired by recover()
+LOCK_TIMEOUT = 1.0
+READ_TIMEOUT = 0.05
+
+
+class SharedPositionTable:
+    """
+    Open positions shared by every shard process.
+
+    A fixed-capacity open-addressing hash table of mints lives in a shared
+    memory block. Writers serialize on a process-shared lock and bump a
+    version counter around each change; readers never take the lock and
+    simply retry if a write overlapped their read, so checks cost no IPC.
+    Both give up with TimeoutError rather than wait forever on a writer
+    that died holding the lock; the supervisor then calls ``recover``.
+
+    The same block holds the wallet's SOL balance and one slot per shard
+    of lamports reserved for unconfirmed buys, so every shard sizes its
+    buys from the SOL the others have not committed yet. Each shard only
+    writes its own reservation slot, so reservations take no lock.
+    """
+
+    def __init__(self, buffer, lock):
+        self.buffer = buffer
+        self.lock = lock
+        self.header = np.frombuffer(buffer, dtype=HEADER_DTYPE, count=1)
+        capacity = int(self.header["capacity"][0])
+        self.rows = np.frombuffer(
+            buffer, dtype=ROW_DTYPE, count=capacity, offset=HEADER_DTYPE.itemsize
+        )
+        self.mask = capacity - 1
+        self.reservations = np.frombuffer(
+            buffer, dtype=np.int64, count=int(self.header["shards"][0]),
+            offset=HEADER_DTYPE.itemsize + ROW_DTYPE.itemsize * capacity
+        )
+
+    @classmethod
+    def create(cls, capacity: int = 4096, context=multiprocessing,
+               shards: int = 1) -> 'SharedPositionTable':
+        """Allocate a table; pass ``buffer`` and ``lock`` to child processes"""
+        capacity = 1 << max(capacity - 1, 1).bit_length()
+        size = HEADER_DTYPE.itemsize + ROW_DTYPE.itemsize * capacity + 8 * shards
+        buffer = context.RawArray('b', size)
+        header = np.frombuffer(buffer, dtype=HEADER_DTYPE, count=1)
+        header["capacity"] = capacity
+        header["shards"] = shards
+        return cls(buffer, context.Lock())
+
+    def get(self, mint: str) -> Optional[Tuple[float, float, int]]:
+        """Return (entry price, amount, owning shard) for an open mint"""
+        key = mint.encode()
+        deadline = None
+        while True:
+            version = int(self.header["version"][0])
+            if not version & 1:
+                index = self._find(key)
+                result = None
+                if index is not None:
+                    row = self.rows[index]
+                    result = (float(row["entry"]), float(row["amount"]), int(row["shard"]))
+                if int(self.header["version"][0]) == version:
+                    return result
+
+            # A write overlapped; writes take microseconds unless the writer died
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + READ_TIMEOUT
+            elif now > deadline:
+                raise TimeoutError("Shared position table write did not finish")
+
+    def exposure(self) -> float:
+        return float(self.header["exposure"][0])
+
+    def open_count(self) -> int:
+        return int(self.header["open"][0])
+
+    def items(self) -> Iterator[Tuple[str, float, float, int]]:
+        """Snapshot of open positions as (mint, entry, amount, shard)"""
+        rows = self.rows[self.rows["state"] == OPEN].copy()
+        for row in rows:
+            yield row["mint"].decode(), float(row["entry"]), float(row["amount"]), int(row["shard"])
+
+    def open(self, mint: str, entry_price: float, amount: float, shard: int):
+        """
+        Record an opened position owned by ``shard``
+
+        Reopening a mint replaces its entry and amount, as
+        ``PositionManager.open_position`` does, and moves ownership.
+        """
+        key = mint.encode()
+        with self._write():
+            index = self._find(key)
+            if index is None:
+                if self.header["open"][0] + self.header["deleted"][0] + 1 > MAX_LOAD * len(self.rows):
+                    self._rebuild()
+                index = self._insert_slot(key)
+                if self.rows["state"][index] == DELETED:
+                    self.header["deleted"] -= 1
+                self.rows[index] = (key, OPEN, shard, entry_price, amount, time.time())
+                self.header["open"] += 1
+            else:
+                held = float(self.rows["amount"][index])
+                self.rows[index] = (key, OPEN, shard, entry_price, amount, time.time())
+                amount -= held
+            self.header["exposure"] += amount
+
+    def close(self, mint: str) -> Optional[float]:
+        """Remove a mint; returns the amount that was open"""
+        key = mint.encode()
+        with self._write():
+            index = self._find(key)
+            if index is None:
+                return None
+            amount = float(self.rows["amount"][index])
+            self.rows["state"][index] = DELETED
+            self.header["open"] -= 1
+            self.header["deleted"] += 1
+            self.header["exposure"] = max(0.0, self.exposure() - amount)
+            return amount
+
+    def lamports(self) -> int:
+        return int(self.header["lamports"][0])
+
+    def set_lamports(self, lamports: int, slot: int):
+        """Record a balance read at ``slot``, unless a newer one is known"""
+        with self._write():
+            if slot >= self.header["lamports_slot"][0]:
+                self.header["lamports"] = lamports
+                self.header["lamports_slot"] = slot
+
+    def add_lamports(self, change: int, slot: int):
+        """Apply a trade that settled at ``slot`` if no read has covered it yet"""
+        with self._write():
+            if self.header["lamports_slot"][0] < slot or not slot:
+                self.header["lamports"] = max(0, self.lamports() + change)
+                self.header["lamports_slot"] = max(int(self.header["lamports_slot"][0]), slot)
+
+    def reserved(self) -> int:
+        """Lamports reserved by every shard"""
+        return int(self.reservations.sum())
+
+    def reserve(self, shard: int, lamports: int):
+        self.reservations[shard] += lamports
+
+    def release(self, shard: int, lamports: int):
+        self.reservations[shard] = max(0, int(self.reservations[shard]) - lamports)
+
+    def clear_reservations(self, shard: int):
+        """Drop what a shard that exited had reserved for buys it never settled"""
+        self.reservations[shard] = 0
+
+    def recover(self, pid: int) -> bool:
+        """
+        Release the lock and repair the header if ``pid`` died while writing
+
+        Counts and exposure are recomputed from the rows, so a write cut
+        short between row and header updates leaves no drift.
+        """
+        if pid == 0 or int(self.header["writer"][0]) != pid:
+            return False
+        states = self.rows["state"]
+        self.header["open"] = int((states == OPEN).sum())
+        self.header["deleted"] = int((states == DELETED).sum())
+        self.header["exposure"] = float(self.rows["amount"][states == OPEN].sum())
+        if int(self.header["version"][0]) & 1:
+            self.header["version"] += 1
+        self.header["writer"] = 0
+        self.lock.release()
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "open": self.open_count(),
+            "exposure": self.exposure(),
+            "capacity": len(self.rows),
+            "deleted": int(self.header["deleted"][0]),
+            "lamports": self.lamports(),
+            "reserved": self.reserved(),
+        }
+
+    def _slot(self, key: bytes) -> int:
+        # crc32 is stable across processes, unlike hash()
+        return zlib.crc32(key) & self.mask
+
+    def _find(self, key: bytes) -> Optional[int]:
+        index = self._slot(key)
+        states = self.rows["state"]
+        mints = self.rows["mint"]
+        for _ in range(len(self.rows)):
+            state = states[index]
+            if state == EMPTY:
+                return None
+            if state == OPEN and mints[index] == key:
+                return index
+            index = (index + 1) & self.mask
+        return None
+
+    def _insert_slot(self, key: bytes) -> int:
+        index = self._slot(key)
+        states = self.rows["state"]
+        while states[index] == OPEN:
+            index = (index + 1) & self.mask
+        return index
+
+    def _rebuild(self):
+        """Drop deleted markers by reinserting every open row"""
+        live = self.rows[self.rows["state"] == OPEN].copy()
+        if len(live) + 1 > MAX_LOAD * len(self.rows):
+            raise RuntimeError("Shared position table is full")
+        self.rows[:] = np.zeros(len(self.rows), dtype=ROW_DTYPE)
+        for row in live:
+            self.rows[self._insert_slot(bytes(row["mint"]))] = row
+        self.header["deleted"] = 0
+
+    @contextmanager
+    def _write(self):
+        """Hold the lock with the version odd, recording the writer for recover()"""
+        if not self.lock.acquire(timeout=LOCK_TIMEOUT):
+            raise TimeoutError("Timed out waiting for the shared position table lock")
+        self.header["writer"] = os.getpid()
+        self.header["version"] += 1
+        try:
+            yield
+        finally:
+            self.header["version"] += 1
+            self.header["writer"] = 0
+            self.lock.release()
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    token TEXT PRIMARY KEY, entry_price TEXT NOT NULL, amount REAL NOT NULL,
+    opened_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prices (
+    token TEXT PRIMARY KEY, price TEXT, entry_price TEXT
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    token TEXT PRIMARY KEY, prices BLOB NOT NULL
+);
+"""
+
+_CLOSE = object()
+
+
+class StateStore:
+    """
+    Warm-restart state in a SQLite database in WAL mode.
+
+    Position opens and closes are written as deltas the moment they
+    happen. Latest prices and volatility windows change constantly, so a
+    snapshot task diffs them every ``snapshot_interval`` seconds and only
+    writes tokens that changed. All writes go through a queue to a writer
+    thread that commits each batch in one transaction, so the event loop
+    never touches the disk and a reload always sees a consistent state.
+    """
+
+    def __init__(self, path: str = 'bot_state.db', snapshot_interval: float = 1.0):
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self.position_manager: Optional['PositionManager'] = None
+        self.price_tracker: Optional['PriceTracker'] = None
+        self.slippage_calculator: Optional['SlippageCalculator'] = None
+
+        self.writes = 0
+        self.snapshots = 0
+        self._prices: Dict[str, Tuple[Optional[Decimal], Optional[Decimal]]] = {}
+        self._windows: Optional[np.ndarray] = None
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._task = None
+
+        db = self._connect()
+        try:
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    @classmethod
+    def from_config(cls, config: 'BotConfig') -> Optional['StateStore']:
+        if not config.state_file:
+            return None
+        return cls(config.state_file, config.state_snapshot_interval)
+
+    def restore(self, position_manager: Optional['PositionManager'] = None,
+                price_tracker: Optional['PriceTracker'] = None,
+                slippage_calculator: Optional['SlippageCalculator'] = None) -> Dict[str, int]:
+        """
+        Load the last committed state into the given components and keep
+        them persisted from then on
+        """
+        start = time.perf_counter()
+        counts = {"positions": 0, "prices": 0, "windows": 0}
+        db = self._connect()
+        try:
+            if position_manager is not None:
+                for token, entry_price, amount in db.execute(
+                        "SELECT token, entry_price, amount FROM positions").fetchall():
+                    if not self._owns(position_manager, token):
+                        continue
+                    position_manager.open_position(
+                        token, Decimal(entry_price), amount, publish=False
+                    )
+                    counts["positions"] += 1
+                position_manager.store = self
+                self.position_manager = position_manager
+
+            if price_tracker is not None:
+                for token, price, entry_price in db.execute(
+                        "SELECT token, price, entry_price FROM prices"):
+                    if price is not None:
+                        price_tracker.token_prices[token] = Decimal(price)
+                    if entry_price is not None:
+                        price_tracker.entry_prices[token] = Decimal(entry_price)
+                    self._prices[token] = (
+                        price_tracker.token_prices.get(token),
+                        price_tracker.entry_prices.get(token)
+                    )
+                    counts["prices"] += 1
+                self.price_tracker = price_tracker
+
+            if slippage_calculator is not None:
+                for token, prices in db.execute("SELECT token, prices FROM price_history"):
+                    slippage_calculator.restore_window(token, np.frombuffer(prices))
+                    counts["windows"] += 1
+                self._windows = slippage_calculator._prices.copy()
+                self.slippage_calculator = slippage_calculator
+        finally:
+            db.close()
+
+        logging.info(
+            f"Restored {counts['positions']} positions, {counts['prices']} prices and "
+            f"{counts['windows']} volatility windows in "
+            f"{(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+        return counts
+
+    def _owns(self, position_manager: 'PositionManager', token: str) -> bool:
+        """
+        Whether a saved position is still this process's to resume. When
+        sharded, the shared table is the source of truth: rows it no longer
+        lists for this shard were closed or taken over while we were down,
+        so they are dropped instead of published again.
+        """
+        if position_manager.shared is None:
+            return True
+        try:
+            position = position_manager.shared.get(token)
+        except TimeoutError as e:
+            logging.error(f"Error reading shared position for {token}: {str(e)}")
+            return False
+        if position is None or position[2] != position_manager.shard:
+            self.delete_position(token)
+            return False
+        return True
+
+    def start(self):
+        """Start the writer thread and the snapshot task"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._writer, name='state-store', daemon=True
+            )
+            self._thread.start()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: Optional[float] = 5.0):
+        """Write a final snapshot and wait for the writer to drain"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.snapshot()
+        if self._thread is not None:
+            self._queue.put(_CLOSE)
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._thread.join, timeout
+            )
+            self._thread = None
+
+    def save_position(self, token: str, entry_price: Decimal, amount: float):
+        self._queue.put((
+            "INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?)",
+            [(token, str(entry_price), amount, time.time())]
+        ))
+
+    def delete_position(self, token: str):
+        self._queue.put(("DELETE FROM positions WHERE token = ?", [(token,)]))
+
+    def snapshot(self):
+        """Queue every price and volatility window changed since the last snapshot"""
+        if self.price_tracker is not None:
+            self._snapshot_prices()
+        if self.slippage_calculator is not None:
+            self._snapshot_windows()
+        self.snapshots += 1
+
+    def _snapshot_prices(self):
+        tracker = self.price_tracker
+        rows = []
+        for token in tracker.token_prices.keys() | tracker.entry_prices.keys():
+            current = (tracker.token_prices.get(token), tracker.entry_prices.get(token))
+            if self._prices.get(token) != current:
+                self._prices[token] = current
+                rows.append((token, *(None if p is None else str(p) for p in current)))
+        if rows:
+            self._queue.put(("INSERT OR REPLACE INTO prices VALUES (?, ?, ?)", rows))
+
+    def _snapshot_windows(self):
+        calculator = self.slippage_calculator
+        windows = calculator._prices
+        previous = self._windows
+        if previous is None or previous.shape != windows.shape:
+            # Window storage grew; compare against empty rows beyond the old size
+            grown = np.zeros_like(windows)
+            if previous is not None:
+                grown[:len(previous)] = previous
+            previous = grown
+
+        changed = set(np.flatnonzero(np.any(windows != previous, axis=1)).tolist())
+        rows = [
+            (token, np.asarray(calculator.get_price_history(token)).tobytes())
+            for token, row in calculator.token_rows.items() if row in changed
+        ]
+        self._windows = windows.copy()
+        if rows:
+            self._queue.put(("INSERT OR REPLACE INTO price_history VALUES (?, ?)", rows))
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                self.snapshot()
+            except Exception as e:
+                logging.error(f"State snapshot error: {str(e)}")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _writer(self):
+        db = self._connect()
+        closing = False
+
+        while not closing:
+            batch: List = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if _CLOSE in batch:
+                batch = [item for item in batch if item is not _CLOSE]
+                closing = True
+
+            try:
+                with db:
+                    for statement, rows in batch:
+                        db.executemany(statement, rows)
+                self.writes += len(batch)
+            except Exception as e:
+                logging.error(f"State store write error: {str(e)}")
+
+        db.close()
@@ -0,0 +1,204 @@
+from solana.rpc.async_api import AsyncClient
+from solders.pubkey import Pubkey
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import asyncio
+import base64
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+TOKEN_PROGRAM_ID = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+TOKEN_2022_PROGRAM_ID = Pubkey.from_string("TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb")
+ASSOCIATED_TOKEN_PROGRAM_ID = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
+
+# SPL mint layout: COption<Pubkey> authority (36) + supply (8) + decimals (1)
+MINT_DECIMALS_OFFSET = 44
+
+
+def get_associated_token_address(owner: Pubkey, mint: Pubkey,
+                                 token_program: Pubkey = TOKEN_PROGRAM_ID) -> Pubkey:
+    """Derive the associated token account for an owner and mint"""
+    address, _ = Pubkey.find_program_address(
+        [bytes(owner), bytes(token_program), bytes(mint)],
+        ASSOCIATED_TOKEN_PROGRAM_ID
+    )
+    return address
+
+
+@dataclass
+class TokenContext:
+    mint: Pubkey
+    decimals: int
+    token_program: Pubkey
+    ata: Pubkey
+    ata_exists: bool
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class TokenCache:
+    """
+    Per-mint cache of the accounts and metadata needed to build swaps.
+
+    Entries are evicted least-recently-used once ``max_size`` is reached and
+    expire after ``ttl`` seconds. A new mint is loaded with a single
+    ``getMultipleAccounts`` call covering the mint, both candidate ATAs
+    and, with a quote engine, the accounts of the mint's pool if it still
+    needs loading; those seed the quote engine.
+    """
+
+    def __init__(self, client: AsyncClient, owner: Pubkey,
+                 max_size: int = 1024, ttl: float = 3600.0,
+                 quote_engine: Optional['QuoteEngine'] = None):
+        self.client = client
+        self.owner = owner
+        self.max_size = max_size
+        self.ttl = ttl
+        self.quote_engine = quote_engine
+
+        self.entries: "OrderedDict[str, TokenContext]" = OrderedDict()
+        self.account_index: Dict[str, str] = {}  # watched account -> mint
+        self.subscriptions: Optional['SubscriptionManager'] = None
+        self.hits = 0
+        self.misses = 0
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    def get(self, mint: Pubkey) -> Optional[TokenContext]:
+        """Return a cached context without touching the network"""
+        key = str(mint)
+        context = self.entries.get(key)
+        if context is None:
+            self.misses += 1
+            return None
+
+        if time.monotonic() - context.loaded_at > self.ttl:
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return context
+
+    async def get_or_load(self, mint: Pubkey) -> TokenContext:
+        """Return a cached context, loading it on a miss"""
+        context = self.get(mint)
+        if context is not None:
+            return context
+
+        key = str(mint)
+        pending = self._loading.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._load(mint))
+            self._loading[key] = pending
+            pending.add_done_callback(lambda _: self._loading.pop(key, None))
+        return await pending
+
+    async def prewarm(self, mints: Iterable[str]):
+        """Load hot mints ahead of the first trade"""
+        mints = [Pubkey.from_string(mint) for mint in mints]
+        results = await asyncio.gather(
+            *(self.get_or_load(mint) for mint in mints),
+            return_exceptions=True
+        )
+        for mint, result in zip(mints, results):
+            if isinstance(result, Exception):
+                logging.error(f"Error pre-warming {mint}: {str(result)}")
+        logging.info(f"Pre-warmed token cache with {len(self.entries)} mints")
+
+    def invalidate(self, mint: str):
+        """Drop a mint's cached context and stop watching its accounts"""
+        context = self.entries.pop(str(mint), None)
+        if context is not None:
+            self.account_index.pop(str(context.mint), None)
+            self.account_index.pop(str(context.ata), None)
+            if self.subscriptions is not None:
+                self.subscriptions.unregister(context.mint, self.on_account_change)
+                self.subscriptions.unregister(context.ata, self.on_account_change)
+
+    def attach(self, subscriptions: 'SubscriptionManager'):
+        """Receive account-change notifications for cached mints and ATAs"""
+        self.subscriptions = subscriptions
+        for account in self.watched_accounts():
+            subscriptions.register(Pubkey.from_string(account), self.on_account_change)
+
+    def watched_accounts(self) -> List[str]:
+        """Accounts whose change notifications affect cached entries"""
+        return list(self.account_index)
+
+    async def on_account_change(self, account: str, notification):
+        """
+        Apply an account-change notification
+
+        An ATA notification only flips the exists flag; any change to a
+        mint account invalidates the cached context.
+        """
+        mint = self.account_index.get(account)
+        if mint is None or mint not in self.entries:
+            return
+
+        context = self.entries[mint]
+        if account == str(context.ata):
+            context.ata_exists = self._lamports(notification) > 0
+        else:
+            self.invalidate(mint)
+
+    async def _load(self, mint: Pubkey) -> TokenContext:
+        """Fetch mint, ATA and pool accounts in one batched call"""
+        atas = [
+            get_associated_token_address(self.owner, mint, TOKEN_PROGRAM_ID),
+            get_associated_token_address(self.owner, mint, TOKEN_2022_PROGRAM_ID),
+        ]
+        pool_accounts = (
+            self.quote_engine.needs_load(str(mint)) if self.quote_engine is not None else []
+        )
+        response = await self.client.get_multiple_accounts(
+            [mint] + atas + [Pubkey.from_string(account) for account in pool_accounts],
+            encoding="base64"
+        )
+        mint_account, *ata_accounts = response['result']['value'][:3]
+        if pool_accounts:
+            self.quote_engine.seed(
+                str(mint), response['result']['value'][3:], response['result']['context']['slot']
+            )
+        if mint_account is None:
+            raise ValueError(f"Mint account not found: {mint}")
+
+        token_program = Pubkey.from_string(mint_account['owner'])
+        data = base64.b64decode(mint_account['data'][0])
+        index = 1 if token_program == TOKEN_2022_PROGRAM_ID else 0
+
+        context = TokenContext(
+            mint=mint,
+            decimals=data[MINT_DECIMALS_OFFSET],
+            token_program=token_program,
+            ata=atas[index],
+            ata_exists=ata_accounts[index] is not None
+        )
+        self._store(context)
+        return context
+
+    def _store(self, context: TokenContext):
+        key = str(context.mint)
+        self.entries[key] = context
+        self.entries.move_to_end(key)
+        self.account_index[key] = key
+        self.account_index[str(context.ata)] = key
+
+        if self.subscriptions is not None:
+            self.subscriptions.register(context.mint, self.on_account_change)
+            self.subscriptions.register(context.ata, self.on_account_change)
+
+        while len(self.entries) > self.max_size:
+            self.invalidate(next(iter(self.entries)))
+
+    @staticmethod
+    def _lamports(notification) -> int:
+        value = getattr(notification, "value", None)
+        if value is None and isinstance(notification, dict):
+            value = notification.get('value')
+        if value is None:
+            return 0
+        if isinstance(value, dict):
+            return value.get('lamports', 0)
+        return getattr(value, "lamports", 0)
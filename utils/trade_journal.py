@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+JOURNAL_FIELDS = (
+    "ts", "action", "token", "amount", "price", "slippage", "gas_multiplier"
+)
+
+_CLOSE = object()
+
+# Records mirrored between GIL releases, so a backlog cannot keep the
+# event loop thread waiting for a whole batch
+MIRROR_CHUNK = 4
+
+
+class TradeJournal:
+    """
+    Append-only JSONL trade journal written on a background thread.
+
+    ``record`` only enqueues a tuple. The writer thread serializes records,
+    flushes in batches, fsyncs at most every ``fsync_interval`` seconds and
+    rotates the file once it grows past ``max_bytes``. When ``mirror`` is
+    set, each record is also logged there as a TRADE line from the writer
+    thread.
+    """
+
+    def __init__(self, path: str = 'trades.jsonl', max_bytes: int = 64 * 1024 * 1024,
+                 backup_count: int = 5, fsync_interval: float = 1.0,
+                 batch_size: int = 256, mirror: Optional[logging.Logger] = None):
+        self.path = path
+        self.mirror = mirror
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.fsync_interval = fsync_interval
+        self.batch_size = batch_size
+
+        self.written = 0
+        self.rotations = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(
+            target=self._writer, name='trade-journal', daemon=True
+        )
+        self._thread.start()
+
+    def record(self, *fields):
+        """Enqueue one trade record; fields follow JOURNAL_FIELDS after ts"""
+        self._queue.put((time.time(),) + fields)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Flush pending records and stop the writer thread"""
+        self._queue.put(_CLOSE)
+        self._thread.join(timeout)
+
+    def _writer(self):
+        last_sync = time.monotonic()
+        closing = False
+
+        while not closing:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if batch[-1] is _CLOSE:
+                batch.pop()
+                closing = True
+
+            try:
+                self._write_batch(batch)
+                now = time.monotonic()
+                if closing or now - last_sync >= self.fsync_interval:
+                    os.fsync(self._file.fileno())
+                    last_sync = now
+            except Exception as e:
+                logging.error(f"Trade journal write error: {str(e)}")
+
+        self._file.close()
+
+    def _write_batch(self, batch):
+        if not batch:
+            return
+
+        lines = ''.join(
+            json.dumps(dict(zip(JOURNAL_FIELDS, record)), default=str) + '\n'
+            for record in batch
+        )
+        self._file.write(lines)
+        self._file.flush()
+        self.written += len(batch)
+
+        if self.mirror is not None:
+            for index, record in enumerate(batch, 1):
+                _, action, token, amount, price, slippage, gas_multiplier = record
+                self.mirror.info(
+                    "TRADE: %s %s %s @ %s SOL | Slippage: %s%% | Gas: %sx",
+                    action.upper(), amount, token, price, slippage, gas_multiplier
+                )
+                if index % MIRROR_CHUNK == 0:
+                    time.sleep(0)
+
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """Shift trades.jsonl -> trades.jsonl.1 -> ... and reopen"""
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self.rotations += 1
@@ -1,44 +1,68 @@
-```python
 import logging
-from datetime import datetime
+import queue
 from decimal import Decimal
-from typing import Dict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from utils.trade_journal import TradeJournal
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueue records unformatted so formatting happens on the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 class TradeLogger:
-    def __init__(self, log_file: str = 'trading_bot.log'):
+    def __init__(self, log_file: str = 'trading_bot.log',
+                 journal_file: str = 'trades.jsonl',
+                 max_bytes: int = 64 * 1024 * 1024, backup_count: int = 5):
         self.logger = logging.getLogger('trade_logger')
         self.logger.setLevel(logging.INFO)
-        
-        # File handler
-        fh = logging.FileHandler(log_file)
+
+        # File handler, rotated on the listener thread
+        fh = RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count
+        )
         fh.setLevel(logging.INFO)
-        
+
         # Console handler
         ch = logging.StreamHandler()
         ch.setLevel(logging.INFO)
-        
+
         # Formatter
         formatter = logging.Formatter(
             '%(asctime)s - %(levelname)s - %(message)s'
         )
         fh.setFormatter(formatter)
         ch.setFormatter(formatter)
-        
-        self.logger.addHandler(fh)
-        self.logger.addHandler(ch)
-        
-    def log_trade(self, token: str, action: str, amount: float, 
-                  price: Decimal, slippage: float, gas_multiplier: float):
-        self.logger.info(
-            f"TRADE: {action.upper()} {amount} {token} @ {price} SOL | "
-            f"Slippage: {slippage}% | Gas: {gas_multiplier}x"
+
+        # The event loop only enqueues; formatting and I/O run on a thread
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.logger.addHandler(DeferredQueueHandler(log_queue))
+        self.listener = QueueListener(
+            log_queue, fh, ch, respect_handler_level=True
+        )
+        self.listener.start()
+
+        # Trades are enqueued as tuples; the journal thread writes them and
+        # emits the TRADE log line
+        self.journal = TradeJournal(
+            journal_file, max_bytes=max_bytes, backup_count=backup_count,
+            mirror=self.logger
         )
-        
-    def log_pnl(self, token: str, entry_price: Decimal, 
+
+    def log_trade(self, token: str, action: str, amount: float,
+                  price: Decimal, slippage: float, gas_multiplier: float):
+        self.journal.record(action, token, amount, price, slippage, gas_multiplier)
+
+    def log_pnl(self, token: str, entry_price: Decimal,
                 exit_price: Decimal, amount: float):
         pnl = float((exit_price - entry_price) / entry_price * 100)
         self.logger.info(
-            f"PNL: {token} | Entry: {entry_price} | Exit: {exit_price} | "
-            f"Amount: {amount} | PnL: {pnl:.2f}%"
+            "PNL: %s | Entry: %s | Exit: %s | Amount: %s | PnL: %.2f%%",
+            token, entry_price, exit_price, amount, pnl
         )
-```
\ No newline at end of file
+
+    def close(self):
+        """Flush queued log records and the trade journal"""
+        self.journal.close()
+        self.listener.stop()